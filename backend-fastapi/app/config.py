@@ -9,9 +9,61 @@ class Settings(BaseSettings):
 
     # ---- app/runtime ----
     db_url: str = "sqlite:///./app.db"
+
+    # ---- upload storage (app.services.storage) ----
+    storage_backend: str = "local"    # "local" (storage_dir) or "s3"
     storage_dir: str = "./local_storage"
+    s3_bucket_name: str = "med-docs-dev"
+    aws_region: str = "ap-south-1"
+
+    # ---- database (pool and SQLite profile) ----
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_single_writer: bool = True      # serialize SQLite writes through app.db.writer
+    db_batch_max_rows: int = 64        # writes grouped into one transaction by the writer
+    db_batch_window_ms: float = 2.0    # how long the writer waits to fill a batch
+    sqlite_journal_mode: str = "WAL"   # readers don't block the writer
+    sqlite_synchronous: str = "NORMAL"  # request connections: with WAL, a power loss can drop the last commits
+    sqlite_writer_synchronous: str = "FULL"  # single-writer connection: every (batched) commit is fsynced
+    sqlite_mmap_size: int = 268435456  # bytes of the DB file read through mmap
+    sqlite_cache_size: int = -65536    # page cache; negative = KiB (64 MiB)
+    sqlite_busy_timeout_ms: int = 5000  # wait for locks instead of failing with "database is locked"
     allow_origins: str = "http://localhost:5173"
 
+    # ---- PDF extraction (process pool) ----
+    pdf_workers: int = 0              # 0 = one worker per CPU
+    pdf_pages_per_task: int = 16      # minimum pages per pool task
+    pdf_extract_timeout: float = 60.0  # seconds per document
+    pdf_probe_pages: int = 5          # pages sampled to tell text PDFs from scanned ones
+
+    # ---- OCR (image uploads and scanned PDFs) ----
+    ocr_engine: str = "tesseract"     # "tesseract" or "none"; unavailable engines disable OCR
+    tesseract_cmd: str = "tesseract"
+    ocr_lang: str = "eng"
+    ocr_max_side: int = 2500          # downscale images so the long side is at most this (px)
+    ocr_binarize_threshold: int = 160  # 0 = keep greyscale
+    ocr_timeout: float = 120.0        # seconds per document
+
+    # ---- early classification of long PDFs ----
+    early_classify_pages: int = 3      # start classifying after this many pages...
+    early_classify_chars: int = 6000   # ...or this many characters, whichever comes first
+
+    # ---- map-reduce for long documents ----
+    chunk_token_budget: int = 24000   # chunk documents whose estimated tokens exceed this
+    chunk_concurrency: int = 8        # concurrent per-chunk LLM calls
+
+    # ---- note section routing (app.services.sectionizer) ----
+    section_routing: bool = False     # send each LLM task only the sections it needs
+
+    # ---- multi-report packets ----
+    split_packets: bool = False       # split uploads holding several reports into child documents
+
+    # ---- near-duplicate detection (MinHash LSH) ----
+    near_dup_threshold: float = 0.8  # reuse the classification (never codes/summary) at or above this similarity
+
+    # ---- document response cache (GET /documents/{id}) ----
+    result_cache_max_bytes: int = 64 * 1024 * 1024  # in-process LRU of rendered responses; 0 disables
+
     # pydantic v2 settings
     model_config = SettingsConfigDict(
         env_file=".env",
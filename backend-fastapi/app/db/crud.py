@@ -1,43 +1,402 @@
-from sqlalchemy.orm import Session
-from app.db.models import Document, DocumentResult
-from typing import List, Optional
-import json
+from datetime import datetime
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.db import file_refs, payload as payload_codec, result_index, search
+from app.db.models import (
+    Document,
+    DocumentClassification,
+    DocumentCode,
+    DocumentResult,
+    DocumentSignature,
+    DocumentLshBucket,
+    DocumentSummary,
+    ExtractedText,
+)
+from app.services import near_duplicate, result_cache
+from typing import List, Optional, Tuple
+import orjson
+import zlib
 
 
-def create_document(db: Session, filename: str, local_path: Optional[str] = None) -> Document:
-    """Create a new document record"""
-    doc = Document(original_filename=filename, local_path=local_path)
-    db.add(doc)
-    db.commit()
-    db.refresh(doc)
-    return doc
+async def create_document(
+    db: AsyncSession,
+    filename: str,
+    local_path: Optional[str] = None,
+    content_hash: Optional[str] = None,
+    parent_id: Optional[int] = None,
+    commit: bool = True,
+) -> Document:
+    """Create a new document record (the new id comes back via RETURNING)"""
+    values = {
+        "original_filename": filename,
+        "local_path": local_path,
+        "content_hash": content_hash,
+        "parent_id": parent_id,
+        "created_at": datetime.utcnow(),
+    }
+    doc_id = await db.scalar(insert(Document).values(**values).returning(Document.id))
+    if local_path:
+        await file_refs.add_ref(db, local_path)
+    if commit:
+        await db.commit()
+    return Document(id=doc_id, **values)
 
 
-def list_documents(db: Session, limit: int = 50) -> List[Document]:
-    """List recent documents"""
-    return db.query(Document).order_by(Document.created_at.desc()).limit(limit).all()
+async def delete_document(db: AsyncSession, document_id: int, commit: bool = True) -> Optional[List[str]]:
+    """
+    Delete a document and its packet parts with everything derived from them
 
+    Returns:
+        Stored file paths no longer referenced by any document (remove them
+        from storage after the commit), or None if there is no such document
+    """
+    rows = (await db.execute(
+        select(Document.id, Document.local_path, Document.content_hash)
+        .where((Document.id == document_id) | (Document.parent_id == document_id))
+    )).all()
+    ids = [doc_id for doc_id, _, _ in rows]
+    if document_id not in ids:
+        return None
+    await _delete_derived(db, ids)
+    # Parts first: they reference the parent
+    await db.execute(delete(Document).where(Document.parent_id == document_id))
+    await db.execute(delete(Document).where(Document.id == document_id))
+    await _delete_texts(db, [content_hash for _, _, content_hash in rows if content_hash])
+    unreferenced = await file_refs.release(db, [path for _, path, _ in rows if path])
+    if commit:
+        await db.commit()
+    return unreferenced
 
-def get_document(db: Session, document_id: int) -> Optional[Document]:
+
+async def delete_parts(db: AsyncSession, document_id: int, commit: bool = True) -> List[str]:
+    """
+    Delete a packet document's parts, keeping the document itself
+
+    Returns:
+        Stored file paths no longer referenced (see delete_document)
+    """
+    rows = (await db.execute(
+        select(Document.id, Document.local_path, Document.content_hash)
+        .where(Document.parent_id == document_id)
+    )).all()
+    if not rows:
+        return []
+    await _delete_derived(db, [doc_id for doc_id, _, _ in rows])
+    await db.execute(delete(Document).where(Document.parent_id == document_id))
+    await _delete_texts(db, [content_hash for _, _, content_hash in rows if content_hash])
+    unreferenced = await file_refs.release(db, [path for _, path, _ in rows if path])
+    if commit:
+        await db.commit()
+    return unreferenced
+
+
+async def _delete_derived(db: AsyncSession, ids: List[int]) -> None:
+    """Delete the results, index rows and signatures of these documents"""
+    for model in (DocumentCode, DocumentClassification, DocumentSummary, DocumentResult,
+                  DocumentLshBucket, DocumentSignature):
+        await db.execute(delete(model).where(model.document_id.in_(ids)))
+    await search.remove_documents(db, ids)
+    for doc_id in ids:
+        result_cache.invalidate_on_commit(db, doc_id)
+
+
+async def _delete_texts(db: AsyncSession, content_hashes: List[str]) -> None:
+    """Delete extracted texts no remaining document refers to (and, after the commit, their cached copies)"""
+    from app.services import text_cache  # text_cache imports this module
+
+    if not content_hashes:
+        return
+    await db.execute(
+        delete(ExtractedText).where(
+            ExtractedText.content_hash.in_(content_hashes),
+            ExtractedText.content_hash.not_in(
+                select(Document.content_hash).where(Document.content_hash.in_(content_hashes))
+            ),
+        )
+    )
+    for content_hash in content_hashes:
+        text_cache.evict_on_commit(db, content_hash)
+
+
+async def list_documents(
+    db: AsyncSession,
+    limit: int = 50,
+    before: Optional[Tuple[datetime, int]] = None,
+    document_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    filename_prefix: Optional[str] = None,
+    include_results: bool = False,
+) -> List[Document]:
+    """
+    List documents, newest first, one keyset page at a time
+
+    Args:
+        before: (created_at, id) of the last document on the previous page
+        document_type: Only documents classified as this type
+        since, until: Only documents created in [since, until)
+        filename_prefix: Only documents whose original filename starts with this
+        include_results: Also load Document.results (one extra query for the page)
+
+    Pages are read from ix_documents_created_id (or, with a type filter,
+    ix_document_classifications_type_created, whose created_at is copied
+    from the document) starting at the cursor, so every page costs the
+    same however deep it is; no OFFSET, no sort.
+    """
+    query = select(Document)
+    if document_type:
+        created_at, doc_id = DocumentClassification.created_at, DocumentClassification.document_id
+        query = query.join(DocumentClassification, DocumentClassification.document_id == Document.id).where(
+            DocumentClassification.document_type == document_type.upper()
+        )
+    else:
+        created_at, doc_id = Document.created_at, Document.id
+    if before is not None:
+        query = query.where(tuple_(created_at, doc_id) < tuple_(*before))
+    if since is not None:
+        query = query.where(created_at >= since)
+    if until is not None:
+        query = query.where(created_at < until)
+    if filename_prefix:
+        # Range instead of LIKE: no wildcard escaping, and case-sensitive like the column
+        query = query.where(
+            Document.original_filename >= filename_prefix,
+            Document.original_filename < filename_prefix + "\U0010ffff",
+        )
+    if include_results:
+        query = query.options(selectinload(Document.results))
+    result = await db.execute(query.order_by(created_at.desc(), doc_id.desc()).limit(limit))
+    return list(result.scalars())
+
+
+async def get_documents_with_results(db: AsyncSession, document_ids: List[int]) -> List[Document]:
+    """
+    Documents (with Document.results loaded) for the given ids, in that order
+
+    Two queries whatever the number of ids: the documents, then their
+    results via selectinload. Unknown ids are skipped.
+    """
+    result = await db.execute(
+        select(Document).where(Document.id.in_(document_ids)).options(selectinload(Document.results))
+    )
+    by_id = {doc.id: doc for doc in result.scalars()}
+    return [by_id[i] for i in dict.fromkeys(document_ids) if i in by_id]
+
+
+async def get_document(db: AsyncSession, document_id: int) -> Optional[Document]:
     """Get a document by ID"""
-    return db.query(Document).filter(Document.id == document_id).first()
+    return await db.get(Document, document_id)
+
+
+async def list_child_documents(db: AsyncSession, parent_id: int) -> List[Document]:
+    """Parts split from a packet upload, in page order"""
+    result = await db.execute(
+        select(Document).where(Document.parent_id == parent_id).order_by(Document.id)
+    )
+    return list(result.scalars())
+
+
+async def get_document_by_hash(db: AsyncSession, content_hash: str) -> Optional[Document]:
+    """Get a document by the SHA-256 of its uploaded bytes"""
+    result = await db.execute(select(Document).where(Document.content_hash == content_hash))
+    return result.scalars().first()
+
+
+def _upsert(db: AsyncSession, model):
+    """INSERT ... ON CONFLICT for the session's dialect"""
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    return dialect.insert(model)
+
+
+async def save_result(db: AsyncSession, document_id: int, payload: dict, commit: bool = True) -> int:
+    """
+    Save pipeline result for a document, replacing any previous result
+    (and its normalized classification/code/summary rows and search row)
+
+    Returns:
+        The result row id (via RETURNING)
+    """
+    stmt = _upsert(db, DocumentResult).values(
+        document_id=document_id,
+        payload=payload_codec.encode(payload),
+        payload_json=None,
+        created_at=datetime.utcnow(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DocumentResult.document_id],
+        set_={"payload": stmt.excluded.payload, "payload_json": None},
+    ).returning(DocumentResult.id)
+    result_id = await db.scalar(stmt)
+    await result_index.write_index(db, document_id, payload)
+    await search.index_document(db, document_id, payload)
+    result_cache.invalidate_on_commit(db, document_id)
+    if commit:
+        await db.commit()
+    return result_id
+
+
+async def get_document_result(db: AsyncSession, document_id: int) -> Optional[dict]:
+    """Get result for a document (either storage format)"""
+    row = (await db.execute(
+        select(DocumentResult.payload, DocumentResult.payload_json)
+        .where(DocumentResult.document_id == document_id)
+    )).first()
+    if row is not None:
+        return payload_codec.load(*row)
+    return None
+
+
+async def get_document_with_result_json(
+    db: AsyncSession, document_id: int, fields: Optional[List[str]] = None
+) -> Optional[Tuple[Document, Optional[bytes]]]:
+    """
+    A document and its result as raw JSON bytes, in one query
+
+    The stored JSON is returned as-is (only decompressed) so it can be
+    written to a response without a parse/encode round trip. With fields,
+    only those top-level keys of the result are kept (this one does parse).
+
+    Returns:
+        (document, result JSON or None), or None if there is no such document
+    """
+    row = (await db.execute(
+        select(Document, DocumentResult.payload, DocumentResult.payload_json)
+        .outerjoin(DocumentResult, DocumentResult.document_id == Document.id)
+        .where(Document.id == document_id)
+    )).first()
+    if row is None:
+        return None
+    doc, blob, legacy_json = row
+    if fields is None:
+        return doc, payload_codec.load_json(blob, legacy_json)
+    payload = payload_codec.load(blob, legacy_json)
+    if payload is None:
+        return doc, None
+    return doc, orjson.dumps({key: payload[key] for key in fields if key in payload})
+
+
+async def list_documents_by_code(
+    db: AsyncSession, code: str, limit: int = 50
+) -> List[Tuple[Document, Optional[float]]]:
+    """
+    Documents coded with an ICD-10 code, newest first
+
+    Served by ix_document_codes_code_created (no payload is parsed).
+
+    Returns:
+        List of (document, code confidence)
+    """
+    result = await db.execute(
+        select(Document, DocumentCode.confidence)
+        .join(DocumentCode, DocumentCode.document_id == Document.id)
+        .where(DocumentCode.code == result_index.normalize_code(code))
+        .order_by(DocumentCode.created_at.desc())
+        .limit(limit)
+    )
+    return [tuple(row) for row in result]
 
 
-def save_result(db: Session, document_id: int, payload: dict) -> DocumentResult:
-    """Save pipeline result for a document"""
-    result = DocumentResult(
+async def list_documents_by_type(
+    db: AsyncSession,
+    document_type: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 50,
+) -> List[Tuple[Document, Optional[float]]]:
+    """
+    Documents classified as document_type, optionally within [since, until), newest first
+
+    Served by ix_document_classifications_type_created.
+
+    Returns:
+        List of (document, classification confidence)
+    """
+    query = (
+        select(Document, DocumentClassification.confidence)
+        .join(DocumentClassification, DocumentClassification.document_id == Document.id)
+        .where(DocumentClassification.document_type == document_type.upper())
+    )
+    if since is not None:
+        query = query.where(DocumentClassification.created_at >= since)
+    if until is not None:
+        query = query.where(DocumentClassification.created_at < until)
+    result = await db.execute(query.order_by(DocumentClassification.created_at.desc()).limit(limit))
+    return [tuple(row) for row in result]
+
+
+async def save_signature(
+    db: AsyncSession, document_id: int, signature: List[int], commit: bool = True
+) -> None:
+    """Store a document's MinHash signature and its LSH bucket keys"""
+    await db.execute(delete(DocumentLshBucket).where(DocumentLshBucket.document_id == document_id))
+    await db.merge(DocumentSignature(
         document_id=document_id,
-        payload_json=json.dumps(payload)
+        signature=near_duplicate.pack_signature(signature),
+    ))
+    db.add_all([
+        DocumentLshBucket(bucket_key=key, document_id=document_id)
+        for key in near_duplicate.band_keys(signature)
+    ])
+    if commit:
+        await db.commit()
+
+
+async def find_near_duplicates(
+    db: AsyncSession,
+    signature: List[int],
+    threshold: float,
+    exclude_id: Optional[int] = None,
+) -> List[Tuple[int, float]]:
+    """
+    Find documents whose estimated Jaccard similarity is at least threshold
+
+    Returns:
+        List of (document_id, similarity), most similar first
+    """
+    if not signature:
+        return []
+
+    candidate_ids = (
+        select(DocumentLshBucket.document_id)
+        .where(DocumentLshBucket.bucket_key.in_(near_duplicate.band_keys(signature)))
+        .distinct()
+    )
+    if exclude_id is not None:
+        candidate_ids = candidate_ids.where(DocumentLshBucket.document_id != exclude_id)
+
+    rows = await db.execute(
+        select(DocumentSignature.document_id, DocumentSignature.signature)
+        .where(DocumentSignature.document_id.in_(candidate_ids.scalar_subquery()))
     )
-    db.add(result)
-    db.commit()
-    db.refresh(result)
-    return result
+    matches = []
+    for document_id, packed in rows:
+        score = near_duplicate.similarity(signature, near_duplicate.unpack_signature(packed))
+        if score >= threshold:
+            matches.append((document_id, score))
+    matches.sort(key=lambda m: m[1], reverse=True)
+    return matches
 
 
-def get_document_result(db: Session, document_id: int) -> Optional[dict]:
-    """Get result for a document"""
-    result = db.query(DocumentResult).filter(DocumentResult.document_id == document_id).first()
-    if result:
-        return json.loads(result.payload_json)
+async def get_extracted_text(db: AsyncSession, content_hash: str) -> Optional[str]:
+    """Get previously extracted text for the given source bytes"""
+    text_zlib = await db.scalar(
+        select(ExtractedText.text_zlib).where(ExtractedText.content_hash == content_hash)
+    )
+    if text_zlib is not None:
+        return zlib.decompress(text_zlib).decode("utf-8")
     return None
+
+
+async def save_extracted_text(
+    db: AsyncSession, content_hash: str, text: str, commit: bool = True
+) -> None:
+    """Persist extracted text (compressed) under its source content hash"""
+    await db.merge(ExtractedText(
+        content_hash=content_hash,
+        text_zlib=zlib.compress(text.encode("utf-8"), 6),
+        char_count=len(text),
+    ))
+    if commit:
+        await db.commit()
@@ -1,27 +1,167 @@
-from sqlalchemy import create_engine
+from typing import Optional
+
+from sqlalchemy import LargeBinary, event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
-engine = create_engine(
-    settings.db_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.db_url else {}
-)
+# Async drivers for the plain URLs used in settings/.env
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def async_db_url(url: str) -> str:
+    """Map a sync database URL onto its async driver (explicit drivers are kept)"""
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme or scheme not in _ASYNC_DRIVERS:
+        return url
+    return _ASYNC_DRIVERS[scheme] + sep + rest
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def is_memory_sqlite(url: str) -> bool:
+    return is_sqlite(url) and (":memory:" in url or url.rstrip("/").endswith(":"))
+
+
+def _sqlite_pragmas(synchronous: str):
+    """Connect hook applying the SQLite performance profile to every new connection"""
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.close()
+
+    return set_pragmas
+
+
+def make_engine(url: str, pool_size: int, max_overflow: int, synchronous: Optional[str] = None) -> AsyncEngine:
+    """
+    Async engine for url with the pool size given and, on SQLite, the pragma profile
+
+    synchronous overrides settings.sqlite_synchronous (the writer's connection
+    uses FULL, see app.db.writer).
+    """
+    options = {}
+    if not is_memory_sqlite(url):  # in-memory SQLite uses one static connection
+        options = {"pool_size": pool_size, "max_overflow": max_overflow}
+        if is_sqlite(url):
+            # aiosqlite defaults to NullPool (a new connection, pragmas and
+            # cold page cache per session); keep connections open instead
+            options["poolclass"] = AsyncAdaptedQueuePool
+    new_engine = create_async_engine(async_db_url(url), **options)
+    if is_sqlite(url):
+        event.listen(new_engine.sync_engine, "connect", _sqlite_pragmas(synchronous or settings.sqlite_synchronous))
+    return new_engine
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+engine = make_engine(settings.db_url, settings.db_pool_size, settings.db_max_overflow)
+
+# expire_on_commit=False: attributes stay readable after commit without an
+# implicit (and, in async, impossible) lazy refresh
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """Dependency for FastAPI routes to get database session"""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def init_db():
+# Columns/indexes added after the initial schema. create_all() only creates
+# missing tables, so existing databases are upgraded in place here.
+_ADDED_COLUMNS = {
+    "documents": {
+        "content_hash": "VARCHAR(64)",
+        "parent_id": "INTEGER REFERENCES documents(id)",
+    },
+    "document_results": {
+        "payload": LargeBinary(),  # BLOB / BYTEA, compiled per dialect
+    },
+}
+
+# Columns that became nullable after the initial schema
+_RELAXED_COLUMNS = {
+    "document_results": ["payload_json"],
+}
+
+_ADDED_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_documents_content_hash ON documents (content_hash)",
+    "CREATE INDEX IF NOT EXISTS ix_documents_parent_id ON documents (parent_id)",
+    "CREATE INDEX IF NOT EXISTS ix_documents_created_id ON documents (created_at, id)",
+]
+
+
+def _rebuild_sqlite_table(conn, table: str) -> None:
+    """
+    Recreate a table from its current model, keeping its rows
+
+    SQLite cannot ALTER a column's constraints, so the old table is renamed,
+    the model's table (and indexes) created, the shared columns copied over
+    and the old table dropped.
+    """
+    old = f"_{table}_old"
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+    inspector = inspect(conn)
+    for index in inspector.get_indexes(old):
+        conn.execute(text(f"DROP INDEX {index['name']}"))
+    model = Base.metadata.tables[table]
+    model.create(conn)
+    shared = ", ".join(
+        c["name"] for c in inspector.get_columns(old) if c["name"] in model.c
+    )
+    conn.execute(text(f"INSERT INTO {table} ({shared}) SELECT {shared} FROM {old}"))
+    conn.execute(text(f"DROP TABLE {old}"))
+
+
+def _migrate_schema(conn):
+    """Add columns and indexes that older databases are missing (sync, via run_sync)"""
+    inspector = inspect(conn)
+    for table, columns in _ADDED_COLUMNS.items():
+        existing = {c["name"] for c in inspector.get_columns(table)}
+        for name, ddl_type in columns.items():
+            if name not in existing:
+                if not isinstance(ddl_type, str):
+                    ddl_type = ddl_type.compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl_type}"))
+    for table, names in _RELAXED_COLUMNS.items():
+        columns = {c["name"]: c for c in inspect(conn).get_columns(table)}
+        for name in names:
+            if columns[name]["nullable"]:
+                continue
+            if conn.dialect.name == "sqlite":
+                _rebuild_sqlite_table(conn, table)
+                break
+            conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {name} DROP NOT NULL"))
+    for ddl in _ADDED_INDEXES:
+        conn.execute(text(ddl))
+
+
+async def init_db():
     """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    from app.db import file_refs, result_index, search  # import the models, which need Base
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_migrate_schema)
+        await conn.run_sync(search.create_index)
+        referenced = await conn.run_sync(file_refs.backfill)
+        indexed = await conn.run_sync(result_index.backfill)
+        searchable = await conn.run_sync(search.backfill)
+    if referenced:
+        print(f"[INFO] Counted document references for {referenced} stored files")
+    if indexed:
+        print(f"[INFO] Indexed classifications/codes for {indexed} stored results")
+    if searchable:
+        print(f"[INFO] Added {searchable} stored results to the search index")
@@ -0,0 +1,97 @@
+"""
+Reference counts of stored upload files (stored_files)
+
+Every document row with a local_path holds one reference to that file:
+crud.create_document adds it and crud.delete_document releases it. A file
+is removed from storage only once its count drops to zero, since packet
+parts share their parent's file and content-addressed storage gives
+identical uploads one file. backfill() counts the references of documents
+stored before the table existed.
+
+A released file keeps its row at zero until purge() removes the row and
+the file together, in one transaction that re-checks the count. An upload
+counting a new reference to the same path either commits first (purge
+then leaves the file alone) or waits for the purge to commit and then
+publishes the file again (see app.services.storage_local).
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, List
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Document, StoredFile
+
+
+async def add_ref(db: AsyncSession, path: str, count: int = 1) -> None:
+    """Count count more references to path (caller commits)"""
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(StoredFile).values(path=path, ref_count=count, created_at=datetime.utcnow())
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[StoredFile.path],
+        set_={"ref_count": StoredFile.ref_count + stmt.excluded.ref_count},
+    ))
+
+
+async def release(db: AsyncSession, paths: Iterable[str]) -> List[str]:
+    """
+    Drop one reference per path given (caller commits)
+
+    Returns:
+        The paths no longer referenced; the caller purges them once the
+        transaction has committed
+    """
+    counts = Counter(paths)
+    if not counts:
+        return []
+    for path, n in counts.items():
+        await db.execute(
+            update(StoredFile).where(StoredFile.path == path).values(ref_count=StoredFile.ref_count - n)
+        )
+    return list(await db.scalars(
+        select(StoredFile.path).where(StoredFile.path.in_(counts), StoredFile.ref_count <= 0)
+    ))
+
+
+async def purge(
+    db: AsyncSession, path: str, remove: Callable[[str], Awaitable[None]], commit: bool = True
+) -> bool:
+    """
+    Remove a file from storage if it is still unreferenced
+
+    The row is deleted only at a zero count, and remove(path) runs before
+    the commit, so a concurrent add_ref of the path waits for it (row or
+    database write lock) instead of referencing a file about to go.
+
+    Returns:
+        True if the file was removed
+    """
+    result = await db.execute(
+        delete(StoredFile).where(StoredFile.path == path, StoredFile.ref_count <= 0)
+    )
+    if result.rowcount:
+        await remove(path)
+    if commit:
+        await db.commit()
+    return bool(result.rowcount)
+
+
+def backfill(conn: Connection) -> int:
+    """
+    Count the references of existing documents into an empty stored_files (sync, via run_sync)
+
+    Returns:
+        Number of files counted
+    """
+    if conn.execute(select(StoredFile.path).limit(1)).first() is not None:
+        return 0
+    result = conn.execute(insert(StoredFile).from_select(
+        ["path", "ref_count", "created_at"],
+        select(Document.local_path, func.count(), func.min(Document.created_at))
+        .where(Document.local_path.is_not(None))
+        .group_by(Document.local_path),
+    ))
+    return max(result.rowcount, 0)
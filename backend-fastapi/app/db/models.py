@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, LargeBinary, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -11,8 +11,14 @@ class Document(Base):
     original_filename = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     local_path = Column(String, nullable=True)
+    content_hash = Column(String(64), nullable=True, unique=True, index=True)  # SHA-256 of uploaded bytes
+    parent_id = Column(Integer, ForeignKey("documents.id"), nullable=True, index=True)  # packet this part was split from
     
-    results = relationship("DocumentResult", back_populates="document", uselist=False)
+    # Never lazy-loaded (that would be a query per document): use selectinload()
+    results = relationship("DocumentResult", back_populates="document", uselist=False, lazy="raise")
+
+    # Keyset pagination of GET /documents: newest first, id breaks ties
+    __table_args__ = (Index("ix_documents_created_id", "created_at", "id"),)
 
 
 class DocumentResult(Base):
@@ -20,7 +26,90 @@ class DocumentResult(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, unique=True)
-    payload_json = Column(Text, nullable=False)
+    payload = Column(LargeBinary, nullable=True)  # versioned, compressed (see app.db.payload)
+    payload_json = Column(Text, nullable=True)  # legacy rows only: plain JSON text
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     document = relationship("Document", back_populates="results")
+
+
+class DocumentSignature(Base):
+    """MinHash signature of a document's extracted text (near-duplicate detection)"""
+    __tablename__ = "document_signatures"
+
+    document_id = Column(Integer, ForeignKey("documents.id"), primary_key=True)
+    signature = Column(LargeBinary, nullable=False)
+
+
+class DocumentLshBucket(Base):
+    """One LSH band key per row; documents sharing a key are near-duplicate candidates"""
+    __tablename__ = "document_lsh_buckets"
+
+    id = Column(Integer, primary_key=True)
+    bucket_key = Column(BigInteger, nullable=False, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
+
+
+class ExtractedText(Base):
+    """zlib-compressed extracted text, keyed by the SHA-256 of the source bytes"""
+    __tablename__ = "extracted_texts"
+
+    content_hash = Column(String(64), primary_key=True)
+    text_zlib = Column(LargeBinary, nullable=False)
+    char_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# ---- Normalized, indexed view of DocumentResult payloads ----
+# Written with every result (crud.save_result) so code/type queries are
+# index scans instead of json.loads over every payload. created_at is the
+# document's upload time, copied so date ranges use the same index.
+
+class DocumentClassification(Base):
+    __tablename__ = "document_classifications"
+
+    document_id = Column(Integer, ForeignKey("documents.id"), primary_key=True)
+    document_type = Column(String(64), nullable=True)
+    confidence = Column(Float, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_document_classifications_type_created", "document_type", "created_at"),
+    )
+
+
+class DocumentCode(Base):
+    __tablename__ = "document_codes"
+
+    id = Column(Integer, primary_key=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    code = Column(String(16), nullable=False)  # normalized: upper case, no spaces
+    description = Column(String, nullable=True)
+    confidence = Column(Float, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_document_codes_code_created", "code", "created_at"),
+        Index("ix_document_codes_document_code", "document_id", "code"),
+    )
+
+
+class DocumentSummary(Base):
+    """Summary metadata (the text itself stays in the payload)"""
+    __tablename__ = "document_summaries"
+
+    document_id = Column(Integer, ForeignKey("documents.id"), primary_key=True)
+    confidence = Column(Float, nullable=True)
+    summary_chars = Column(Integer, nullable=False, default=0)
+    bullet_count = Column(Integer, nullable=False, default=0)
+    citation_count = Column(Integer, nullable=False, default=0)
+    code_count = Column(Integer, nullable=False, default=0)
+
+
+class StoredFile(Base):
+    """How many documents refer to a stored file (see app.db.file_refs)"""
+    __tablename__ = "stored_files"
+
+    path = Column(String, primary_key=True)  # Document.local_path
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
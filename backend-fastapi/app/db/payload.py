@@ -0,0 +1,77 @@
+"""
+Binary encoding of pipeline result payloads (DocumentResult.payload)
+
+Layout: one format version byte, then the body. Version 1 is
+orjson-serialized JSON compressed with zstd. Summaries, bullets and
+evidence quotes are repetitive text, so results shrink several times
+over, and orjson is several times faster than json at both ends.
+
+Rows written before this column existed only have payload_json (plain
+JSON text); load() reads either.
+"""
+import threading
+from typing import Any, Dict, Optional
+
+import orjson
+import zstandard
+
+FORMAT_ZSTD_ORJSON = 1
+
+ZSTD_LEVEL = 3
+
+# zstd contexts are costly to create (more than compressing a result) and
+# not thread-safe, so each thread keeps its own
+_local = threading.local()
+
+
+def _compressor() -> zstandard.ZstdCompressor:
+    if not hasattr(_local, "compressor"):
+        _local.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return _local.compressor
+
+
+def _decompressor() -> zstandard.ZstdDecompressor:
+    if not hasattr(_local, "decompressor"):
+        _local.decompressor = zstandard.ZstdDecompressor()
+    return _local.decompressor
+
+
+def encode(payload: Dict[str, Any]) -> bytes:
+    """Serialize and compress a payload (current format)"""
+    body = _compressor().compress(orjson.dumps(payload))
+    return bytes([FORMAT_ZSTD_ORJSON]) + body
+
+
+def _json_body(blob: bytes) -> bytes:
+    version = blob[0]
+    if version == FORMAT_ZSTD_ORJSON:
+        return _decompressor().decompress(blob[1:])
+    raise ValueError(f"Unknown result payload format {version}")
+
+
+def decode(blob: bytes) -> Dict[str, Any]:
+    """
+    Decode a payload written by encode()
+
+    Raises:
+        ValueError: if the format version is unknown
+    """
+    return orjson.loads(_json_body(blob))
+
+
+def load(blob: Optional[bytes], legacy_json: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Payload from a result row: the binary column, else the legacy JSON text"""
+    if blob is not None:
+        return decode(blob)
+    if legacy_json:
+        return orjson.loads(legacy_json)
+    return None
+
+
+def load_json(blob: Optional[bytes], legacy_json: Optional[str]) -> Optional[bytes]:
+    """Payload from a result row as UTF-8 JSON bytes, without parsing it"""
+    if blob is not None:
+        return _json_body(blob)
+    if legacy_json:
+        return legacy_json.encode("utf-8")
+    return None
@@ -0,0 +1,134 @@
+"""
+Normalized rows derived from pipeline result payloads
+
+save_result keeps document_classifications / document_codes /
+document_summaries in step with the stored payload; backfill() fills them for
+results stored before these tables existed.
+"""
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import payload as payload_codec
+from app.db.models import (
+    Document,
+    DocumentClassification,
+    DocumentCode,
+    DocumentResult,
+    DocumentSummary,
+)
+
+BACKFILL_BATCH = 5000
+
+_CODE_WS_RE = re.compile(r"\s+")
+
+
+def normalize_code(code: str) -> str:
+    """ICD-10 code as stored and queried: upper case, no whitespace"""
+    return _CODE_WS_RE.sub("", code or "").upper()
+
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def index_rows(
+    document_id: int, payload: Dict[str, Any], created_at: datetime
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, Any]]:
+    """(classification row, code rows, summary row) for one result payload"""
+    classification = payload.get("classification") or {}
+    summary = payload.get("summary") or {}
+    codes = (payload.get("codes") or {}).get("codes") or []
+    if payload.get("parts"):
+        # Packet uploads: each part is its own (child) document with its own
+        # type and codes; indexing the merged copy too would return every hit
+        # twice (and list the packet under its first part's type)
+        classification = {**classification, "document_type": None}
+        codes = []
+
+    code_rows = {}
+    for code in codes:
+        key = normalize_code(code.get("code", ""))
+        if key and key not in code_rows:
+            code_rows[key] = {
+                "document_id": document_id,
+                "code": key[:16],
+                "description": code.get("description"),
+                "confidence": _float(code.get("confidence")),
+                "created_at": created_at,
+            }
+
+    return (
+        {
+            "document_id": document_id,
+            "document_type": classification.get("document_type"),
+            "confidence": _float(classification.get("confidence")),
+            "created_at": created_at,
+        },
+        list(code_rows.values()),
+        {
+            "document_id": document_id,
+            "confidence": _float(summary.get("confidence")),
+            "summary_chars": len(summary.get("summary") or ""),
+            "bullet_count": len(summary.get("bullets") or []),
+            "citation_count": len(summary.get("citations") or []),
+            "code_count": len(code_rows),
+        },
+    )
+
+
+async def write_index(db: AsyncSession, document_id: int, payload: Dict[str, Any]) -> None:
+    """Replace a document's normalized rows (caller commits)"""
+    created_at = await db.scalar(select(Document.created_at).where(Document.id == document_id))
+    classification, codes, summary = index_rows(document_id, payload, created_at or datetime.utcnow())
+    for model in (DocumentClassification, DocumentCode, DocumentSummary):
+        await db.execute(delete(model).where(model.document_id == document_id))
+    await db.execute(insert(DocumentClassification), [classification])
+    if codes:
+        await db.execute(insert(DocumentCode), codes)
+    await db.execute(insert(DocumentSummary), [summary])
+
+
+def backfill(conn: Connection) -> int:
+    """
+    Index results that have no normalized rows yet (sync, via run_sync)
+
+    Returns:
+        Number of results indexed
+    """
+    indexed = DocumentClassification.__table__.c.document_id
+    query = (
+        select(DocumentResult.document_id, DocumentResult.payload, DocumentResult.payload_json, Document.created_at)
+        .join(Document, Document.id == DocumentResult.document_id)
+        .where(DocumentResult.document_id.not_in(select(indexed)))
+        .order_by(DocumentResult.document_id)
+        .limit(BACKFILL_BATCH)
+    )
+    total, last_id = 0, 0
+    while True:
+        rows = conn.execute(query.where(DocumentResult.document_id > last_id)).all()
+        if not rows:
+            return total
+        last_id = rows[-1][0]
+        classifications, codes, summaries = [], [], []
+        for document_id, blob, legacy_json, created_at in rows:
+            try:
+                payload = payload_codec.load(blob, legacy_json) or {}
+            except ValueError:
+                payload = {}
+            c, cs, s = index_rows(document_id, payload, created_at)
+            classifications.append(c)
+            codes.extend(cs)
+            summaries.append(s)
+        conn.execute(insert(DocumentClassification), classifications)
+        if codes:
+            conn.execute(insert(DocumentCode), codes)
+        conn.execute(insert(DocumentSummary), summaries)
+        total += len(rows)
@@ -0,0 +1,209 @@
+"""
+Full-text search over documents (SQLite FTS5)
+
+documents_fts holds, per document (rowid = document id), the extracted
+text, the summary, the summary bullets and the ICD-10 codes with their
+descriptions. save_result keeps it in step with the stored result, so
+searching never loads payloads. Words are stemmed (porter), and 2- and
+3-character prefix indexes make prefix queries ("diab*") cheap.
+
+Search is only available on SQLite: check search_supported() first. On
+other databases the index is not created and search() raises
+SearchNotSupported.
+
+Snippets are HTML: the matched text is escaped and only the <mark> tags
+around matches are markup, so stored text can never inject HTML.
+"""
+import html
+import re
+import zlib
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import column, delete, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import payload as payload_codec
+from app.db.models import Document, DocumentResult, ExtractedText
+
+FTS_TABLE = "documents_fts"
+BACKFILL_BATCH = 2000
+
+# Relative weight of each column in bm25 ranking (same order as the DDL)
+COLUMN_WEIGHTS = (1.0, 4.0, 2.0, 4.0)
+_RANK = "bm25(%s)" % ", ".join(str(w) for w in COLUMN_WEIGHTS)
+
+_CREATE_FTS = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    extracted_text, summary, bullets, codes,
+    tokenize = 'porter unicode61', prefix = '2 3'
+)
+"""
+
+_fts = table(FTS_TABLE, column("rowid"))
+
+_INSERT = text(
+    f"INSERT INTO {FTS_TABLE} (rowid, extracted_text, summary, bullets, codes) "
+    "VALUES (:rowid, :extracted_text, :summary, :bullets, :codes)"
+)
+_DELETE = text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid")
+
+_TERM_RE = re.compile(r'"[^"]*"\*?|[^\s"]+')
+
+# snippet() wraps matches in these (private-use characters, untouched by
+# html.escape); they become <mark> tags after the snippet is escaped
+_MARK_OPEN, _MARK_CLOSE = "\ue000", "\ue001"
+
+
+class SearchNotSupported(Exception):
+    """Full-text search was used on a database without FTS5"""
+
+
+def supported(dialect_name: str) -> bool:
+    return dialect_name == "sqlite"
+
+
+def search_supported(db: AsyncSession) -> bool:
+    """True if search() can run on this session's database"""
+    return supported(db.bind.dialect.name)
+
+
+def fts_row(document_id: int, payload: Dict[str, Any], extracted_text: Optional[str]) -> Dict[str, Any]:
+    """Column values for one document"""
+    summary = payload.get("summary") or {}
+    codes = (payload.get("codes") or {}).get("codes") or []
+    if payload.get("parts"):
+        # Packet uploads: the parts are indexed as their own documents; the
+        # packet's row stays empty so a hit is not returned twice (as in
+        # result_index.index_rows)
+        extracted_text, summary, codes = None, {}, []
+    return {
+        "rowid": document_id,
+        "extracted_text": extracted_text or "",
+        "summary": summary.get("summary") or "",
+        "bullets": "\n".join(str(b) for b in summary.get("bullets") or []),
+        "codes": "\n".join(
+            f"{c.get('code', '')} {c.get('description') or ''}".strip() for c in codes
+        ),
+    }
+
+
+def _decompress(text_zlib: Optional[bytes]) -> Optional[str]:
+    return zlib.decompress(text_zlib).decode("utf-8") if text_zlib is not None else None
+
+
+async def index_document(db: AsyncSession, document_id: int, payload: Dict[str, Any]) -> None:
+    """Replace a document's search row (caller commits; no-op off SQLite)"""
+    if not supported(db.bind.dialect.name):
+        return
+    text_zlib = await db.scalar(
+        select(ExtractedText.text_zlib)
+        .join(Document, Document.content_hash == ExtractedText.content_hash)
+        .where(Document.id == document_id)
+    )
+    await db.execute(_DELETE, {"rowid": document_id})
+    await db.execute(_INSERT, fts_row(document_id, payload, _decompress(text_zlib)))
+
+
+async def remove_documents(db: AsyncSession, document_ids: List[int]) -> None:
+    """Drop documents' search rows (caller commits; no-op off SQLite)"""
+    if not supported(db.bind.dialect.name):
+        return
+    await db.execute(delete(_fts).where(_fts.c.rowid.in_(document_ids)))
+
+
+def create_index(conn: Connection) -> None:
+    """Create documents_fts if missing (sync, via run_sync)"""
+    if supported(conn.dialect.name):
+        conn.execute(text(_CREATE_FTS))
+
+
+def backfill(conn: Connection) -> int:
+    """
+    Index stored results missing from documents_fts (sync, via run_sync)
+
+    Returns:
+        Number of documents indexed
+    """
+    if not supported(conn.dialect.name):
+        return 0
+    query = (
+        select(DocumentResult.document_id, DocumentResult.payload, DocumentResult.payload_json, ExtractedText.text_zlib)
+        .join(Document, Document.id == DocumentResult.document_id)
+        .outerjoin(ExtractedText, ExtractedText.content_hash == Document.content_hash)
+        .where(DocumentResult.document_id.not_in(select(_fts.c.rowid)))
+        .order_by(DocumentResult.document_id)
+        .limit(BACKFILL_BATCH)
+    )
+    total, last_id = 0, 0
+    while True:
+        rows = conn.execute(query.where(DocumentResult.document_id > last_id)).all()
+        if not rows:
+            return total
+        last_id = rows[-1][0]
+        batch = []
+        for document_id, blob, legacy_json, text_zlib in rows:
+            try:
+                payload = payload_codec.load(blob, legacy_json) or {}
+            except ValueError:
+                payload = {}
+            batch.append(fts_row(document_id, payload, _decompress(text_zlib)))
+        conn.execute(_INSERT, batch)
+        total += len(rows)
+
+
+def render_snippet(snippet: Optional[str]) -> str:
+    """HTML-escape a raw snippet, then turn its match markers into <mark> tags"""
+    escaped = html.escape(snippet or "", quote=False)
+    return escaped.replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+def to_match_query(q: str) -> str:
+    """
+    Turn user input into an FTS5 MATCH expression
+
+    Every term must match. A term ending in * is a prefix query, "quoted
+    words" are a phrase; anything else is quoted so FTS5 operators and
+    punctuation in user input cannot cause syntax errors.
+    """
+    terms = []
+    for term in _TERM_RE.findall(q):
+        prefix = term.endswith("*")
+        word = term.rstrip("*").strip('"').replace('"', "")
+        if word.strip():
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+async def search(db: AsyncSession, q: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Documents matching q, best bm25 score first
+
+    Returns:
+        List of dicts with id, original_filename, created_at, parent_id,
+        score (lower is better, as in bm25()) and snippet (escaped HTML,
+        matches in <mark>)
+
+    Raises:
+        SearchNotSupported: if the database is not SQLite (see search_supported)
+    """
+    if not search_supported(db):
+        raise SearchNotSupported("Full-text search requires SQLite (FTS5)")
+    match = to_match_query(q)
+    if not match:
+        return []
+    rows = await db.execute(
+        text(
+            f"SELECT d.id, d.original_filename, d.created_at, d.parent_id, rank AS score, "
+            f"snippet({FTS_TABLE}, -1, :mark_open, :mark_close, '…', 16) AS snippet "
+            f"FROM {FTS_TABLE} JOIN documents d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match AND rank MATCH :rank "
+            f"ORDER BY rank LIMIT :limit OFFSET :offset"
+        ),
+        {"match": match, "rank": _RANK, "limit": limit, "offset": offset,
+         "mark_open": _MARK_OPEN, "mark_close": _MARK_CLOSE},
+    )
+    return [
+        {**row._mapping, "snippet": render_snippet(row.snippet)}
+        for row in rows
+    ]
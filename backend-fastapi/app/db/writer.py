@@ -0,0 +1,166 @@
+"""
+Single-writer queue for database writes
+
+SQLite allows one write transaction at a time. When concurrent requests
+write on their own connections they collide on the database lock: they
+either sleep in busy_timeout or fail with "database is locked", and a
+deferred transaction that upgrades from read to write can fail
+immediately. Instead, every write runs on one background task, back to
+back, each on a fresh session over a dedicated connection (so writes never
+wait for a pool slot held by a request that is itself waiting on a
+write); callers await the result.
+
+On other databases (or with DB_SINGLE_WRITER=false) writes run directly
+on the caller's session, as before.
+
+Write-behind batching: while one transaction commits, further writes
+queue up. The worker takes up to db_batch_max_rows queued writes (waiting
+at most db_batch_window_ms for more) and runs them in a single
+transaction, so concurrent uploads share one commit (one fsync) instead
+of paying one each. Write functions take a commit flag for this (see
+app.db.crud).
+
+Durability: the writer's connection runs with synchronous=FULL
+(settings.sqlite_writer_synchronous), so a batch is on disk before its
+callers resume. Request connections keep synchronous=NORMAL, which under
+WAL can lose the last commits on power loss (never corrupts the file);
+that only affects writes made outside the queue (DB_SINGLE_WRITER=false).
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, TypeVar
+
+from app.config import settings
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.db.database import SessionLocal, is_memory_sqlite, is_sqlite, make_engine
+
+T = TypeVar("T")
+WriteFn = Callable[..., Awaitable[T]]
+
+
+class DbWriter:
+    """Runs write functions (crud coroutines taking a session first) one at a time"""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._engine: Optional[AsyncEngine] = None
+        self._sessions = SessionLocal
+
+    @property
+    def serialized(self) -> bool:
+        return settings.db_single_writer and is_sqlite(settings.db_url)
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            if self._loop is not loop:
+                self._engine = None  # connections belong to the previous loop
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            if self._engine is None and not is_memory_sqlite(settings.db_url):
+                self._engine = make_engine(
+                    settings.db_url, pool_size=1, max_overflow=0, synchronous=settings.sqlite_writer_synchronous
+                )
+                self._sessions = async_sessionmaker(self._engine, expire_on_commit=False, autoflush=False)
+            self._task = loop.create_task(self._worker(self._queue))
+        return self._queue
+
+    async def _next_batch(self, queue: asyncio.Queue) -> List[tuple]:
+        """Wait for one job, then gather more for up to db_batch_window_ms / db_batch_max_rows"""
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.db_batch_window_ms / 1000
+        while len(batch) < settings.db_batch_max_rows:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return [job for job in batch if not job[-1].cancelled()]
+
+    async def _run_one(self, job: tuple) -> None:
+        fn, args, kwargs, future = job
+        try:
+            async with self._sessions() as db:
+                result = await fn(db, *args, **kwargs)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+    async def _run_batch(self, batch: List[tuple]) -> None:
+        """
+        Run every job in one transaction and resolve the callers only after
+        the commit, so a response never reports a write that is not durable.
+        If any job fails, the transaction is rolled back and the jobs are
+        retried one by one so the error reaches only its own caller.
+        """
+        results = []
+        try:
+            async with self._sessions() as db:
+                for fn, args, kwargs, _ in batch:
+                    results.append(await fn(db, *args, commit=False, **kwargs))
+                    await db.flush()
+                await db.commit()
+        except Exception:
+            for job in batch:
+                await self._run_one(job)
+            return
+        for (*_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = await self._next_batch(queue)
+            if len(batch) == 1:
+                await self._run_one(batch[0])
+            elif batch:
+                await self._run_batch(batch)
+
+    async def run(self, db: AsyncSession, fn: WriteFn, *args: Any, **kwargs: Any) -> T:
+        """
+        Run fn(session, *args, **kwargs) as the only writer and return its result
+
+        Args:
+            db: The caller's session, used directly when writes are not serialized
+            fn: Write function, e.g. crud.save_result; must accept commit=False
+
+        Exceptions raised by fn (e.g. IntegrityError) are re-raised here.
+        """
+        if not self.serialized:
+            return await fn(db, *args, **kwargs)
+        queue = self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((fn, args, kwargs, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stop the writer task (app shutdown hook)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._queue is not None and not self._queue.empty():
+            *_, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Database writer stopped"))
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._sessions = SessionLocal
+
+
+writer = DbWriter()
@@ -3,7 +3,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.db.database import init_db
+from app.db.database import engine, init_db
+from app.db.writer import writer
+from app.services import pdf_pool
 from app.routes import health, pipeline, classify, extract_codes, summarize
 from app.routes.eval import router as eval_router
 from app.routes.translator import router as translator_router
@@ -32,12 +34,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # ---- Startup hooks ----
 @app.on_event("startup")
-def _on_startup():
-    init_db()
+async def _on_startup():
+    await init_db()
+
+
+@app.on_event("shutdown")
+async def _on_shutdown():
+    pdf_pool.shutdown()
+    await writer.close()
+    await engine.dispose()
 
 # ---- Routers ----
 # Core features
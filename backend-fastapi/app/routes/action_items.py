@@ -1,8 +1,13 @@
 # app/routes/action_items.py
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any, Optional
+from app.db import crud
+from app.db.database import get_db
 from app.services.claude_client import client
+from app.services.text_cache import load_document_text
 
 router = APIRouter()
 
@@ -12,6 +17,10 @@ class ActionItemsRequest(BaseModel):
     codes: Optional[List[Dict[str, Any]]] = None
 
 
+class StoredActionItemsRequest(BaseModel):
+    codes: Optional[List[Dict[str, Any]]] = None
+
+
 @router.post("/action-items")
 async def extract_action_items(request: ActionItemsRequest):
     """
@@ -25,8 +34,26 @@ async def extract_action_items(request: ActionItemsRequest):
       urgency: "routine|urgent|emergency"
     }
     """
-    result = client.extract_action_items(
+    return await run_in_threadpool(
+        client.extract_action_items,
         request.document_text,
         request.codes or []
     )
-    return result
+
+
+@router.post("/documents/{document_id}/action-items")
+async def extract_action_items_stored(
+    document_id: int,
+    request: StoredActionItemsRequest = StoredActionItemsRequest(),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Extract action items from a stored document using its server-side text.
+    Codes default to the ones stored with the document's pipeline results.
+    """
+    document_text = await load_document_text(db, document_id)
+    codes = request.codes
+    if codes is None:
+        results = await crud.get_document_result(db, document_id) or {}
+        codes = (results.get("codes") or {}).get("codes", [])
+    return await run_in_threadpool(client.extract_action_items, document_text, codes)
@@ -1,8 +1,12 @@
 # app/routes/chat.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+from app.db.database import get_db
 from app.services.claude_client import client
+from app.services.text_cache import load_document_text
 
 router = APIRouter()
 
@@ -13,18 +17,12 @@ class ChatRequest(BaseModel):
     conversation_history: Optional[list] = None
 
 
-@router.post("/chat")
-async def chat_with_document(request: ChatRequest):
-    """
-    Ask questions about your medical document
+class StoredChatRequest(BaseModel):
+    question: str
+    conversation_history: Optional[list] = None
 
-    Examples:
-    - "What does my cholesterol result mean?"
-    - "Should I be worried about the elevated WBC?"
-    - "Explain my X-ray findings in simple terms"
 
-    Returns: {answer, confidence, sources: [quoted text from document]}
-    """
+def _answer(document_text: str, question: str, conversation_history: Optional[list]) -> dict:
     if not client.use_claude:
         return {
             "answer": "Chat feature requires Claude API to be configured.",
@@ -34,10 +32,10 @@ async def chat_with_document(request: ChatRequest):
 
     # Build context from conversation history
     context = ""
-    if request.conversation_history:
+    if conversation_history:
         context = "\n".join([
             f"Q: {msg['question']}\nA: {msg['answer']}"
-            for msg in request.conversation_history[-3:]  # Last 3 exchanges
+            for msg in conversation_history[-3:]  # Last 3 exchanges
         ])
 
     prompt = f"""You are a helpful medical AI assistant. Answer the patient's question about their medical document.
@@ -50,11 +48,11 @@ Requirements:
 5. Be empathetic and reassuring when appropriate
 
 Document:
-{request.document_text}
+{document_text}
 
 {f"Previous conversation:{context}" if context else ""}
 
-Patient's question: {request.question}
+Patient's question: {question}
 
 Return JSON:
 {{
@@ -78,3 +76,37 @@ Return JSON:
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
+
+
+@router.post("/chat")
+async def chat_with_document(request: ChatRequest):
+    """
+    Ask questions about your medical document
+
+    Examples:
+    - "What does my cholesterol result mean?"
+    - "Should I be worried about the elevated WBC?"
+    - "Explain my X-ray findings in simple terms"
+
+    Returns: {answer, confidence, sources: [quoted text from document]}
+    """
+    return await run_in_threadpool(_answer, request.document_text, request.question, request.conversation_history)
+
+
+@router.post("/documents/{document_id}/chat")
+async def chat_with_stored_document(
+    document_id: int,
+    request: StoredChatRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ask questions about a stored document; its text is loaded server-side
+
+    Returns: {answer, confidence, sources: [quoted text from document]}
+    """
+    return await run_in_threadpool(
+        _answer,
+        await load_document_text(db, document_id),
+        request.question,
+        request.conversation_history,
+    )
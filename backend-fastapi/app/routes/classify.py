@@ -1,6 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_db
 from app.services.claude_client import client
+from app.services.text_cache import load_document_text
 
 router = APIRouter()
 
@@ -16,5 +20,14 @@ async def classify_document(request: ClassifyRequest):
     
     Returns: {document_type, confidence, rationale, evidence[]}
     """
-    result = client.classify(request.document_text)
-    return result
+    return await run_in_threadpool(client.classify, request.document_text)
+
+
+@router.post("/documents/{document_id}/classify")
+async def classify_stored_document(document_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Classify a stored document using its server-side extracted text
+    
+    Returns: {document_type, confidence, rationale, evidence[]}
+    """
+    return await run_in_threadpool(client.classify, await load_document_text(db, document_id))
@@ -1,7 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.services.claude_client import client
+from app.db.database import get_db
+from app.services import map_reduce
+from app.services.text_cache import load_document_text
 
 router = APIRouter()
 
@@ -11,6 +14,10 @@ class ExtractCodesRequest(BaseModel):
     document_type: Optional[str] = None
 
 
+class StoredExtractCodesRequest(BaseModel):
+    document_type: Optional[str] = None
+
+
 @router.post("/extract-codes")
 async def extract_codes(request: ExtractCodesRequest):
     """
@@ -18,5 +25,19 @@ async def extract_codes(request: ExtractCodesRequest):
     
     Returns: {codes: [{code, description, confidence, evidence[]}]}
     """
-    result = client.extract_codes(request.document_text, request.document_type)
+    result = await map_reduce.extract_codes(request.document_text, request.document_type)
     return result
+
+
+@router.post("/documents/{document_id}/extract-codes")
+async def extract_codes_stored(
+    document_id: int,
+    request: StoredExtractCodesRequest = StoredExtractCodesRequest(),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Extract ICD-10 codes from a stored document using its server-side text
+    
+    Returns: {codes: [{code, description, confidence, evidence[]}]}
+    """
+    return await map_reduce.extract_codes(await load_document_text(db, document_id), request.document_type)
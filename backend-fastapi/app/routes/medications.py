@@ -1,8 +1,13 @@
 # app/routes/medications.py
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from app.db.database import get_db
 from app.services.claude_client import client
+from app.services.sectionizer import select_text
+from app.services.text_cache import load_document_text
 
 router = APIRouter()
 
@@ -15,17 +20,7 @@ class InteractionCheckRequest(BaseModel):
     medications: List[str]
 
 
-@router.post("/extract-medications")
-async def extract_medications(request: MedicationRequest):
-    """
-    Extract medications from medical document
-
-    Returns: {medications: [{name, dosage, frequency, instructions}]}
-    """
-    if not client.use_claude:
-        return {"medications": [], "error": "Claude API not configured"}
-
-    prompt = """Extract ALL medications mentioned in this document.
+MEDICATIONS_PROMPT = """Extract ALL medications mentioned in this document.
 
 For each medication, provide:
 - name: medication name
@@ -45,13 +40,39 @@ Return JSON:
   ]
 }"""
 
+
+def _extract_medications(document_text: str) -> dict:
+    if not client.use_claude:
+        return {"medications": [], "error": "Claude API not configured"}
+
     try:
-        result = client._call_json(prompt, request.document_text)
+        # With section routing: the Medications and Plan sections
+        result = client._call_json(MEDICATIONS_PROMPT, select_text(document_text, "medications"))
         return result
     except Exception as e:
         return {"medications": [], "error": str(e)}
 
 
+@router.post("/extract-medications")
+async def extract_medications(request: MedicationRequest):
+    """
+    Extract medications from medical document
+
+    Returns: {medications: [{name, dosage, frequency, instructions}]}
+    """
+    return await run_in_threadpool(_extract_medications, request.document_text)
+
+
+@router.post("/documents/{document_id}/extract-medications")
+async def extract_medications_stored(document_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Extract medications from a stored document using its server-side text
+
+    Returns: {medications: [{name, dosage, frequency, instructions}]}
+    """
+    return await run_in_threadpool(_extract_medications, await load_document_text(db, document_id))
+
+
 @router.post("/check-interactions")
 async def check_medication_interactions(request: InteractionCheckRequest):
     """
@@ -86,7 +107,6 @@ Return JSON:
 }}"""
 
     try:
-        result = client._call_json(prompt, "")
-        return result
+        return await run_in_threadpool(client._call_json, prompt, "")
     except Exception as e:
         return {"interactions": [], "warnings": [str(e)], "error": str(e)}
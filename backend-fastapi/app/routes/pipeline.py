@@ -1,11 +1,24 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Optional
+import asyncio
+import base64
+import hashlib
+import orjson
+from datetime import datetime
+from fastapi import APIRouter, UploadFile, File, Form, Depends, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
 from app.db.database import get_db
-from app.db import crud
-from app.services.text_extract import extract_text_from_upload
-from app.services.storage_local import storage
+from app.db import crud, file_refs, payload as payload_codec, search
+from app.db.writer import writer as db_writer
+from app.services.text_cache import extract_text_cached, store_text
+from app.services.ingest import ingest_upload
+from app.services.storage import get_storage
 from app.services.claude_client import client
+from app.services import export, map_reduce, near_duplicate, packet_splitter, result_cache
+from app.config import settings
 
 router = APIRouter()
 
@@ -24,7 +37,8 @@ async def upload_document(
     file: UploadFile = File(...),
     run_pipeline: bool = Form(True),
     document_type_hint: Optional[str] = Form(None),  # <-- NEW
-    db: Session = Depends(get_db),
+    force: bool = Form(False),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Upload a document and optionally run the full pipeline.
@@ -33,49 +47,127 @@ async def upload_document(
       - file: PDF or TXT
       - run_pipeline: if true, runs classify -> extract_codes -> summarize
       - document_type_hint: optional, one of 5 types; if provided, classification is skipped
+      - force: if true, re-run the pipeline even when identical bytes were already processed
 
     Returns:
       {
         document_id: int,
         processed: bool,
-        results?: {classification, codes, summary}
+        deduplicated: bool,
+        near_duplicate_of?: {document_id, similarity},
+        text_stats?: {chars_before, chars_after, chars_saved, tokens_saved_est, ...},
+        results?: {classification, codes, summary, parts?}
       }
+
+    With settings.split_packets, uploads holding several reports (e.g. CBC +
+    BMP + X-ray) are split into parts stored as child documents;
+    results.parts lists them. force replaces any earlier parts.
     """
-    # 1) Extract text from file
+    # 0) Read the upload once: hash it, stage it in storage and spool it for extraction
+    writer = get_storage().open_writer(file.filename or "unknown.txt")
     try:
-        document_text = extract_text_from_upload(file)
-    except HTTPException as e:
-        raise e
+        upload = await ingest_upload(file, writer)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to process file: {str(e)}")
-
-    # 2) Validate that this is a medical document (not CV, resume, etc.)
-    # DISABLED to save API quota (validation uses 1 Claude API call)
-    # Each upload uses 3 calls: classify + extract_codes + summarize
-    # if run_pipeline:
-    #     try:
-    #         is_valid = client.validate_medical_document(document_text)
-    #         if not is_valid:
-    #             raise HTTPException(
-    #                 status_code=400,
-    #                 detail="This does not appear to be a medical document."
-    #             )
-    #     except HTTPException:
-    #         raise
-    #     except Exception as e:
-    #         pass
-
-    # Reset file pointer for storage
-    await file.seek(0)
-
-    # 2) Save file to local storage
+        raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
+
     try:
-        local_path = storage.save_file(file.file, file.filename or "unknown.txt")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+        # Deduplicate by content hash: identical bytes reuse the stored file and results
+        existing = await crud.get_document_by_hash(db, upload.content_hash)
+        if existing and not force:
+            existing_results = await crud.get_document_result(db, existing.id)
+            if existing_results is not None or not run_pipeline:
+                return {
+                    "document_id": existing.id,
+                    "processed": existing_results is not None,
+                    "deduplicated": True,
+                    "near_duplicate_of": None,
+                    "text_stats": None,
+                    "results": existing_results,
+                }
+
+        # 1) Extract text from the spooled upload (cached per content hash).
+        # For long PDFs without a type hint, classification starts on the
+        # first pages while the remaining pages are still being extracted.
+        early_classification: Optional[asyncio.Task] = None
+        early_pages = 0
+
+        def _classify_early(prefix: str) -> None:
+            nonlocal early_classification, early_pages
+            early_classification = asyncio.create_task(run_in_threadpool(client.classify, prefix))
+            early_pages = len(packet_splitter.split_pages(prefix))
+            # The result may go unused (packet split across the prefix, failed upload); don't warn about it
+            early_classification.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        try:
+            document_text, text_stats = await extract_text_cached(
+                db,
+                upload,
+                on_prefix=_classify_early if run_pipeline and not document_type_hint else None,
+            )
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Failed to process file: {str(e)}")
+
+        if text_stats:
+            print(
+                f"[INFO] Normalized text: saved {text_stats['chars_saved']} chars "
+                f"(~{text_stats['tokens_saved_est']} tokens per LLM call)"
+            )
+
+        # 2) Validate that this is a medical document (not CV, resume, etc.)
+        # DISABLED to save API quota (validation uses 1 Claude API call)
+        # Each upload uses 3 calls: classify + extract_codes + summarize
+        # if run_pipeline:
+        #     try:
+        #         is_valid = client.validate_medical_document(document_text)
+        #         if not is_valid:
+        #             raise HTTPException(
+        #                 status_code=400,
+        #                 detail="This does not appear to be a medical document."
+        #             )
+        #     except HTTPException:
+        #         raise
+        #     except Exception as e:
+        #         pass
+
+        if existing:
+            # Same bytes already stored: link to the existing file and record
+            doc = existing
+        else:
+            # 2) Publish the staged file in storage
+            try:
+                local_path = writer.commit(upload.content_hash)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+
+            # 3) Create DB record (a concurrent upload of the same bytes may win the unique hash).
+            # Writes go through the single-writer queue (see app.db.writer)
+            try:
+                doc = await db_writer.run(db, crud.create_document, upload.filename, local_path, upload.content_hash)
+            except IntegrityError:
+                await db.rollback()
+                doc = await crud.get_document_by_hash(db, upload.content_hash)
+            else:
+                # A delete may have purged the same content between publishing and
+                # counting this reference; publish again now that it is counted
+                writer.commit(upload.content_hash)
+    finally:
+        # Drop the staged copy (a published file is kept), and release the spool
+        writer.abort()
+        upload.close()
 
-    # 3) Create DB record
-    doc = crud.create_document(db, file.filename or "unknown.txt", local_path)
+    # 3b) Near-duplicate lookup (re-scans, changed headers/dates) before any LLM call
+    signature = await run_in_threadpool(near_duplicate.minhash, document_text)
+    near_dup = None
+    if signature:
+        if not force:
+            matches = await crud.find_near_duplicates(
+                db, signature, settings.near_dup_threshold, exclude_id=doc.id
+            )
+            if matches:
+                near_dup = {"document_id": matches[0][0], "similarity": round(matches[0][1], 3)}
+        await db_writer.run(db, crud.save_signature, doc.id, signature)
 
     # 4) Optionally run pipeline
     results = None
@@ -97,43 +189,57 @@ async def upload_document(
                     )
                 normalized_hint = candidate
 
-            # Step 1: classification (skip if user provided hint)
-            if normalized_hint:
-                classification = {
-                    "document_type": normalized_hint,
-                    "confidence": 1.0,
-                    "rationale": "User selected document type in UI; classification skipped.",
-                    "evidence": [],
-                }
-            else:
-                classification = client.classify(document_text)
+            if existing and force:
+                # Re-processing replaces the result, and with it any earlier packet parts
+                await _remove_files(db, await db_writer.run(db, crud.delete_parts, doc.id))
 
-            # Step 2: extract codes (use the resolved type)
-            resolved_type = classification.get("document_type")
-            codes = client.extract_codes(document_text, resolved_type)
+            prior = await crud.get_document_result(db, near_dup["document_id"]) if near_dup else None
 
-            # Step 3: summarize
-            summary = client.summarize(
-                document_text,
-                resolved_type,
-                codes.get("codes", []),
+            parts = (
+                packet_splitter.split_packet(document_text)
+                if settings.split_packets and not normalized_hint
+                else []
             )
 
-            conf = summary.get("confidence")
-            try:
-                conf = float(conf)
-            except Exception:
-                conf = None
-            summary["confidence"] = max(0.0, min(1.0, conf)) if conf is not None else (0.75 if codes.get("codes") else 0.5)
-            # Combine
-            results = {
-                "classification": classification,
-                "codes": codes,
-                "summary": summary,
-            }
+            if len(parts) > 1:
+                # Several reports in one upload: process each part as its own document.
+                # The early classification is already paid for: it stands for the first
+                # part when its pages fall within that part, or it agrees with its title
+                first_classification = None
+                if early_classification is not None:
+                    try:
+                        early = await early_classification
+                    except Exception:
+                        early = {}  # the parts are classified on their own anyway
+                    if early and (
+                        early_pages <= parts[0].end_page
+                        or early.get("document_type") == parts[0].document_type
+                    ):
+                        first_classification = early
+                results = await _process_packet(db, doc, parts, first_classification)
+            else:
+                # Step 1: classification (skip if user provided hint)
+                if normalized_hint:
+                    classification = {
+                        "document_type": normalized_hint,
+                        "confidence": 1.0,
+                        "rationale": "User selected document type in UI; classification skipped.",
+                        "evidence": [],
+                    }
+                elif early_classification is not None:
+                    # Classified from the first pages during extraction (already paid for)
+                    classification = await early_classification
+                elif prior is not None and prior.get("classification"):
+                    # Near-duplicate of an earlier document: its type carries over. Codes and
+                    # summary are always re-derived, since values and patient details may differ
+                    classification = prior["classification"]
+                else:
+                    classification = await run_in_threadpool(client.classify, document_text)
+
+                results = await _code_and_summarize(document_text, classification)
 
             # Persist results
-            crud.save_result(db, doc.id, results)
+            await db_writer.run(db, crud.save_result, doc.id, results)
 
         except HTTPException:
             # propagate validation errors cleanly
@@ -148,41 +254,424 @@ async def upload_document(
     return {
         "document_id": doc.id,
         "processed": run_pipeline,
+        "deduplicated": False,
+        "near_duplicate_of": near_dup,
+        "text_stats": text_stats,
         "results": results,
     }
 
 
+async def _code_and_summarize(document_text: str, classification: dict) -> dict:
+    """Pipeline steps 2-3 for classified text: extract codes, then summarize"""
+    # Step 2: extract codes (use the resolved type)
+    resolved_type = classification.get("document_type")
+    codes = await map_reduce.extract_codes(document_text, resolved_type)
+
+    # Step 3: summarize
+    summary = await map_reduce.summarize(
+        document_text,
+        resolved_type,
+        codes.get("codes", []),
+    )
+
+    conf = summary.get("confidence")
+    try:
+        conf = float(conf)
+    except Exception:
+        conf = None
+    summary["confidence"] = max(0.0, min(1.0, conf)) if conf is not None else (0.75 if codes.get("codes") else 0.5)
+    # Combine
+    return {
+        "classification": classification,
+        "codes": codes,
+        "summary": summary,
+    }
+
+
+async def _process_packet(
+    db: AsyncSession,
+    doc,
+    parts: List[packet_splitter.PacketPart],
+    first_classification: Optional[dict] = None,
+) -> dict:
+    """
+    Run the pipeline on each part of a multi-report upload
+
+    Parts are stored as child documents of the upload (text keyed by
+    the upload hash and part index) and processed concurrently: each is
+    classified on its own text (the first part may come classified
+    already), then coded and summarized. The upload's result lists the
+    parts with their merged codes.
+    """
+    children = []
+    for part in parts:
+        child_hash = hashlib.sha256(f"{doc.content_hash}:part:{part.index}".encode()).hexdigest()
+        child = await crud.get_document_by_hash(db, child_hash)
+        if child is None:
+            child = await db_writer.run(
+                db,
+                crud.create_document,
+                f"{doc.original_filename} [part {part.index + 1}: pages {part.start_page}-{part.end_page}]",
+                doc.local_path,
+                child_hash,
+                parent_id=doc.id,
+            )
+        await store_text(db, child_hash, part.text)
+        children.append(child)
+
+    async def run_part(part: packet_splitter.PacketPart) -> dict:
+        if part.index == 0 and first_classification is not None:
+            classification = first_classification
+        else:
+            classification = await run_in_threadpool(client.classify, part.text)
+        return await _code_and_summarize(part.text, classification)
+
+    part_results = await asyncio.gather(*(run_part(part) for part in parts))
+
+    summaries = []
+    for part, child, part_result in zip(parts, children, part_results):
+        await db_writer.run(db, crud.save_result, child.id, part_result)
+        summaries.append({
+            "document_id": child.id,
+            "pages": [part.start_page, part.end_page],
+            "document_type": part_result["classification"].get("document_type"),
+            "summary": part_result["summary"].get("summary"),
+        })
+
+    # The upload takes its first report's type (the UI and filters only know
+    # the report types); the index lists the parts under their own types
+    first = part_results[0]["classification"]
+    return {
+        "classification": {
+            "document_type": first.get("document_type"),
+            "confidence": first.get("confidence"),
+            "rationale": (
+                f"Upload split into {len(parts)} reports ("
+                + ", ".join(str(p["document_type"]) for p in summaries)
+                + "); classified as the first. See parts."
+            ),
+            "evidence": first.get("evidence", []),
+        },
+        "codes": map_reduce.merge_codes([r["codes"] for r in part_results]),
+        "summary": {
+            "summary": " ".join(f"{p['document_type']}: {p['summary']}" for p in summaries),
+            "bullets": [b for r in part_results for b in r["summary"].get("bullets", []) or []],
+            "citations": [c for r in part_results for c in r["summary"].get("citations", []) or []],
+            "confidence": min(r["summary"]["confidence"] for r in part_results),
+        },
+        "parts": summaries,
+    }
+
+
+def _encode_cursor(doc) -> str:
+    raw = f"{doc.created_at.isoformat()}|{doc.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, doc_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(doc_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Compact previews for listings (?include=results, POST /documents/batch)
+PREVIEW_SUMMARY_CHARS = 240
+PREVIEW_CODES = 5
+MAX_BATCH_IDS = 200
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class DocumentBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_IDS)
+
+
+def _preview(result) -> Optional[dict]:
+    """Type, short summary and top codes of a stored result"""
+    if result is None:
+        return None
+    payload = payload_codec.load(result.payload, result.payload_json) or {}
+    classification = payload.get("classification") or {}
+    codes = (payload.get("codes") or {}).get("codes") or []
+    summary = (payload.get("summary") or {}).get("summary") or ""
+    if len(summary) > PREVIEW_SUMMARY_CHARS:
+        summary = summary[:PREVIEW_SUMMARY_CHARS].rsplit(" ", 1)[0] + "…"
+    return {
+        "document_type": classification.get("document_type"),
+        "confidence": classification.get("confidence"),
+        "summary": summary,
+        "codes": [c.get("code") for c in codes[:PREVIEW_CODES]],
+        "code_count": len(codes),
+    }
+
+
+def _listing_item(doc, include_results: bool = False) -> dict:
+    item = {
+        "id": doc.id,
+        "original_filename": doc.original_filename,
+        "created_at": doc.created_at.isoformat(),
+        "local_path": doc.local_path,
+        "parent_id": doc.parent_id,
+    }
+    if include_results:
+        item["preview"] = _preview(doc.results)
+    return item
+
+
+def _stream_listing(docs, headers: Optional[dict] = None) -> StreamingResponse:
+    """
+    Stream a JSON array of listing items with previews
+
+    Items are encoded as the response is sent (no intermediate list), in
+    chunks of about STREAM_CHUNK_BYTES.
+    """
+    async def body():
+        chunk = bytearray(b"[")
+        for i, doc in enumerate(docs):
+            if i:
+                chunk += b","
+            chunk += orjson.dumps(_listing_item(doc, include_results=True))
+            if len(chunk) >= STREAM_CHUNK_BYTES:
+                yield bytes(chunk)
+                chunk.clear()
+        chunk += b"]"
+        yield bytes(chunk)
+
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
+
+
 @router.get("/documents")
-async def list_documents(db: Session = Depends(get_db)):
+async def list_documents(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    document_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    filename_prefix: Optional[str] = None,
+    include: Optional[str] = Query(None, pattern="^results$"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List documents, most recent first (50 per page by default).
+
+    Parts split from a packet upload are listed too, with parent_id set to
+    the packet document (null for uploads); see GET /documents/{id}/parts.
+
+    When more documents match, the X-Next-Cursor response header holds the
+    cursor for the next page: pass it back as ?cursor= with the same filters.
+    ?include=results adds a compact preview of each document's results.
     """
-    List most recent 50 documents.
+    include_results = include == "results"
+    docs = await crud.list_documents(
+        db,
+        limit=limit + 1,
+        before=_decode_cursor(cursor) if cursor else None,
+        document_type=document_type,
+        since=since,
+        until=until,
+        filename_prefix=filename_prefix,
+        include_results=include_results,
+    )
+    headers = {}
+    if len(docs) > limit:
+        docs = docs[:limit]
+        headers["X-Next-Cursor"] = _encode_cursor(docs[-1])
+    if include_results:
+        return _stream_listing(docs, headers=headers)
+    response.headers.update(headers)
+    return [_listing_item(doc) for doc in docs]
+
+
+@router.post("/documents/batch")
+async def get_documents_batch(request: DocumentBatchRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Get several documents with result previews in one request (up to 200 ids).
+
+    Returns the found documents in the order requested (unknown ids are
+    skipped), with the same items as GET /documents?include=results.
     """
-    docs = crud.list_documents(db, limit=50)
+    docs = await crud.get_documents_with_results(db, request.ids)
+    return _stream_listing(docs)
+
+
+def _indexed_listing(rows) -> list:
     return [
         {
             "id": doc.id,
             "original_filename": doc.original_filename,
             "created_at": doc.created_at.isoformat(),
             "local_path": doc.local_path,
+            "parent_id": doc.parent_id,
+            "confidence": confidence,
+        }
+        for doc, confidence in rows
+    ]
+
+
+@router.get("/documents/by-code/{code}")
+async def list_documents_by_code(
+    code: str,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List the most recent documents coded with an ICD-10 code (e.g. E11.9).
+    """
+    return _indexed_listing(await crud.list_documents_by_code(db, code, limit=limit))
+
+
+@router.get("/documents/by-type/{document_type}")
+async def list_documents_by_type(
+    document_type: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List the most recent documents of a type, optionally created in [since, until).
+    """
+    rows = await crud.list_documents_by_type(db, document_type, since=since, until=until, limit=limit)
+    return _indexed_listing(rows)
+
+
+@router.get("/documents/search")
+async def search_documents(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Full-text search over extracted text, summaries and code descriptions.
+
+    All terms must match; end a term with * for a prefix match (e.g. diab*)
+    and quote words for a phrase. Best matches first; the snippet is escaped
+    HTML with the matched words wrapped in <mark>.
+    """
+    if not search.search_supported(db):
+        raise HTTPException(status_code=501, detail="Full-text search requires SQLite (FTS5)")
+    hits = await search.search(db, q, limit=limit, offset=offset)
+    return [
+        {
+            "id": hit["id"],
+            "original_filename": hit["original_filename"],
+            "created_at": datetime.fromisoformat(hit["created_at"]).isoformat(),
+            "parent_id": hit["parent_id"],
+            "score": round(-hit["score"], 6),
+            "snippet": hit["snippet"],
         }
-        for doc in docs
+        for hit in hits
     ]
 
 
+@router.get("/documents/export")
+async def export_documents(
+    format: str = Query("ndjson", pattern="^(ndjson|parquet)$"),
+    document_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """
+    Export all processed documents with their results, in id order.
+
+    ?format=ndjson (default) streams one JSON object per line with the full
+    results; ?format=parquet streams a Parquet file with one row per
+    document and the results flattened into columns (needs pyarrow).
+    Memory use is constant however many documents are exported.
+    """
+    if format == "parquet" and not export.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow on the server")
+    filename = f"documents-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{format}"
+    return StreamingResponse(
+        export.chunks(format, document_type=document_type, since=since, until=until),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/documents/{document_id}")
-async def get_document(document_id: int, db: Session = Depends(get_db)):
+async def get_document(
+    document_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated result keys, e.g. summary,codes"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
     """
     Get document metadata and processing results (if any).
+
+    With ?fields=summary,codes only those parts of the results are returned.
+    Responses carry an ETag; send it back as If-None-Match to get a 304
+    when nothing changed.
     """
-    doc = crud.get_document(db, document_id)
+    projection = tuple(f.strip() for f in fields.split(",") if f.strip()) if fields else None
+    cached = result_cache.get(document_id, projection)
+    if cached is None:
+        read_token = result_cache.token()
+        row = await crud.get_document_with_result_json(
+            db, document_id, fields=list(projection) if projection else None
+        )
+        if row is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+
+        doc, results = row
+        head = orjson.dumps({
+            "id": doc.id,
+            "original_filename": doc.original_filename,
+            "created_at": doc.created_at.isoformat(),
+            "local_path": doc.local_path,
+            "parent_id": doc.parent_id,
+        })
+        # Splice the stored JSON in as-is rather than parsing and re-encoding it
+        body = head[:-1] + b',"results":' + (results or b"null") + b"}"
+        cached = result_cache.put(document_id, projection, body, read_token)
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if result_cache.etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+@router.get("/documents/{document_id}/parts")
+async def list_document_parts(document_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    List the parts split from a packet document, in page order (empty if it was not split).
+    """
+    doc = await crud.get_document(db, document_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
+    return [_listing_item(part) for part in await crud.list_child_documents(db, document_id)]
 
-    results = crud.get_document_result(db, document_id)
-    return {
-        "id": doc.id,
-        "original_filename": doc.original_filename,
-        "created_at": doc.created_at.isoformat(),
-        "local_path": doc.local_path,
-        "results": results,
-    }
+
+@router.delete("/documents/{document_id}", status_code=204)
+async def delete_document(document_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Delete a document with its results (and, for a packet, its parts).
+
+    The stored file is removed once no other document refers to it.
+    """
+    doc = await crud.get_document(db, document_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if doc.parent_id is not None:
+        raise HTTPException(status_code=409, detail="This is part of a packet; delete the packet document instead")
+    await _remove_files(db, await db_writer.run(db, crud.delete_document, document_id) or [])
+    return Response(status_code=204)
+
+
+async def _remove_files(db: AsyncSession, paths: List[str]) -> None:
+    """Remove stored files that no document refers to any more (see file_refs.purge)"""
+    storage = get_storage()
+
+    async def remove(path: str) -> None:
+        await run_in_threadpool(storage.delete_file, path)
+
+    for path in paths:
+        try:
+            await db_writer.run(db, file_refs.purge, path, remove)
+        except Exception as e:
+            await db.rollback()
+            print(f"[WARNING] Could not remove stored file {path}: {e}")
@@ -1,7 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List, Dict, Any
-from app.services.claude_client import client
+from app.db.database import get_db
+from app.services import map_reduce
+from app.services.text_cache import load_document_text
 
 router = APIRouter()
 
@@ -12,6 +15,11 @@ class SummarizeRequest(BaseModel):
     codes: Optional[List[Dict[str, Any]]] = None
 
 
+class StoredSummarizeRequest(BaseModel):
+    document_type: Optional[str] = None
+    codes: Optional[List[Dict[str, Any]]] = None
+
+
 @router.post("/summarize")
 async def summarize_document(request: SummarizeRequest):
     """
@@ -19,9 +27,27 @@ async def summarize_document(request: SummarizeRequest):
     
     Returns: {summary, confidence, evidence[]}
     """
-    result = client.summarize(
+    result = await map_reduce.summarize(
         request.document_text,
         request.document_type,
         request.codes
     )
     return result
+
+
+@router.post("/documents/{document_id}/summarize")
+async def summarize_stored_document(
+    document_id: int,
+    request: StoredSummarizeRequest = StoredSummarizeRequest(),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Generate clinical summary for a stored document using its server-side text
+    
+    Returns: {summary, confidence, evidence[]}
+    """
+    return await map_reduce.summarize(
+        await load_document_text(db, document_id),
+        request.document_type,
+        request.codes
+    )
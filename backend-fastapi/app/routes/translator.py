@@ -1,7 +1,11 @@
 # app/routes/translator.py
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_db
 from app.services.claude_client import client
+from app.services.text_cache import load_document_text
 
 router = APIRouter()
 
@@ -11,6 +15,10 @@ class TranslateRequest(BaseModel):
     target_language: str = "simple"  # simple, hindi, spanish, etc.
 
 
+class StoredTranslateRequest(BaseModel):
+    target_language: str = "simple"
+
+
 @router.post("/translate")
 async def translate_medical_text(request: TranslateRequest):
     """
@@ -24,8 +32,26 @@ async def translate_medical_text(request: TranslateRequest):
 
     Returns: {translated_text, explanations[{term, simple, meaning}]}
     """
-    result = client.translate_medical_terms(
+    return await run_in_threadpool(
+        client.translate_medical_terms,
         request.document_text,
         request.target_language
     )
-    return result
+
+
+@router.post("/documents/{document_id}/translate")
+async def translate_stored_document(
+    document_id: int,
+    request: StoredTranslateRequest = StoredTranslateRequest(),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Translate a stored document using its server-side extracted text
+
+    Returns: {translated_text, explanations[{term, simple, meaning}]}
+    """
+    return await run_in_threadpool(
+        client.translate_medical_terms,
+        await load_document_text(db, document_id),
+        request.target_language
+    )
@@ -5,6 +5,7 @@ from typing import Any, Dict, List
 
 from anthropic import Anthropic
 from app.config import settings
+from app.services.sectionizer import select_text
 
 
 def _parse_json_from_response(text: str) -> Dict[str, Any]:
@@ -186,7 +187,8 @@ Return JSON format:
 
 CODE ALL abnormalities, conditions, and diagnoses. If nothing abnormal, return empty codes array."""
 
-        return self._call_json(system_prompt, f"Document: {document_text}")
+        # With section routing: results, findings, impression, diagnoses, assessment and plan
+        return self._call_json(system_prompt, f"Document: {select_text(document_text, 'codes')}")
 
     def summarize(self, document_text: str, document_type: str, codes: list) -> Dict[str, Any]:
         """Generate patient-friendly summary of medical document"""
@@ -269,6 +271,9 @@ Return JSON with 'translated_text' and 'notes'."""
 
         codes_text = json.dumps(codes) if codes else "No codes"
 
+        # With section routing: impression, assessment and plan
+        document_text = select_text(document_text, "action_items")
+
         prompt = f"""Analyze this medical document and extract actionable items for the patient.
 
 Document: {document_text}
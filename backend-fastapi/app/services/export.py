@@ -0,0 +1,204 @@
+"""
+Bulk export of processed documents (NDJSON or Parquet)
+
+Rows are read with a server-side cursor (AsyncSession.stream, yield_per)
+in batches of EXPORT_BATCH_ROWS and written out batch by batch, so memory
+stays constant however many documents there are. Used by GET
+/documents/export and scripts/export_results.py.
+
+NDJSON: one object per document, {id, original_filename, created_at,
+parent_id, results}, with the stored result JSON spliced in unparsed.
+
+Parquet (needs pyarrow): one row per document with the result flattened
+into typed columns (document_type, summary, bullets, codes as a list of
+{code, description, confidence}, ...), one row group per batch.
+"""
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import orjson
+from sqlalchemy import select
+
+from app.db import payload as payload_codec
+from app.db.database import SessionLocal
+from app.db.models import Document, DocumentClassification, DocumentResult
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only the Parquet format needs pyarrow
+    pa = pq = None
+
+EXPORT_BATCH_ROWS = 5000
+FORMATS = ("ndjson", "parquet")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+async def _row_batches(
+    document_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> AsyncIterator[list]:
+    """Processed documents in id order, EXPORT_BATCH_ROWS at a time (own session)"""
+    query = (
+        select(
+            Document.id,
+            Document.original_filename,
+            Document.created_at,
+            Document.parent_id,
+            DocumentResult.payload,
+            DocumentResult.payload_json,
+        )
+        .join(DocumentResult, DocumentResult.document_id == Document.id)
+        .order_by(Document.id)
+        .execution_options(yield_per=EXPORT_BATCH_ROWS)
+    )
+    if document_type:
+        query = query.join(DocumentClassification, DocumentClassification.document_id == Document.id).where(
+            DocumentClassification.document_type == document_type.upper()
+        )
+    if since is not None:
+        query = query.where(Document.created_at >= since)
+    if until is not None:
+        query = query.where(Document.created_at < until)
+
+    async with SessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield rows
+
+
+# ---- NDJSON ----
+
+def ndjson_line(row) -> bytes:
+    doc_id, filename, created_at, parent_id, blob, legacy_json = row
+    head = orjson.dumps({
+        "id": doc_id,
+        "original_filename": filename,
+        "created_at": created_at.isoformat(),
+        "parent_id": parent_id,
+    })
+    results = payload_codec.load_json(blob, legacy_json) or b"null"
+    return head[:-1] + b',"results":' + results + b"}\n"
+
+
+async def ndjson_chunks(**filters: Any) -> AsyncIterator[bytes]:
+    """NDJSON export, one chunk per batch"""
+    async for rows in _row_batches(**filters):
+        yield b"".join(ndjson_line(row) for row in rows)
+
+
+# ---- Parquet ----
+
+def parquet_schema() -> "pa.Schema":
+    code = pa.struct([
+        ("code", pa.string()),
+        ("description", pa.string()),
+        ("confidence", pa.float64()),
+    ])
+    return pa.schema([
+        ("id", pa.int64()),
+        ("original_filename", pa.string()),
+        ("created_at", pa.timestamp("us")),
+        ("parent_id", pa.int64()),
+        ("document_type", pa.string()),
+        ("classification_confidence", pa.float64()),
+        ("summary", pa.string()),
+        ("bullets", pa.list_(pa.string())),
+        ("summary_confidence", pa.float64()),
+        ("codes", pa.list_(code)),
+        ("code_count", pa.int32()),
+        ("part_count", pa.int32()),
+    ])
+
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def flatten(row) -> Dict[str, Any]:
+    """One Parquet row (column -> value) for a document"""
+    doc_id, filename, created_at, parent_id, blob, legacy_json = row
+    payload = payload_codec.load(blob, legacy_json) or {}
+    classification = payload.get("classification") or {}
+    summary = payload.get("summary") or {}
+    codes = (payload.get("codes") or {}).get("codes") or []
+    return {
+        "id": doc_id,
+        "original_filename": filename,
+        "created_at": created_at,
+        "parent_id": parent_id,
+        "document_type": classification.get("document_type"),
+        "classification_confidence": _float(classification.get("confidence")),
+        "summary": summary.get("summary"),
+        "bullets": [str(b) for b in summary.get("bullets") or []],
+        "summary_confidence": _float(summary.get("confidence")),
+        "codes": [
+            {
+                "code": c.get("code"),
+                "description": c.get("description"),
+                "confidence": _float(c.get("confidence")),
+            }
+            for c in codes
+        ],
+        "code_count": len(codes),
+        "part_count": len(payload.get("parts") or []),
+    }
+
+
+class _Drain:
+    """Write-only file object whose contents are taken out after each row group"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def parquet_chunks(**filters: Any) -> AsyncIterator[bytes]:
+    """
+    Parquet export, one row group per batch, bytes yielded as each is written
+
+    Raises:
+        RuntimeError: if pyarrow is not installed
+    """
+    if pa is None:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+    schema = parquet_schema()
+    sink = _Drain()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for rows in _row_batches(**filters):
+            writer.write_batch(pa.RecordBatch.from_pylist([flatten(row) for row in rows], schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def chunks(fmt: str, **filters: Any) -> AsyncIterator[bytes]:
+    """Export stream in the given format ("ndjson" or "parquet")"""
+    if fmt == "parquet":
+        return parquet_chunks(**filters)
+    return ndjson_chunks(**filters)
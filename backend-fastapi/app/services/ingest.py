@@ -0,0 +1,117 @@
+"""
+Single-pass upload ingestion
+
+The upload body is read exactly once, in fixed-size chunks. Every chunk is
+fed to the SHA-256 hasher, the storage writer and a spool that text
+extraction reads afterwards, so peak memory per upload is bounded by
+CHUNK_SIZE + SPOOL_MAX_SIZE no matter how large the file is.
+"""
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Union
+
+from fastapi import UploadFile
+
+CHUNK_SIZE = 1024 * 1024          # 1 MiB per read
+SPOOL_MAX_SIZE = 8 * 1024 * 1024  # larger uploads spill to a temp file on disk
+
+
+class IngestedUpload:
+    """An upload that has been hashed, staged in storage and spooled for extraction"""
+
+    def __init__(self, filename: str, content_hash: str, size: int, buffer: io.BytesIO,
+                 path: Optional[str]):
+        self.filename = filename
+        self.content_hash = content_hash
+        self.size = size
+        self._buffer = buffer
+        self._path = path
+
+    @property
+    def extension(self) -> str:
+        return self.filename.lower().split(".")[-1] if "." in self.filename else ""
+
+    @property
+    def on_disk(self) -> bool:
+        """True when the spool has spilled to a named temp file (mmap-able)"""
+        return self._path is not None
+
+    def source(self) -> Union[str, bytes]:
+        """The spill file path, or the bytes for small in-memory uploads (for worker processes)"""
+        return self._path if self._path is not None else self._buffer.getvalue()
+
+    @contextmanager
+    def open(self) -> Iterator[BinaryIO]:
+        """
+        Yield a read-only, seekable view of the upload bytes
+
+        Spilled uploads are memory-mapped so extraction pages bytes in from
+        the temp file on demand instead of copying them into the heap.
+        """
+        if self._path is not None:
+            with open(self._path, "rb") as fh:
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    yield mm
+                finally:
+                    mm.close()
+        else:
+            self._buffer.seek(0)
+            yield self._buffer
+
+    def close(self) -> None:
+        self._buffer.close()
+        if self._path is not None:
+            try:
+                os.unlink(self._path)
+            except FileNotFoundError:
+                pass
+            self._path = None
+
+
+async def ingest_upload(file: UploadFile, writer) -> IngestedUpload:
+    """
+    Stream an upload once into the hasher, a storage writer and a spool
+
+    Args:
+        file: Incoming upload
+        writer: Storage writer from storage.open_writer(); left uncommitted
+
+    Returns:
+        IngestedUpload: hash, size and a handle for text extraction
+    """
+    hasher = hashlib.sha256()
+    buffer = io.BytesIO()
+    spill = None
+    size = 0
+    try:
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+            writer.write(chunk)
+            size += len(chunk)
+            if spill is None and size > SPOOL_MAX_SIZE:
+                # Roll over to a named file so extraction can mmap it or hand
+                # the path to worker processes
+                spill = tempfile.NamedTemporaryFile(prefix="upload-", delete=False)
+                spill.write(buffer.getbuffer())
+                buffer = io.BytesIO()
+            (spill or buffer).write(chunk)
+    except Exception:
+        writer.abort()
+        if spill is not None:
+            spill.close()
+            os.unlink(spill.name)
+        raise
+
+    path = None
+    if spill is not None:
+        spill.close()
+        path = spill.name
+    return IngestedUpload(file.filename or "unknown.txt", hasher.hexdigest(), size, buffer, path)
@@ -0,0 +1,141 @@
+"""
+Map-reduce processing for documents larger than the context budget
+
+Text over settings.chunk_token_budget is split on section/page boundaries
+into chunks under the budget. Each chunk is coded and summarized
+concurrently (map), then the results are merged (reduce): codes are unioned
+and deduplicated by ICD-10 code keeping the highest confidence, and the
+chunk summaries are summarized once more into a single patient summary.
+Latency then tracks the slowest chunk rather than the total size.
+"""
+import asyncio
+import re
+from typing import Any, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.services.claude_client import client
+from app.services.sectionizer import sectionize
+from app.services.text_extract import CHARS_PER_TOKEN, estimate_tokens
+
+
+def needs_chunking(text: str) -> bool:
+    return estimate_tokens(text) > settings.chunk_token_budget
+
+
+def _split_oversized(segment: str, max_chars: int) -> List[str]:
+    """Break one segment on paragraph/page breaks, then lines, then hard cuts"""
+    if len(segment) <= max_chars:
+        return [segment]
+    for sep in ("\n\n", "\n"):
+        parts = [p for p in segment.split(sep) if p.strip()]
+        if len(parts) > 1:
+            return [piece for part in parts for piece in _split_oversized(part, max_chars)]
+    return [segment[i:i + max_chars] for i in range(0, len(segment), max_chars)]
+
+
+def split_into_chunks(text: str, token_budget: Optional[int] = None) -> List[str]:
+    """
+    Split text into chunks of at most token_budget (estimated) tokens
+
+    Section boundaries are preferred, then page/paragraph breaks, then
+    lines; adjacent small segments are packed together greedily.
+    """
+    max_chars = (token_budget or settings.chunk_token_budget) * CHARS_PER_TOKEN
+    segments = [
+        piece
+        for section in sectionize(text)
+        for piece in _split_oversized(section.text, max_chars)
+    ]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for seg in segments:
+        if current and size + len(seg) + 2 > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(seg)
+        size += len(seg) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+async def _map(fn, items: List[Any], *args) -> List[Any]:
+    """Run a blocking client call over items concurrently (bounded)"""
+    semaphore = asyncio.Semaphore(max(1, settings.chunk_concurrency))
+
+    async def one(item):
+        async with semaphore:
+            return await run_in_threadpool(fn, item, *args)
+
+    return await asyncio.gather(*(one(item) for item in items))
+
+
+def _norm_code(code: str) -> str:
+    return re.sub(r"[^A-Z0-9.]", "", (code or "").upper())
+
+
+def merge_codes(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Union chunk codes, one entry per ICD-10 code with the max confidence"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        for code in result.get("codes", []) or []:
+            key = _norm_code(code.get("code", ""))
+            if not key:
+                continue
+            evidence = list(code.get("evidence") or [])
+            if key not in merged:
+                merged[key] = dict(code, evidence=evidence)
+                continue
+            kept = merged[key]
+            for quote in evidence:
+                if quote not in kept["evidence"]:
+                    kept["evidence"].append(quote)
+            if (code.get("confidence") or 0) > (kept.get("confidence") or 0):
+                kept.update({k: v for k, v in code.items() if k != "evidence"})
+    return {"codes": sorted(merged.values(), key=lambda c: c.get("confidence") or 0, reverse=True)}
+
+
+async def extract_codes(document_text: str, document_type: Optional[str]) -> Dict[str, Any]:
+    """client.extract_codes, chunked when the text exceeds the token budget"""
+    if not needs_chunking(document_text):
+        return await run_in_threadpool(client.extract_codes, document_text, document_type)
+    chunks = split_into_chunks(document_text)
+    results = await _map(client.extract_codes, chunks, document_type)
+    merged = merge_codes(results)
+    merged["chunks"] = len(chunks)
+    return merged
+
+
+async def summarize(document_text: str, document_type: Optional[str], codes: Optional[list]) -> Dict[str, Any]:
+    """
+    client.summarize, hierarchical when the text exceeds the token budget
+
+    Each chunk is summarized concurrently; the chunk summaries and bullets
+    are then summarized together. Citations are the union of the chunk
+    citations, since only the chunks saw the original wording.
+    """
+    if not needs_chunking(document_text):
+        return await run_in_threadpool(client.summarize, document_text, document_type, codes)
+
+    chunks = split_into_chunks(document_text)
+    partials = await _map(client.summarize, chunks, document_type, codes)
+
+    digest = "\n\n".join(
+        f"Part {i} of {len(partials)}:\n{p.get('summary', '')}\n"
+        + "\n".join(f"- {b}" for b in p.get("bullets", []) or [])
+        for i, p in enumerate(partials, start=1)
+    )
+    final = await run_in_threadpool(client.summarize, digest, document_type, codes)
+
+    citations: List[str] = []
+    for p in partials:
+        for quote in p.get("citations", []) or []:
+            if quote not in citations:
+                citations.append(quote)
+    final["citations"] = citations
+    final["chunks"] = len(chunks)
+    return final
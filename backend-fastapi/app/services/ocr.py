@@ -0,0 +1,257 @@
+"""
+Local OCR for image uploads and scanned PDFs
+
+Engines are pluggable (see OCR_ENGINES); the built-in one shells out to the
+Tesseract CLI. Pages are recognized in the shared PDF process pool, one task
+per page (PDF page or image frame, e.g. of a multi-page TIFF fax), so a
+scanned packet uses every core. Each worker limits Tesseract
+to one thread (OMP_THREAD_LIMIT=1) so page-level parallelism is not
+oversubscribed.
+
+Images are preprocessed before recognition with Pillow (in
+requirements.txt): converted to greyscale, downscaled so the long side is
+at most settings.ocr_max_side pixels, and binarized. Scans are often
+400-600 dpi; OCR time grows with pixel count while accuracy does not
+improve past ~300 dpi. If Pillow is missing, OCR still runs in a degraded
+mode, logged once: images are passed to the engine as they are (JPEG
+streams as-is, 8-bit grey/RGB PDF images wrapped as PGM/PPM) and other
+PDF image formats are skipped.
+
+OCR output is cached like any other extraction: extract_text_cached stores
+it per content hash, so a scan is recognized only once.
+"""
+import asyncio
+import io
+import os
+import shutil
+import subprocess
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Protocol, Type
+
+from fastapi import HTTPException
+from pypdf.generic import ArrayObject
+
+from app.config import settings
+from app.services import pdf_pool
+
+try:
+    from PIL import Image, ImageSequence
+except ImportError:  # degraded mode: no preprocessing, non-JPEG/PNM PDF images skipped
+    Image = ImageSequence = None
+
+IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "tif", "tiff"}
+
+# Filters whose stream data is already a standalone image file
+_PASSTHROUGH_FILTERS = {"/DCTDecode", "/JPXDecode"}
+
+
+class OcrEngine(Protocol):
+    """What an OCR engine provides; recognize() runs inside a pool worker"""
+
+    name: str
+
+    @classmethod
+    def available(cls) -> bool:
+        """True if the engine can run here (binary on PATH, model installed, ...)"""
+        ...
+
+    def recognize(self, image: bytes) -> str:
+        """Text of one encoded image (JPEG, PNG, PGM/PPM, ...)"""
+        ...
+
+
+class TesseractEngine:
+    """Tesseract via its CLI (image on stdin, text on stdout)"""
+
+    name = "tesseract"
+
+    @classmethod
+    def available(cls) -> bool:
+        return shutil.which(settings.tesseract_cmd) is not None
+
+    def recognize(self, image: bytes) -> str:
+        result = subprocess.run(
+            [settings.tesseract_cmd, "stdin", "stdout", "-l", settings.ocr_lang, "--psm", "3"],
+            input=image,
+            capture_output=True,
+            timeout=settings.ocr_timeout,
+            env={**os.environ, "OMP_THREAD_LIMIT": "1"},
+            check=False,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode("utf-8", "replace").strip() or "tesseract failed")
+        return result.stdout.decode("utf-8", "replace")
+
+
+# settings.ocr_engine names one of these; any other value ("none") disables OCR
+OCR_ENGINES: Dict[str, Type[OcrEngine]] = {
+    "tesseract": TesseractEngine,
+}
+
+_warned_degraded = False
+
+
+def get_engine() -> Optional[OcrEngine]:
+    """The configured engine, or None if OCR is disabled or unavailable"""
+    engine_cls = OCR_ENGINES.get(settings.ocr_engine.lower())
+    if engine_cls is None or not engine_cls.available():
+        return None
+    return engine_cls()
+
+
+def available() -> bool:
+    """True if the configured engine can run (logs the degraded mode once)"""
+    global _warned_degraded
+    engine = get_engine()
+    if engine is not None and Image is None and not _warned_degraded:
+        print("[WARNING] Pillow is not installed: OCR runs without preprocessing "
+              "and skips PDF images that are not JPEG or 8-bit grey/RGB")
+        _warned_degraded = True
+    return engine is not None
+
+
+# ---- Worker-side functions (run in the process pool) ----
+
+def preprocess(image: bytes, frame: int = 0) -> bytes:
+    """Greyscale, downscale and binarize one frame of an image (no-op without Pillow)"""
+    if Image is None:
+        return image
+    img = ImageSequence.Iterator(Image.open(io.BytesIO(image)))[frame]
+    img = img.convert("L")
+    longest = max(img.size)
+    if longest > settings.ocr_max_side:
+        scale = settings.ocr_max_side / longest
+        img = img.resize((round(img.width * scale), round(img.height * scale)), Image.LANCZOS)
+    if settings.ocr_binarize_threshold:
+        threshold = settings.ocr_binarize_threshold
+        img = img.point(lambda p: 255 if p > threshold else 0, mode="1")
+    out = io.BytesIO()
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+
+_PNM_FORMATS = {"/DeviceGray": b"P5", "/DeviceRGB": b"P6"}
+
+
+def _to_pnm(xobj) -> Optional[bytes]:
+    """Wrap 8-bit grey/RGB samples in a PGM/PPM header (no Pillow needed)"""
+    magic = _PNM_FORMATS.get(xobj.get("/ColorSpace"))
+    if magic is None or xobj.get("/BitsPerComponent") != 8:
+        return None
+    header = b"%s\n%d %d\n255\n" % (magic, xobj["/Width"], xobj["/Height"])
+    return header + xobj.get_data()
+
+
+def _page_images(page) -> List[bytes]:
+    """Encoded images drawn on a PDF page"""
+    resources = page.get("/Resources")
+    xobjects = resources.get_object().get("/XObject") if resources is not None else None
+    if xobjects is None:
+        return []
+    images = []
+    for name in xobjects.get_object():
+        xobj = xobjects.get_object()[name].get_object()
+        if xobj.get("/Subtype") != "/Image":
+            continue
+        filters = xobj.get("/Filter")
+        filters = list(filters) if isinstance(filters, ArrayObject) else [filters]
+        pnm = None if filters[-1] in _PASSTHROUGH_FILTERS else _to_pnm(xobj)
+        if len(filters) == 1 and filters[0] in _PASSTHROUGH_FILTERS:
+            images.append(xobj.get_data())  # the stream is the JPEG/JPEG 2000 file
+        elif pnm is not None:
+            images.append(pnm)
+        elif Image is not None:
+            out = io.BytesIO()
+            page.images[name].image.save(out, format="PNG")
+            images.append(out.getvalue())
+    return images
+
+
+def _read_image(image: pdf_pool.PdfSource) -> bytes:
+    if isinstance(image, str):
+        with open(image, "rb") as fh:
+            return fh.read()
+    return image
+
+
+def image_frame_count(image: pdf_pool.PdfSource) -> int:
+    """Number of frames (pages) in an image; 1 without Pillow (runs in a worker)"""
+    if Image is None:
+        return 1
+    with Image.open(io.BytesIO(_read_image(image))) as img:
+        return getattr(img, "n_frames", 1)
+
+
+def ocr_image(image: pdf_pool.PdfSource, frame: int = 0) -> str:
+    """Recognize one frame of an image, given as bytes or a path (runs in a worker)"""
+    engine = get_engine()
+    if engine is None:
+        raise RuntimeError(f"OCR engine '{settings.ocr_engine}' is not available")
+    return engine.recognize(preprocess(_read_image(image), frame))
+
+
+def ocr_pdf_page(source: pdf_pool.PdfSource, index: int) -> str:
+    """Recognize the images on one PDF page (runs in a worker)"""
+    reader, mm = pdf_pool._open_reader(source)
+    try:
+        images = _page_images(reader.pages[index])
+        return "\n".join(ocr_image(image) for image in images)
+    finally:
+        if mm is not None:
+            mm.close()
+
+
+# ---- Async API ----
+
+async def _run(executor, tasks: list, timeout: Optional[float]) -> list:
+    timeout = settings.ocr_timeout if timeout is None else timeout
+    try:
+        return await asyncio.wait_for(asyncio.gather(*tasks), timeout)
+    except asyncio.TimeoutError:
+        pdf_pool.recycle(executor)  # stop the workers still recognizing
+        raise HTTPException(status_code=400, detail=f"OCR timed out after {timeout:g}s")
+    except BrokenProcessPool:
+        raise pdf_pool.pool_restarted_error()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"OCR failed: {str(e)}")
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def ocr_pdf_pages(
+    source: pdf_pool.PdfSource,
+    pages: List[int],
+    timeout: Optional[float] = None,
+) -> List[str]:
+    """
+    OCR the given PDF pages in parallel, one pool task per page
+
+    Returns:
+        Page texts in the order of pages
+
+    Raises:
+        HTTPException: 400 if recognition fails or exceeds the timeout (the
+        pool is then recycled, see pdf_pool.recycle), 503 if the pool was recycled
+    """
+    loop = asyncio.get_running_loop()
+    executor = pdf_pool.get_executor()
+    tasks = [loop.run_in_executor(executor, ocr_pdf_page, source, i) for i in pages]
+    return await _run(executor, tasks, timeout)
+
+
+async def ocr_image_pages(source: pdf_pool.PdfSource, timeout: Optional[float] = None) -> List[str]:
+    """
+    OCR an uploaded image (path or bytes) in parallel, one pool task per frame
+
+    Returns:
+        Page texts, one per frame (a multi-page TIFF yields several)
+
+    Raises:
+        HTTPException: as ocr_pdf_pages
+    """
+    loop = asyncio.get_running_loop()
+    executor = pdf_pool.get_executor()
+    count = await _run(executor, [loop.run_in_executor(executor, image_frame_count, source)], timeout)
+    tasks = [loop.run_in_executor(executor, ocr_image, source, i) for i in range(count[0])]
+    return await _run(executor, tasks, timeout)
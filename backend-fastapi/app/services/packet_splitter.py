@@ -0,0 +1,167 @@
+"""
+Multi-document packet splitter
+
+Patients often upload one PDF holding several reports back to back (a CBC,
+a BMP, then an X-ray report). The splitter finds the report boundaries from
+page-level heuristics so each part can be classified, coded and summarized
+on its own.
+
+A title alone is weak evidence (a note may open a page with "CT" or
+"CBC"), so a page starts a new part only when one of its first lines is a
+report title (e.g. "COMPLETE BLOOD COUNT", "CHEST X-RAY", "PROGRESS NOTE")
+that differs from the title of the current part AND the page names a
+different patient (name/MRN) or a different report date than the current
+part. Pages that say they are a continuation never start a part, and
+consecutive reports with the same title stay in one part.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Document type -> title spellings that open a report of that type
+REPORT_TITLES: Dict[str, List[str]] = {
+    "COMPLETE BLOOD COUNT": ["complete blood count", "cbc", "hematology report", "hemogram"],
+    "BASIC METABOLIC PANEL": [
+        "basic metabolic panel", "bmp", "comprehensive metabolic panel", "cmp",
+        "chemistry panel", "metabolic panel",
+    ],
+    "X-RAY": ["x-ray", "xray", "radiograph", "chest x-ray", "chest radiograph", "cxr"],
+    "CT": ["ct", "computed tomography", "ct scan", "cat scan"],
+    "CLINICAL NOTE": [
+        "progress note", "clinic note", "office visit", "history and physical", "h&p",
+        "discharge summary", "consultation", "consult note", "clinical note", "visit note",
+    ],
+}
+
+TITLE_LINES = 3        # a title must appear in the first N lines of a page
+MAX_TITLE_CHARS = 80   # longer lines are prose, not titles
+
+_ALIAS_TO_TYPE = {
+    alias: doc_type
+    for doc_type, aliases in REPORT_TITLES.items()
+    for alias in aliases
+}
+
+# A title line starts with one alias as a whole word, optionally after a
+# department prefix: "CBC WITH DIFFERENTIAL", "CT ABDOMEN/PELVIS",
+# "RADIOLOGY REPORT: CHEST X-RAY". "CBC: WBC 5.2" is a result line, not a title.
+_TITLE_PREFIX = r"(?:(?:radiology|imaging|laboratory|lab|diagnostic|final|preliminary)(?: report)?[:\s-]+){0,2}"
+_TITLE_RE = re.compile(
+    r"^" + _TITLE_PREFIX + r"(?P<title>"
+    + "|".join(re.escape(a) for a in sorted(_ALIAS_TO_TYPE, key=len, reverse=True))
+    + r")(?![\w&-])(?!\s*:)",
+    re.IGNORECASE,
+)
+_CONTINUED_RE = re.compile(r"\(?\b(?:continued|cont'd|cont\.)\)?", re.IGNORECASE)
+
+# Identity evidence: the first date on a page (birth dates aside), and a
+# labelled patient name or MRN
+_DATE_RE = re.compile(
+    r"\b(?:\d{4}-\d{1,2}-\d{1,2}|\d{1,2}/\d{1,2}/\d{2,4}"
+    r"|(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.? \d{1,2},? \d{4})\b",
+    re.IGNORECASE,
+)
+_BIRTH_DATE_RE = re.compile(r"^.*\b(?:dob|date of birth|birth ?date)\b.*$", re.IGNORECASE | re.MULTILINE)
+_PATIENT_RE = re.compile(
+    r"^[ \t]*(?:(?P<name>patient(?: name)?|name)|mrn|medical record(?: number| no\.?)?)[ \t]*[:#]"
+    r"[ \t]*(?P<value>\S.*?)[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+class PacketPart:
+    """A run of pages forming one report"""
+
+    __slots__ = ("index", "start_page", "end_page", "document_type", "text")
+
+    def __init__(self, index: int, start_page: int, end_page: int,
+                 document_type: Optional[str], text: str):
+        self.index = index
+        self.start_page = start_page
+        self.end_page = end_page
+        self.document_type = document_type
+        self.text = text
+
+    def __repr__(self) -> str:
+        return f"PacketPart({self.index}, pages {self.start_page}-{self.end_page}, {self.document_type!r})"
+
+
+def page_title(page: str) -> Optional[str]:
+    """Document type whose title opens this page, or None"""
+    lines = page.split("\n", TITLE_LINES)[:TITLE_LINES]
+    if any(_CONTINUED_RE.search(line) for line in lines):
+        return None
+    for line in lines:
+        if len(line) > MAX_TITLE_CHARS:
+            continue
+        match = _TITLE_RE.match(line.strip())
+        if match:
+            return _ALIAS_TO_TYPE[match.group("title").lower()]
+    return None
+
+
+def page_identity(page: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (patient, date) named on this page, each None when absent
+
+    The patient is "name:<name>" or "mrn:<number>", whichever label comes
+    first, so a name is never compared with an MRN.
+    """
+    patient = _PATIENT_RE.search(page)
+    date = _DATE_RE.search(_BIRTH_DATE_RE.sub("", page))
+    if patient:
+        kind = "name" if patient.group("name") else "mrn"
+        patient = f"{kind}:{' '.join(patient.group('value').lower().split())}"
+    return patient, date.group(0).lower() if date else None
+
+
+def _differs(current: Optional[str], new: Optional[str]) -> bool:
+    return current is not None and new is not None and current != new
+
+
+def _other_patient(current: Optional[str], new: Optional[str]) -> bool:
+    return _differs(current, new) and current.split(":", 1)[0] == new.split(":", 1)[0]
+
+
+def split_pages(text: str) -> List[str]:
+    """The pages of normalized text: the blank-line separated blocks produced by normalize_pages"""
+    return [page for page in text.split("\n\n") if page.strip()]
+
+
+def split_packet(text: str) -> List[PacketPart]:
+    """
+    Split normalized document text into report parts
+
+    Pages are as split_pages() returns them. The first patient and date
+    seen in a part identify it. Page numbers in the returned parts are
+    1-based and inclusive.
+
+    Returns:
+        One PacketPart per detected report; a single part when no
+        boundary is found
+    """
+    pages = split_pages(text)
+    parts: List[PacketPart] = []
+    current_type: Optional[str] = None
+    current_patient: Optional[str] = None
+    current_date: Optional[str] = None
+    start = 0
+
+    for i, page in enumerate(pages):
+        doc_type = page_title(page)
+        patient, date = page_identity(page)
+        if (
+            i > 0
+            and doc_type is not None
+            and doc_type != current_type
+            and (_other_patient(current_patient, patient) or _differs(current_date, date))
+        ):
+            parts.append(PacketPart(len(parts), start + 1, i, current_type, "\n\n".join(pages[start:i])))
+            start, current_type, current_patient, current_date = i, doc_type, None, None
+        if i == 0:
+            current_type = doc_type
+        current_patient = current_patient or patient
+        current_date = current_date or date
+
+    if pages:
+        parts.append(PacketPart(len(parts), start + 1, len(pages), current_type, "\n\n".join(pages[start:])))
+    return parts
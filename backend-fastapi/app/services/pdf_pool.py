@@ -0,0 +1,305 @@
+"""
+PDF text extraction in a process pool
+
+pypdf's page.extract_text() is pure Python and CPU bound. Running it inside
+an async route blocks the event loop for the whole document, so extraction
+is handed to a ProcessPoolExecutor instead. Large PDFs are split into page
+ranges that workers extract in parallel; results are reassembled in page
+order.
+
+Cancelling a future does not stop a task a worker has already started, so
+a timed-out extraction would keep its workers busy (a pathological PDF,
+indefinitely). On timeout the pool is recycled instead: the next caller
+gets a fresh pool and the old pool's worker processes are terminated.
+Other requests still waiting on the old pool fail with 503 and can retry.
+"""
+import asyncio
+import io
+import math
+import mmap
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException
+from pypdf import PdfReader
+
+from app.config import settings
+
+PdfSource = Union[str, bytes]  # path to a file on disk, or the raw bytes
+
+_executor: Optional[ProcessPoolExecutor] = None
+_workers = 1
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Create the shared pool on first use (spawned workers, safe with threads)"""
+    global _executor, _workers
+    if _executor is None:
+        _workers = settings.pdf_workers or os.cpu_count() or 1
+        _executor = ProcessPoolExecutor(
+            max_workers=_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown() -> None:
+    """Stop the pool (app shutdown hook)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def recycle(executor: ProcessPoolExecutor) -> None:
+    """
+    Replace a pool whose workers are stuck on timed-out tasks
+
+    The shared pool is rebuilt on next use; the old one stops accepting
+    work and its worker processes are terminated.
+    """
+    global _executor
+    if _executor is executor:
+        _executor = None
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    print(f"[WARNING] Recycled the PDF worker pool ({len(processes)} workers terminated after a timeout)")
+
+
+def pool_restarted_error() -> HTTPException:
+    """The error for work lost when another request recycled the pool"""
+    return HTTPException(status_code=503, detail="PDF worker pool was restarted; please retry")
+
+
+def _open_reader(source: PdfSource) -> Tuple[PdfReader, Optional[mmap.mmap]]:
+    if isinstance(source, bytes):
+        return PdfReader(io.BytesIO(source)), None
+    with open(source, "rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    return PdfReader(mm), mm
+
+
+def count_pages(source: PdfSource) -> int:
+    """Number of pages in the PDF (runs in a worker)"""
+    reader, mm = _open_reader(source)
+    try:
+        return len(reader.pages)
+    finally:
+        if mm is not None:
+            mm.close()
+
+
+def extract_page_range(source: PdfSource, start: int, end: int) -> List[str]:
+    """Extract the text of pages [start, end) (runs in a worker)"""
+    reader, mm = _open_reader(source)
+    try:
+        return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+    finally:
+        if mm is not None:
+            mm.close()
+
+
+# ---- Scanned-PDF probe ----
+
+PROBE_MIN_PAGE_CHARS = 20  # fewer extracted characters than this means "no text layer"
+
+_TEXT_OP_RE = re.compile(rb"\bBT\b")
+
+
+def _xobject_subtypes(page) -> set:
+    resources = page.get("/Resources")
+    resources = resources.get_object() if resources is not None else {}
+    xobjects = resources.get("/XObject")
+    if xobjects is None:
+        return set()
+    xobjects = xobjects.get_object()
+    return {str(xobjects[name].get_object().get("/Subtype")) for name in xobjects}
+
+
+def sample_pages(page_count: int, samples: int) -> List[int]:
+    """Evenly spaced page indices, always including the first and last page"""
+    if page_count <= samples:
+        return list(range(page_count))
+    if samples <= 1:
+        return [0]
+    step = (page_count - 1) / (samples - 1)
+    return sorted({round(i * step) for i in range(samples)})
+
+
+def probe_pdf(source: PdfSource, samples: int) -> Dict[str, object]:
+    """
+    Classify a PDF as "text", "scanned" or "mixed" from a few sampled pages (runs in a worker)
+
+    Each sampled page's content stream is scanned for text operators (BT)
+    and its resources for image XObjects. Only pages that can hold text
+    (text operators or form XObjects) are passed to extract_text, so an
+    image-only PDF is classified without any text extraction.
+    """
+    reader, mm = _open_reader(source)
+    try:
+        page_count = len(reader.pages)
+        text_pages = image_pages = 0
+        sampled = sample_pages(page_count, samples)
+        for i in sampled:
+            page = reader.pages[i]
+            contents = page.get_contents()
+            data = contents.get_data() if contents is not None else b""
+            subtypes = _xobject_subtypes(page)
+            has_text = False
+            if _TEXT_OP_RE.search(data) or "/Form" in subtypes:
+                has_text = len((page.extract_text() or "").strip()) >= PROBE_MIN_PAGE_CHARS
+            if has_text:
+                text_pages += 1
+            elif "/Image" in subtypes:
+                image_pages += 1
+
+        if text_pages == len(sampled):
+            kind = "text"
+        elif text_pages == 0 and image_pages > 0:
+            kind = "scanned"
+        elif text_pages == 0:
+            kind = "empty"
+        else:
+            kind = "mixed"
+        return {
+            "kind": kind,
+            "page_count": page_count,
+            "sampled": len(sampled),
+            "text_pages": text_pages,
+            "image_pages": image_pages,
+        }
+    finally:
+        if mm is not None:
+            mm.close()
+
+
+async def probe(source: PdfSource, timeout: Optional[float] = None) -> Dict[str, object]:
+    """
+    Run probe_pdf in the pool on settings.pdf_probe_pages sampled pages
+
+    Raises:
+        HTTPException: 400 if the PDF cannot be parsed or the probe times
+        out (the pool is then recycled), 503 if the pool was recycled
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    timeout = settings.pdf_extract_timeout if timeout is None else timeout
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(executor, probe_pdf, source, settings.pdf_probe_pages),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        recycle(executor)
+        raise HTTPException(status_code=400, detail=f"PDF inspection timed out after {timeout:g}s")
+    except BrokenProcessPool:
+        raise pool_restarted_error()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to read PDF: {str(e)}")
+
+
+def page_ranges(page_count: int, pages_per_task: int, first: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Split [0, page_count) into consecutive ranges of at most pages_per_task pages
+
+    If first is given, the first range is capped at that many pages so the
+    opening pages of a long document come back quickly.
+    """
+    step = max(1, pages_per_task)
+    ranges = []
+    start = 0
+    if first:
+        ranges.append((0, min(first, page_count)))
+        start = ranges[0][1]
+    ranges.extend((s, min(s + step, page_count)) for s in range(start, page_count, step))
+    return [r for r in ranges if r[0] < r[1]]
+
+
+async def iter_pdf_pages(
+    source: PdfSource,
+    first_range: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[Tuple[int, int, str]]:
+    """
+    Stream page texts in page order while later ranges are still extracting
+
+    All page ranges are submitted to the pool up front; pages are yielded
+    as soon as their range (and every range before it) has finished.
+
+    Args:
+        source: Path to the PDF on disk, or its bytes
+        first_range: Optional size of the first range (see page_ranges)
+        timeout: Seconds for the whole document (defaults to settings.pdf_extract_timeout)
+
+    Yields:
+        (page_index, page_count, text) with "" for pages without text
+
+    Raises:
+        HTTPException: 400 if the PDF cannot be parsed or extraction times
+        out (the pool is then recycled), 503 if the pool was recycled
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    timeout = settings.pdf_extract_timeout if timeout is None else timeout
+    deadline = loop.time() + timeout
+    futures: List[asyncio.Future] = []
+
+    def remaining() -> float:
+        return max(0.0, deadline - loop.time())
+
+    try:
+        page_count = await asyncio.wait_for(
+            loop.run_in_executor(executor, count_pages, source), remaining()
+        )
+        # Every task re-opens the PDF, so use one range per worker unless
+        # that would make ranges smaller than pdf_pages_per_task
+        per_task = max(settings.pdf_pages_per_task, math.ceil(page_count / _workers))
+        for start, end in page_ranges(page_count, per_task, first_range):
+            futures.append(loop.run_in_executor(executor, extract_page_range, source, start, end))
+
+        index = 0
+        for future in futures:
+            for text in await asyncio.wait_for(future, remaining()):
+                yield index, page_count, text
+                index += 1
+    except asyncio.TimeoutError:
+        recycle(executor)
+        raise HTTPException(
+            status_code=400,
+            detail=f"PDF text extraction timed out after {timeout:g}s"
+        )
+    except HTTPException:
+        raise
+    except BrokenProcessPool:
+        raise pool_restarted_error()
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to extract text from PDF: {str(e)}"
+        )
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+async def extract_pdf_pages(source: PdfSource, timeout: Optional[float] = None) -> List[str]:
+    """
+    Extract every page's text off the event loop, in parallel page ranges
+
+    Returns:
+        List[str]: Page texts in page order ("" for pages without text)
+    """
+    return [text async for _, _, text in iter_pdf_pages(source, timeout=timeout)]
+
+
+async def extract_pdf_text(source: PdfSource, timeout: Optional[float] = None) -> str:
+    """Extract a PDF's text off the event loop (same joining as extract_text_from_pdf)"""
+    pages = await extract_pdf_pages(source, timeout)
+    return "\n\n".join(text for text in pages if text)
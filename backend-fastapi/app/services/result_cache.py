@@ -0,0 +1,117 @@
+"""
+Read-through cache for GET /documents/{id}
+
+Rendered response bodies (metadata + results, per ?fields= projection)
+are kept in an in-process LRU bounded by settings.result_cache_max_bytes,
+each with a strong ETag (hash of the body). A request whose If-None-Match
+matches a cached ETag is answered 304 without touching the DB.
+
+Results only change when crud.save_result runs (e.g. a forced re-run).
+save_result marks the document on its session and the cached responses are
+dropped once that transaction commits (invalidate() is the hook). A
+response rendered from a read that raced with the commit is not cached.
+The cache is per process: with several workers, each invalidates only its
+own copy, so a worker may serve a regenerated result's old version until
+it evicts it.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+Key = Tuple[int, Optional[Tuple[str, ...]]]  # (document id, fields projection)
+
+_PENDING = "result_cache_invalidate"
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+_lru: "OrderedDict[Key, CachedResponse]" = OrderedDict()
+_keys_by_doc: Dict[int, Set[Key]] = {}
+_lru_bytes = 0
+_invalidations = 0
+
+
+def token() -> int:
+    """Take before reading from the DB; put() ignores bodies read before an invalidation"""
+    return _invalidations
+
+
+def get(document_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[CachedResponse]:
+    entry = _lru.get((document_id, fields))
+    if entry is not None:
+        _lru.move_to_end((document_id, fields))
+    return entry
+
+
+def _drop(key: Key) -> None:
+    global _lru_bytes
+    entry = _lru.pop(key)
+    _lru_bytes -= len(entry.body)
+    keys = _keys_by_doc[key[0]]
+    keys.discard(key)
+    if not keys:
+        del _keys_by_doc[key[0]]
+
+
+def put(
+    document_id: int, fields: Optional[Tuple[str, ...]], body: bytes, read_token: int
+) -> CachedResponse:
+    """Cache a rendered body (if still current and small enough) and return it with its ETag"""
+    global _lru_bytes
+    entry = CachedResponse(body)
+    key = (document_id, fields)
+    if read_token != _invalidations or len(body) > settings.result_cache_max_bytes:
+        return entry
+    if key in _lru:
+        _drop(key)
+    _lru[key] = entry
+    _keys_by_doc.setdefault(document_id, set()).add(key)
+    _lru_bytes += len(body)
+    while _lru_bytes > settings.result_cache_max_bytes:
+        _drop(next(iter(_lru)))
+    return entry
+
+
+def invalidate(document_id: int) -> None:
+    """Drop every cached response for a document (its results changed)"""
+    global _invalidations
+    _invalidations += 1
+    for key in list(_keys_by_doc.get(document_id, ())):
+        _drop(key)
+
+
+def invalidate_on_commit(db: AsyncSession, document_id: int) -> None:
+    """Invalidate document_id once the session's current transaction commits"""
+    db.sync_session.info.setdefault(_PENDING, set()).add(document_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    for document_id in session.info.pop(_PENDING, ()):
+        invalidate(document_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
@@ -0,0 +1,123 @@
+"""
+Clinical note sectionizer
+
+Splits a note into typed sections (HPI, Medications, Assessment, Plan, ...)
+in one pass with a single compiled header automaton, so each LLM task can
+be sent only the sections it needs instead of the whole note.
+
+Routing is off unless settings.section_routing is set: conditions stated
+only in other sections (e.g. the HPI) are not seen by the task, so
+measure it on long notes first (scripts/bench_sectionizer.py).
+"""
+import re
+from typing import Dict, Iterable, List, Tuple
+
+from app.config import settings
+
+# Canonical section type -> header spellings seen in notes and reports
+SECTION_HEADERS: Dict[str, List[str]] = {
+    "CHIEF_COMPLAINT": ["chief complaint", "cc", "reason for visit", "reason for referral"],
+    "HPI": ["history of present illness", "hpi", "history", "clinical history", "indication", "indications"],
+    "PMH": ["past medical history", "pmh", "past surgical history", "psh", "medical history"],
+    "MEDICATIONS": [
+        "medications", "current medications", "home medications", "meds", "medication list",
+        "discharge medications", "active medications", "outpatient medications",
+    ],
+    "ALLERGIES": ["allergies", "drug allergies", "nkda"],
+    "SOCIAL_HISTORY": ["social history", "sh", "family history", "fh"],
+    "ROS": ["review of systems", "ros"],
+    "EXAM": ["physical exam", "physical examination", "exam", "vital signs", "vitals"],
+    "RESULTS": ["labs", "laboratory", "results", "lab results", "data", "studies", "technique", "comparison"],
+    "FINDINGS": ["findings"],
+    "IMPRESSION": ["impression", "impressions", "conclusion", "conclusions"],
+    "DIAGNOSES": [
+        "diagnosis", "diagnoses", "discharge diagnosis", "discharge diagnoses", "final diagnosis",
+        "admission diagnosis", "problem list", "active problems",
+    ],
+    "ASSESSMENT": ["assessment", "assessment and plan", "a/p", "a&p"],
+    "PLAN": ["plan", "recommendation", "recommendations", "disposition", "follow up", "follow-up"],
+}
+
+# Which sections each task needs. Tasks fall back to the full text when
+# none of their sections are present (labs, imaging, one-line notes).
+# Codes need the abnormal results and findings as well as the diagnoses.
+TASK_SECTIONS: Dict[str, Tuple[str, ...]] = {
+    "medications": ("MEDICATIONS", "PLAN"),  # new prescriptions are written in the Plan
+    "action_items": ("IMPRESSION", "ASSESSMENT", "PLAN"),
+    "codes": ("RESULTS", "FINDINGS", "IMPRESSION", "DIAGNOSES", "ASSESSMENT", "PLAN"),
+}
+
+# Short documents are sent whole: the savings are negligible and a lone
+# "Impression:" line in a lab report must not hide the values above it.
+MIN_ROUTED_CHARS = 2000
+
+_ALIAS_TO_TYPE = {
+    alias: section_type
+    for section_type, aliases in SECTION_HEADERS.items()
+    for alias in aliases
+}
+
+# One alternation over every alias (longest first, so "assessment and plan"
+# wins over "assessment"). A header starts a line and ends with ':' or the
+# end of the line, e.g. "Assessment:", "PLAN", "A/P: ...".
+_HEADER_RE = re.compile(
+    r"^[ \t]*(?P<header>"
+    + "|".join(re.escape(a) for a in sorted(_ALIAS_TO_TYPE, key=len, reverse=True))
+    + r")[ \t]*(?::|$)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+class Section:
+    """A typed span of a document"""
+
+    __slots__ = ("type", "header", "text")
+
+    def __init__(self, type: str, header: str, text: str):
+        self.type = type
+        self.header = header
+        self.text = text
+
+    def __repr__(self) -> str:
+        return f"Section({self.type!r}, {len(self.text)} chars)"
+
+
+def sectionize(text: str) -> List[Section]:
+    """
+    Split text into sections at recognized headers
+
+    Text before the first header becomes a PREAMBLE section. A document
+    with no recognized headers is returned as a single PREAMBLE section.
+    """
+    sections: List[Section] = []
+    matches = list(_HEADER_RE.finditer(text))
+    preamble = text[:matches[0].start()] if matches else text
+    if preamble.strip():
+        sections.append(Section("PREAMBLE", "", preamble.strip()))
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        header = m.group("header")
+        body = text[m.start():end].strip()
+        sections.append(Section(_ALIAS_TO_TYPE[header.lower()], header, body))
+    return sections
+
+
+def select_text(text: str, task: str, sections: Iterable[Section] = None) -> str:
+    """
+    Text to send to an LLM task: only its relevant sections, in document order
+
+    Args:
+        text: Full document text
+        task: Key of TASK_SECTIONS ("medications", "action_items", "codes")
+        sections: Output of sectionize(text), if already computed
+
+    Returns:
+        str: The relevant sections joined, or the full text if routing is
+        disabled, the document is short or none of the sections were found
+    """
+    if not settings.section_routing or len(text) < MIN_ROUTED_CHARS:
+        return text
+    wanted = TASK_SECTIONS[task]
+    sections = sectionize(text) if sections is None else sections
+    picked = [s.text for s in sections if s.type in wanted]
+    return "\n\n".join(picked) if picked else text
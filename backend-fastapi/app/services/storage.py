@@ -1,28 +1,83 @@
 """
-Storage factory - automatically selects local or S3 storage based on configuration
+Storage backends for uploaded documents
+
+settings.storage_backend selects one: "local" (files under
+settings.storage_dir) or "s3" (settings.s3_bucket_name in
+settings.aws_region). get_storage() builds it on first use, and a
+backend's module is only imported when it is selected, so local runs never
+import boto3 or create an S3 client.
 """
+from typing import BinaryIO, Callable, Dict, Optional, Protocol
+
 from app.config import settings
 
-# Import storage backends
-from app.services.storage_local import LocalStorage
-from app.services.storage_s3 import S3Storage
 
+class StorageWriter(Protocol):
+    """Incremental write of one upload: write() per chunk, commit(), and always abort() last"""
 
-def get_storage():
-    """
-    Get storage backend based on configuration
-    
-    Returns:
-        Storage instance (LocalStorage or S3Storage)
-    """
-    if settings.storage_backend == "s3":
-        return S3Storage(
-            bucket_name=settings.s3_bucket_name,
-            region=settings.aws_region
-        )
-    else:
-        return LocalStorage(base_path=settings.storage_dir)
+    def write(self, chunk: bytes) -> None: ...
+
+    def commit(self, content_hash: str) -> str:
+        """
+        Publish the file and return its storage path/key
+
+        content_hash is the SHA-256 (hex) of the bytes written, computed
+        once at ingest. Calling commit() again before abort() returns the
+        same path, publishing the file again if it was removed meanwhile.
+        """
+        ...
+
+    def abort(self) -> None:
+        """Release the writer's resources; the file is discarded unless committed"""
+        ...
+
+
+class StorageBackend(Protocol):
+    """What the app needs from a storage backend"""
+
+    def save_file(self, file_data: BinaryIO, filename: str) -> str: ...
+
+    def open_writer(self, filename: str) -> StorageWriter: ...
+
+    def file_exists(self, path: str) -> bool: ...
+
+    def delete_file(self, path: str) -> None: ...
 
 
-# Global storage instance
-storage = get_storage()
+def _local() -> StorageBackend:
+    from app.services.storage_local import LocalStorage
+
+    return LocalStorage(base_path=settings.storage_dir)
+
+
+def _s3() -> StorageBackend:
+    from app.services.storage_s3 import S3Storage
+
+    return S3Storage(bucket_name=settings.s3_bucket_name, region=settings.aws_region)
+
+
+STORAGE_BACKENDS: Dict[str, Callable[[], StorageBackend]] = {
+    "local": _local,
+    "s3": _s3,
+}
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """
+    The configured backend, created on first use
+
+    Raises:
+        ValueError: if settings.storage_backend names no known backend
+    """
+    global _storage
+    if _storage is None:
+        factory = STORAGE_BACKENDS.get(settings.storage_backend.lower())
+        if factory is None:
+            raise ValueError(
+                f"Unknown storage backend {settings.storage_backend!r} "
+                f"(expected one of: {', '.join(STORAGE_BACKENDS)})"
+            )
+        _storage = factory()
+    return _storage
@@ -1,47 +1,148 @@
+"""
+Content-addressed local storage
+
+Files are stored once per content, at <base_path>/sha256/ab/cd/<sha256>
+(the first two byte pairs of the hash as directories), so no directory
+grows past a few thousand entries even at millions of files, and identical
+uploads share one file. Original filenames live in the database.
+
+Publishing is atomic and never overwrites: bytes are staged under
+<base_path>/.incoming and hard-linked into place (os.link fails if the
+blob already exists, in which case the staged copy is just dropped).
+Which documents use a file is counted in the stored_files table (see
+app.db.file_refs); delete_file() is only called once nothing refers to it.
+
+A blob can be removed between an upload publishing it (finding it already
+there) and the upload's reference being counted. Uploads therefore keep
+their staged copy until abort() and commit() again once the reference is
+committed, which re-links the blob if it has gone.
+"""
+import hashlib
 import os
+import shutil
 import uuid
 from pathlib import Path
 from typing import BinaryIO
 
+BLOB_DIR = "sha256"
+
+
+class LocalFileWriter:
+    """
+    Incremental writer for one upload
+
+    Bytes go to a staging file under <base_path>/.incoming; commit()
+    publishes it at its content address (the hash computed at ingest),
+    abort() removes the staging file.
+    """
+
+    def __init__(self, storage: "LocalStorage", staging_path: Path):
+        self._storage = storage
+        self._staging_path = staging_path
+        self._fh = open(staging_path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._fh.write(chunk)
+
+    def commit(self, content_hash: str) -> str:
+        """Publish the staged file (or reuse an identical one) and return its path"""
+        self._fh.close()
+        return self._storage.link_blob(self._staging_path, content_hash)
+
+    def abort(self) -> None:
+        """Remove the staged file; a published blob is kept"""
+        self._fh.close()
+        self._staging_path.unlink(missing_ok=True)
+
 
 class LocalStorage:
     """Local file storage for uploaded documents"""
-    
+
     def __init__(self, base_path: str = "app/local_storage"):
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
-    
+        self._staging_dir = self.base_path / ".incoming"
+        self._staging_dir.mkdir(exist_ok=True)
+
+    def blob_path(self, content_hash: str) -> Path:
+        """Where the file with this SHA-256 (hex) is stored"""
+        return self.base_path / BLOB_DIR / content_hash[:2] / content_hash[2:4] / content_hash
+
+    def link_blob(self, source: Path, content_hash: str) -> str:
+        """
+        Hard-link a file into place as the blob for content_hash
+
+        The source is left as it is. If the blob already exists the source
+        is not linked (identical content); if it is on another filesystem
+        it is copied via the staging directory first.
+
+        Returns:
+            str: Path of the blob
+        """
+        target = self.blob_path(content_hash)
+        if target.exists():
+            return str(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(source, target)
+        except FileExistsError:
+            pass  # a concurrent writer published the same content
+        except OSError:
+            # Not linkable (other filesystem, no hard-link support): copy, then link
+            staging = self._staging_dir / str(uuid.uuid4())
+            shutil.copyfile(source, staging)
+            try:
+                os.link(staging, target)
+            except FileExistsError:
+                pass
+            finally:
+                staging.unlink(missing_ok=True)
+        return str(target)
+
     def save_file(self, file_data: BinaryIO, filename: str) -> str:
         """
         Save file to local storage
-        
+
         Args:
             file_data: File content
-            filename: Original filename
-            
+            filename: Original filename (not part of the stored path)
+
         Returns:
             str: Path to saved file
         """
-        # Create unique directory for this file
-        file_id = str(uuid.uuid4())
-        file_dir = self.base_path / file_id
-        file_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Save file
-        file_path = file_dir / filename
-        with open(file_path, "wb") as f:
-            content = file_data.read()
-            f.write(content)
-        
-        return str(file_path)
-    
+        writer = self.open_writer(filename)
+        hasher = hashlib.sha256()
+        try:
+            while True:
+                chunk = file_data.read(1024 * 1024)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                writer.write(chunk)
+            return writer.commit(hasher.hexdigest())
+        finally:
+            writer.abort()
+
+    def open_writer(self, filename: str) -> LocalFileWriter:
+        """
+        Start a streaming write of a new file
+
+        Args:
+            filename: Original filename (not part of the stored path)
+
+        Returns:
+            LocalFileWriter: call write() per chunk, commit(), then abort()
+        """
+        return LocalFileWriter(self, self._staging_dir / str(uuid.uuid4()))
+
     def get_file_path(self, local_path: str) -> Path:
         """Get full path to a stored file"""
         return Path(local_path)
-    
+
     def file_exists(self, local_path: str) -> bool:
         """Check if file exists"""
         return Path(local_path).exists()
 
-
-storage = LocalStorage()
+    def delete_file(self, local_path: str) -> None:
+        """Remove a stored file that no document refers to any more"""
+        Path(local_path).unlink(missing_ok=True)
@@ -1,10 +1,41 @@
-import os
+import tempfile
 import uuid
 import boto3
 from botocore.exceptions import ClientError
 from typing import BinaryIO
 from pathlib import Path
 
+from app.config import settings
+
+
+class S3FileWriter:
+    """
+    Incremental writer for one upload
+
+    Chunks are spooled locally and uploaded as a single object on commit(),
+    so an aborted upload never reaches the bucket.
+    """
+
+    def __init__(self, storage: "S3Storage", filename: str):
+        self._storage = storage
+        self._filename = filename
+        self._spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        self._key = None
+
+    def write(self, chunk: bytes) -> None:
+        self._spool.write(chunk)
+
+    def commit(self, content_hash: str) -> str:
+        """Upload the spooled bytes (once; keys are per upload) and return the S3 key"""
+        if self._key is None:
+            self._spool.seek(0)
+            self._key = self._storage.save_file(self._spool, self._filename)
+        return self._key
+
+    def abort(self) -> None:
+        """Discard the spooled bytes"""
+        self._spool.close()
+
 
 class S3Storage:
     """S3 storage for uploaded documents"""
@@ -14,10 +45,10 @@ class S3Storage:
         Initialize S3 storage
         
         Args:
-            bucket_name: S3 bucket name (defaults to env var S3_BUCKET_NAME)
+            bucket_name: S3 bucket name (defaults to settings.s3_bucket_name)
             region: AWS region
         """
-        self.bucket_name = bucket_name or os.getenv("S3_BUCKET_NAME", "med-docs-dev")
+        self.bucket_name = bucket_name or settings.s3_bucket_name
         self.region = region
         self.s3_client = boto3.client('s3', region_name=region)
     
@@ -51,6 +82,10 @@ class S3Storage:
         except ClientError as e:
             raise Exception(f"Failed to upload to S3: {str(e)}")
     
+    def open_writer(self, filename: str) -> S3FileWriter:
+        """Start a streaming write of a new file (see S3FileWriter)"""
+        return S3FileWriter(self, filename)
+    
     def get_file_url(self, s3_key: str, expiration: int = 3600) -> str:
         """
         Generate presigned URL for file access
@@ -80,6 +115,13 @@ class S3Storage:
         except ClientError:
             return False
     
+    def delete_file(self, s3_key: str) -> None:
+        """Delete an object that no document refers to any more"""
+        try:
+            self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
+        except ClientError as e:
+            raise Exception(f"Failed to delete from S3: {str(e)}")
+    
     def download_file(self, s3_key: str) -> bytes:
         """
         Download file content from S3
@@ -106,7 +148,3 @@ class S3Storage:
             '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
         }
         return content_types.get(ext, 'application/octet-stream')
-
-
-# Initialize storage instance
-storage = S3Storage()
@@ -0,0 +1,127 @@
+"""
+Extracted-text cache
+
+Text is extracted once per distinct upload (keyed by its SHA-256) and
+persisted compressed in the extracted_texts table. A small in-process LRU
+in front of the table serves hot documents, e.g. repeated /api/chat calls,
+without touching the DB. Deleting a document deletes its text; the cached
+copy is evicted once that transaction commits (see evict_on_commit).
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db import crud
+from app.db.writer import writer
+from app.services.ingest import IngestedUpload
+from app.services.text_extract import extract_text_from_ingested
+
+MAX_CACHED_CHARS = 16 * 1024 * 1024
+
+_PENDING = "text_cache_evict"
+
+_lru: "OrderedDict[str, str]" = OrderedDict()
+_lru_chars = 0
+
+
+def _lru_get(content_hash: str) -> Optional[str]:
+    text = _lru.get(content_hash)
+    if text is not None:
+        _lru.move_to_end(content_hash)
+    return text
+
+
+def _lru_put(content_hash: str, text: str) -> None:
+    global _lru_chars
+    if len(text) > MAX_CACHED_CHARS or content_hash in _lru:
+        return
+    _lru[content_hash] = text
+    _lru_chars += len(text)
+    while _lru_chars > MAX_CACHED_CHARS:
+        _, evicted = _lru.popitem(last=False)
+        _lru_chars -= len(evicted)
+
+
+def evict(content_hash: str) -> None:
+    """Drop a text from the in-process cache"""
+    global _lru_chars
+    text = _lru.pop(content_hash, None)
+    if text is not None:
+        _lru_chars -= len(text)
+
+
+def evict_on_commit(db: AsyncSession, content_hash: str) -> None:
+    """Evict content_hash once the session's current transaction commits"""
+    db.sync_session.info.setdefault(_PENDING, set()).add(content_hash)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    for content_hash in session.info.pop(_PENDING, ()):
+        evict(content_hash)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+async def get_text(db: AsyncSession, content_hash: str) -> Optional[str]:
+    """Cached text for a content hash, from memory or the DB"""
+    text = _lru_get(content_hash)
+    if text is None:
+        text = await crud.get_extracted_text(db, content_hash)
+        if text is not None:
+            _lru_put(content_hash, text)
+    return text
+
+
+async def store_text(db: AsyncSession, content_hash: str, text: str) -> None:
+    """Persist text produced server-side (e.g. packet parts) under a content key"""
+    await writer.run(db, crud.save_extracted_text, content_hash, text)
+    _lru_put(content_hash, text)
+
+
+async def extract_text_cached(
+    db: AsyncSession,
+    upload: IngestedUpload,
+    on_prefix: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, Optional[Dict[str, int]]]:
+    """
+    Extract an upload's normalized text, parsing each distinct file at most once
+
+    Args:
+        db: Database session
+        upload: Ingested upload
+        on_prefix: Passed to extract_text_from_ingested; not called on a cache hit
+
+    Returns:
+        (text, normalization stats); stats are None when served from the cache
+    """
+    text = await get_text(db, upload.content_hash)
+    if text is not None:
+        return text, None
+    text, stats = await extract_text_from_ingested(upload, on_prefix)
+    await writer.run(db, crud.save_extracted_text, upload.content_hash, text)
+    _lru_put(upload.content_hash, text)
+    return text, stats
+
+
+async def load_document_text(db: AsyncSession, document_id: int) -> str:
+    """
+    Server-side text for document_id-based endpoints
+
+    Raises:
+        HTTPException: 404 if the document or its extracted text is missing
+    """
+    doc = await crud.get_document(db, document_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    text = await get_text(db, doc.content_hash) if doc.content_hash else None
+    if text is None:
+        raise HTTPException(status_code=404, detail="No extracted text stored for this document")
+    return text
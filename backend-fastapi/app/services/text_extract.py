@@ -1,83 +1,282 @@
-from fastapi import UploadFile, HTTPException
-from pypdf import PdfReader
-import io
-import base64
-
-
-def extract_text_from_upload(file: UploadFile) -> str:
-    """
-    Extract text from uploaded file (PDF, TXT, or Image)
-
-    Args:
-        file: Uploaded file
-
-    Returns:
-        str: Extracted text content
-
-    Raises:
-        HTTPException: If file type is not supported
-    """
-    filename = file.filename or ""
-    file_ext = filename.lower().split(".")[-1] if "." in filename else ""
-
-    if file_ext == "pdf":
-        return extract_text_from_pdf(file.file)
-    elif file_ext == "txt":
-        return extract_text_from_txt(file.file)
-    elif file_ext in ["jpg", "jpeg", "png"]:
-        return extract_text_from_image(file.file, file_ext)
-    else:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file type: {file_ext}. Please upload PDF, TXT, JPG, or PNG files."
-        )
-
-
-def extract_text_from_pdf(file_data: io.BytesIO) -> str:
-    """Extract text from PDF file"""
-    try:
-        reader = PdfReader(file_data)
-        text_parts = []
-        
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                text_parts.append(text)
-        
-        return "\n\n".join(text_parts)
-    except Exception as e:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Failed to extract text from PDF: {str(e)}"
-        )
-
-
-def extract_text_from_txt(file_data: io.BytesIO) -> str:
-    """Extract text from TXT file"""
-    try:
-        content = file_data.read()
-        return content.decode("utf-8")
-    except UnicodeDecodeError:
-        raise HTTPException(
-            status_code=400,
-            detail="Failed to decode text file. Please ensure the file is UTF-8 encoded."
-        )
-
-
-def extract_text_from_image(file_data: io.BytesIO, file_ext: str) -> str:
-    """
-    Extract medical findings from image using Claude Vision API
-
-    Args:
-        file_data: Image file data
-        file_ext: File extension (jpg, jpeg, png)
-
-    Returns:
-        str: Extracted medical findings text
-    """
-    # Note: Claude Vision support can be added here
-    # For now, we'll return an error message
-    raise HTTPException(
-        status_code=400,
-        detail="Image analysis is not yet supported. Please upload PDF or TXT files only. Image support coming soon with Claude Vision!"
-    )
+from fastapi import HTTPException
+from pypdf import PdfReader
+from collections import Counter
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+import io
+import math
+import re
+
+from app.config import settings
+from app.services import ocr, pdf_pool
+from app.services.ingest import IngestedUpload
+
+
+async def extract_text_from_ingested(
+    upload: IngestedUpload,
+    on_prefix: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Extract and normalize text from an ingested upload without blocking the event loop
+
+    PDFs are parsed in the process pool (see pdf_pool); image uploads and
+    pages without a text layer are OCRed when an engine is available (see
+    ocr). TXT files are decoded in place and split into pages on form feeds.
+
+    Args:
+        upload: Ingested upload
+        on_prefix: Called once with the text of the first pages as soon as
+            settings.early_classify_pages pages or settings.early_classify_chars
+            characters are available, if more pages are still to come. Lets
+            the caller start work (e.g. classification) while the rest of a
+            long PDF is extracted.
+
+    Returns:
+        (normalized text, normalization stats) - see normalize_pages
+
+    Raises:
+        HTTPException: 422 if the upload has no extractable text (e.g. a
+            scanned PDF while OCR is unavailable), detected before the full
+            extraction where possible
+    """
+    if upload.extension in ocr.IMAGE_EXTENSIONS and ocr.available():
+        return _require_text(normalize_pages(await ocr.ocr_image_pages(upload.source())))
+    if upload.extension != "pdf":
+        with upload.open() as data:
+            return _require_text(normalize_pages(extract_text(data, upload.filename).split("\f")))
+
+    # Cheap pre-check on a few sampled pages: image-only PDFs go straight to
+    # OCR, or are rejected before the full extraction (and before any
+    # storage write or LLM call) when no OCR engine is available
+    probe = await pdf_pool.probe(upload.source())
+    use_ocr = probe["kind"] in ("scanned", "mixed") and ocr.available()
+    if probe["kind"] == "scanned" and use_ocr:
+        pages = list(range(probe["page_count"]))
+        return _require_text(normalize_pages(await ocr.ocr_pdf_pages(upload.source(), pages)))
+    if probe["kind"] in ("scanned", "empty"):
+        raise HTTPException(
+            status_code=422,
+            detail="PDF has no extractable text (scanned or image-only pages); OCR is not available",
+        )
+    if probe["kind"] == "mixed" and not use_ocr:
+        print(
+            f"[INFO] PDF has text on {probe['text_pages']} of {probe['sampled']} sampled pages; "
+            "image-only pages will yield no text"
+        )
+
+    pages = []
+    chars = 0
+    prefix_sent = on_prefix is None
+    async for index, page_count, text in pdf_pool.iter_pdf_pages(
+        upload.source(), first_range=settings.early_classify_pages
+    ):
+        pages.append(text)
+        chars += len(text)
+        if not prefix_sent and index + 1 < page_count and (
+            index + 1 >= settings.early_classify_pages or chars >= settings.early_classify_chars
+        ):
+            on_prefix(normalize_pages(pages)[0])
+            prefix_sent = True
+
+    if use_ocr:
+        # Mixed PDF: recognize only the pages that had no text layer
+        missing = [i for i, text in enumerate(pages) if not text.strip()]
+        for i, text in zip(missing, await ocr.ocr_pdf_pages(upload.source(), missing)):
+            pages[i] = text
+    return _require_text(normalize_pages(pages))
+
+
+def _require_text(result: Tuple[str, Dict[str, int]]) -> Tuple[str, Dict[str, int]]:
+    """Refuse empty extractions instead of sending empty text to the LLM"""
+    if not result[0].strip():
+        raise HTTPException(status_code=422, detail="No extractable text found in the uploaded file")
+    return result
+
+
+# ---- Token-reducing normalization (runs once, before any LLM call) ----
+
+CHARS_PER_TOKEN = 4            # rough estimate for English clinical text
+BOILERPLATE_EDGE_LINES = 3     # header/footer candidates: first/last N lines of a page
+BOILERPLATE_MIN_PAGES = 3      # ...repeated on at least this many pages
+BOILERPLATE_PAGE_FRACTION = 0.8  # ...and on at least this share of pages
+
+_PAGE_NUMBER_RE = re.compile(r"^(?:page\s*)?\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?$", re.I)
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n([a-z])")
+_INLINE_WS_RE = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+# Lines carrying values are clinical content, never boilerplate
+_VALUE_RE = re.compile(
+    r"\d|%|\b(?:mg|g|mcg|ng|pg|meq|mmol|mol|iu|u|ml|dl|l|ul|fl|mm|cm|mmhg|bpm|k|x10)"
+    r"(?:/(?:dl|l|ml|ul|hpf|kg|min|hr|h|d|day|m2))?\b",
+    re.I,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for reporting savings"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _edge_keys(lines: List[str]) -> Dict[Tuple[str, int], str]:
+    """Header/footer candidates of a page: (edge, offset from that edge) -> exact line"""
+    # Short pages only offer their first/last line, so the body is never a candidate
+    depth = min(BOILERPLATE_EDGE_LINES, max(1, len(lines) // 4))
+    keys = {}
+    for offset, line in enumerate(lines[:depth]):
+        keys[("top", offset)] = line
+    for offset, line in enumerate(reversed(lines[-depth:])):
+        keys[("bottom", offset)] = line
+    return {key: line for key, line in keys.items() if not _VALUE_RE.search(line)}
+
+
+def _find_boilerplate(pages: List[List[str]]) -> set:
+    """
+    Running headers/footers: the exact same line at the same position from
+    the top or bottom of (nearly) every page, with no numbers or units
+    """
+    if len(pages) < BOILERPLATE_MIN_PAGES:
+        return set()
+    counts: Counter = Counter()
+    for lines in pages:
+        counts.update((key, line) for key, line in _edge_keys(lines).items())
+    min_pages = max(BOILERPLATE_MIN_PAGES, math.ceil(len(pages) * BOILERPLATE_PAGE_FRACTION))
+    return {entry for entry, n in counts.items() if n >= min_pages}
+
+
+def normalize_pages(pages: List[str]) -> Tuple[str, Dict[str, int]]:
+    """
+    Strip what the LLM does not need from extracted page texts
+
+    - collapses runs of spaces/tabs and drops blank lines
+    - drops bare page-number lines ("3", "Page 3 of 12") at the top or bottom of a page
+    - keeps running headers/footers (the exact same line, without numbers or
+      units, at the same position on nearly every page) on the first page only
+    - joins words hyphenated across line breaks
+
+    Returns:
+        (text, stats) where stats reports chars/estimated tokens before and after
+    """
+    raw_text = "\n\n".join(page for page in pages if page)
+
+    page_lines = []
+    for page in pages:
+        lines = [_INLINE_WS_RE.sub(" ", line).strip() for line in page.split("\n")]
+        lines = [line for line in lines if line]
+        if lines:
+            page_lines.append(lines)
+
+    boilerplate = _find_boilerplate(page_lines)
+    removed = 0
+    kept_pages = []
+    for page_no, lines in enumerate(page_lines):
+        # Repeated headers/footers are kept on the first page only
+        repeated = set()
+        if page_no:
+            repeated = {
+                key[1] if key[0] == "top" else len(lines) - 1 - key[1]
+                for key, line in _edge_keys(lines).items()
+                if (key, line) in boilerplate
+            }
+        kept = []
+        for i, line in enumerate(lines):
+            at_edge = i < 2 or i >= len(lines) - 2
+            if at_edge and _PAGE_NUMBER_RE.match(line):
+                removed += 1
+                continue
+            if i in repeated:
+                removed += 1
+                continue
+            kept.append(line)
+        if kept:
+            kept_pages.append("\n".join(kept))
+
+    text = _HYPHEN_BREAK_RE.sub(r"\1\2", "\n\n".join(kept_pages))
+    text = _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+    stats = {
+        "chars_before": len(raw_text),
+        "chars_after": len(text),
+        "chars_saved": len(raw_text) - len(text),
+        "tokens_before_est": estimate_tokens(raw_text),
+        "tokens_after_est": estimate_tokens(text),
+        "tokens_saved_est": estimate_tokens(raw_text) - estimate_tokens(text),
+        "lines_removed": removed,
+    }
+    return text, stats
+
+
+def extract_text(file_data: BinaryIO, filename: str) -> str:
+    """
+    Extract text from a seekable binary stream (file, BytesIO or mmap)
+
+    Args:
+        file_data: File content positioned at the start
+        filename: Original filename, used to pick the extractor
+
+    Returns:
+        str: Extracted text content
+
+    Raises:
+        HTTPException: If file type is not supported
+    """
+    file_ext = filename.lower().split(".")[-1] if "." in filename else ""
+
+    if file_ext == "pdf":
+        return extract_text_from_pdf(file_data)
+    elif file_ext == "txt":
+        return extract_text_from_txt(file_data)
+    elif file_ext in ["jpg", "jpeg", "png"]:
+        return extract_text_from_image(file_data, file_ext)
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type: {file_ext}. Please upload PDF, TXT, JPG, or PNG files."
+        )
+
+
+def iter_pdf_pages(file_data: BinaryIO) -> Iterator[str]:
+    """Yield the text of each PDF page in order ("" for pages without text)"""
+    reader = PdfReader(file_data)
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def extract_text_from_pdf(file_data: io.BytesIO) -> str:
+    """Extract text from PDF file"""
+    try:
+        return "\n\n".join(text for text in iter_pdf_pages(file_data) if text)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to extract text from PDF: {str(e)}"
+        )
+
+
+def extract_text_from_txt(file_data: io.BytesIO) -> str:
+    """Extract text from TXT file"""
+    try:
+        content = file_data.read()
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=400,
+            detail="Failed to decode text file. Please ensure the file is UTF-8 encoded."
+        )
+
+
+def extract_text_from_image(file_data: io.BytesIO, file_ext: str) -> str:
+    """
+    Extract medical findings from image using Claude Vision API
+
+    Args:
+        file_data: Image file data
+        file_ext: File extension (jpg, jpeg, png)
+
+    Returns:
+        str: Extracted medical findings text
+    """
+    # Note: Claude Vision support can be added here
+    # For now, we'll return an error message
+    raise HTTPException(
+        status_code=400,
+        detail="Image analysis is not yet supported. Please upload PDF or TXT files only. Image support coming soon with Claude Vision!"
+    )
@@ -0,0 +1,50 @@
+"""
+Test setup: run from backend-fastapi/ with `python -m pytest`
+
+The app reads settings at import time, so tests get a throwaway SQLite
+database and no LLM calls before anything under app/ is imported.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_tmp = tempfile.mkdtemp(prefix="medocs-tests-")
+os.environ.setdefault("DB_URL", f"sqlite:///{_tmp}/test.db")
+os.environ.setdefault("STORAGE_DIR", f"{_tmp}/storage")
+os.environ.setdefault("USE_CLAUDE", "false")
+
+
+@pytest.fixture
+def run_with_session(tmp_path):
+    """
+    Run an async scenario(db) against a fresh SQLite database with every table
+
+    Returns:
+        run(scenario) -> whatever scenario returns
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.db import search
+    from app.db.database import Base
+
+    def run(scenario):
+        async def main():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.run_sync(search.create_index)
+            try:
+                async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                    return await scenario(db)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,35 @@
+"""Document records (app.db.crud)"""
+from sqlalchemy import func, select
+
+from app.db import crud
+from app.db.models import ExtractedText
+from app.services import text_cache
+
+
+def test_delete_removes_extracted_texts_of_the_document_and_its_parts(run_with_session):
+    async def scenario(db):
+        parent = await crud.create_document(db, "packet.pdf", content_hash="p" * 64)
+        await crud.create_document(db, "packet.pdf (part 1)", content_hash="c" * 64, parent_id=parent.id)
+        await crud.create_document(db, "other.pdf", content_hash="o" * 64)
+        for content_hash in ("p" * 64, "c" * 64, "o" * 64):
+            await crud.save_extracted_text(db, content_hash, "PHI " + content_hash)
+            assert await text_cache.get_text(db, content_hash)
+        await crud.delete_document(db, parent.id)
+        return list(await db.scalars(select(ExtractedText.content_hash)))
+
+    assert run_with_session(scenario) == ["o" * 64]
+    assert "p" * 64 not in text_cache._lru and "c" * 64 not in text_cache._lru
+    assert "o" * 64 in text_cache._lru
+
+
+def test_rolled_back_delete_keeps_the_cached_text(run_with_session):
+    async def scenario(db):
+        doc = await crud.create_document(db, "note.txt", content_hash="r" * 64)
+        await crud.save_extracted_text(db, doc.content_hash, "PHI")
+        assert await text_cache.get_text(db, doc.content_hash) == "PHI"
+        await crud.delete_document(db, doc.id, commit=False)
+        await db.rollback()
+        return await db.scalar(select(func.count()).select_from(ExtractedText))
+
+    assert run_with_session(scenario) == 1
+    assert text_cache._lru["r" * 64] == "PHI"
@@ -0,0 +1,66 @@
+"""Stored file reference counts and content-addressed publishing"""
+import hashlib
+import os
+
+from sqlalchemy import select
+
+from app.db import file_refs
+from app.db.models import StoredFile
+from app.services.storage_local import LocalStorage
+
+
+def test_purge_leaves_a_file_referenced_again(run_with_session):
+    removed = []
+
+    async def remove(path):
+        removed.append(path)
+
+    async def scenario(db):
+        await file_refs.add_ref(db, "blob")
+        await db.commit()
+        assert await file_refs.release(db, ["blob"]) == ["blob"]
+        await db.commit()
+        # A concurrent upload of the same content counts its reference first
+        await file_refs.add_ref(db, "blob")
+        await db.commit()
+        assert not await file_refs.purge(db, "blob", remove)
+        return await db.scalar(select(StoredFile.ref_count).where(StoredFile.path == "blob"))
+
+    assert run_with_session(scenario) == 1
+    assert removed == []
+
+
+def test_purge_removes_an_unreferenced_file(run_with_session):
+    removed = []
+
+    async def remove(path):
+        removed.append(path)
+
+    async def scenario(db):
+        await file_refs.add_ref(db, "blob", 2)
+        await db.commit()
+        assert await file_refs.release(db, ["blob"]) == []
+        assert await file_refs.release(db, ["blob"]) == ["blob"]
+        await db.commit()
+        assert await file_refs.purge(db, "blob", remove)
+        return await db.scalar(select(StoredFile.path))
+
+    assert run_with_session(scenario) is None
+    assert removed == ["blob"]
+
+
+def test_commit_again_republishes_a_purged_blob(tmp_path):
+    storage = LocalStorage(base_path=str(tmp_path / "store"))
+    data = b"%PDF-1.4 report"
+    content_hash = hashlib.sha256(data).hexdigest()
+    writer = storage.open_writer("report.pdf")
+    try:
+        writer.write(data)
+        path = writer.commit(content_hash)
+        os.unlink(path)  # purged by a concurrent delete before the reference was counted
+        assert writer.commit(content_hash) == path
+    finally:
+        writer.abort()
+    with open(path, "rb") as fh:
+        assert fh.read() == data
+    assert os.listdir(tmp_path / "store" / ".incoming") == []
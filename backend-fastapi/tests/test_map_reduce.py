@@ -0,0 +1,50 @@
+"""Chunking and merging for large documents (app.services.map_reduce)"""
+from app.services.map_reduce import merge_codes, split_into_chunks
+from app.services.text_extract import CHARS_PER_TOKEN
+
+
+def test_codes_are_deduped_across_chunks_keeping_the_max_confidence():
+    merged = merge_codes([
+        {"codes": [
+            {"code": "E11.9", "description": "Type 2 diabetes", "confidence": 0.6, "evidence": ["A1c 8.2%"]},
+            {"code": "I10", "description": "Hypertension", "confidence": 0.7, "evidence": ["BP 150/95"]},
+        ]},
+        {"codes": [
+            {"code": "e11.9 ", "description": "Type 2 diabetes mellitus", "confidence": 0.9,
+             "evidence": ["on metformin", "A1c 8.2%"]},
+        ]},
+        {"codes": None},
+    ])["codes"]
+    assert [c["code"] for c in merged] == ["e11.9 ", "I10"]
+    diabetes = merged[0]
+    assert diabetes["confidence"] == 0.9
+    assert diabetes["description"] == "Type 2 diabetes mellitus"
+    assert diabetes["evidence"] == ["A1c 8.2%", "on metformin"]
+
+
+def test_a_lower_confidence_duplicate_only_adds_evidence():
+    merged = merge_codes([
+        {"codes": [{"code": "J18.9", "description": "Pneumonia", "confidence": 0.8, "evidence": ["RLL infiltrate"]}]},
+        {"codes": [{"code": "J18.9", "description": "Pneumonia, unspecified", "confidence": 0.5,
+                    "evidence": ["fever"]}]},
+    ])["codes"]
+    assert merged == [{"code": "J18.9", "description": "Pneumonia", "confidence": 0.8,
+                       "evidence": ["RLL infiltrate", "fever"]}]
+
+
+def test_chunks_stay_within_the_token_budget():
+    paragraphs = [f"Paragraph {i}: " + "stable vital signs and no distress. " * 20 for i in range(30)]
+    text = "\n\n".join(paragraphs)
+    chunks = split_into_chunks(text, token_budget=500)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 500 * CHARS_PER_TOKEN for chunk in chunks)
+    # Nothing is lost, and paragraphs are not cut when they fit
+    assert sum(chunk.count("Paragraph ") for chunk in chunks) == 30
+
+
+def test_a_single_oversized_paragraph_is_cut_to_the_budget():
+    max_chars = 100 * CHARS_PER_TOKEN
+    text = "x" * (3 * max_chars + 7)
+    chunks = split_into_chunks(text, token_budget=100)
+    assert [len(chunk) for chunk in chunks] == [max_chars, max_chars, max_chars, 7]
+    assert "".join(chunks) == text
@@ -0,0 +1,76 @@
+"""OCR engine registry and preprocessing (app.services.ocr)"""
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.config import settings
+from app.services import ocr, pdf_pool
+
+
+class FakeEngine:
+    name = "fake"
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def recognize(self, image: bytes) -> str:
+        return f"{len(image)} bytes"
+
+
+@pytest.fixture
+def fake_engine(monkeypatch):
+    monkeypatch.setitem(ocr.OCR_ENGINES, "fake", FakeEngine)
+    monkeypatch.setattr(settings, "ocr_engine", "fake")
+    monkeypatch.setattr(ocr, "_warned_degraded", False)
+
+
+def test_none_disables_ocr(monkeypatch):
+    monkeypatch.setattr(settings, "ocr_engine", "none")
+    assert ocr.get_engine() is None
+    assert not ocr.available()
+
+
+def test_registered_engine_is_used(fake_engine):
+    assert ocr.available()
+    assert isinstance(ocr.get_engine(), FakeEngine)
+
+
+def test_missing_pillow_is_logged_once(fake_engine, monkeypatch, capsys):
+    monkeypatch.setattr(ocr, "Image", None)
+    assert ocr.available() and ocr.available()
+    assert capsys.readouterr().out.count("Pillow is not installed") == 1
+    assert ocr.preprocess(b"raw") == b"raw"
+
+
+def test_preprocess_downscales_and_binarizes(monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    monkeypatch.setattr(settings, "ocr_max_side", 500)
+    src = io.BytesIO()
+    Image.new("RGB", (2000, 1000), (200, 120, 40)).save(src, format="PNG")
+    out = Image.open(io.BytesIO(ocr.preprocess(src.getvalue())))
+    assert out.size == (500, 250)
+    assert out.mode == "1"
+
+
+def test_every_tiff_frame_is_a_page(fake_engine, monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    monkeypatch.setattr(settings, "ocr_binarize_threshold", 0)
+    # Workers are spawned and would not see FakeEngine: run the tasks in threads
+    executor = ThreadPoolExecutor(2)
+    monkeypatch.setattr(pdf_pool, "get_executor", lambda: executor)
+    frames = [Image.new("L", (100 + 10 * i, 50), 255) for i in range(3)]
+    src = io.BytesIO()
+    frames[0].save(src, format="TIFF", save_all=True, append_images=frames[1:])
+
+    def recognize(self, image: bytes) -> str:
+        return "%dx%d" % Image.open(io.BytesIO(image)).size
+
+    monkeypatch.setattr(FakeEngine, "recognize", recognize)
+    try:
+        pages = asyncio.run(ocr.ocr_image_pages(src.getvalue()))
+    finally:
+        executor.shutdown()
+    assert pages == ["100x50", "110x50", "120x50"]
@@ -0,0 +1,46 @@
+"""Packet boundaries (app.services.packet_splitter)"""
+from app.services.packet_splitter import page_identity, split_packet
+
+
+def _spans(pages):
+    return [(p.start_page, p.end_page, p.document_type) for p in split_packet("\n\n".join(pages))]
+
+
+def test_title_and_date_change_splits():
+    pages = [
+        "COMPLETE BLOOD COUNT\nCollected: 01/05/2024\nWBC 5.2 K/uL",
+        "CBC (continued)\nPLT 250 K/uL",
+        "BASIC METABOLIC PANEL\nCollected: 02/11/2024\nSodium 140 mmol/L",
+    ]
+    assert _spans(pages) == [(1, 2, "COMPLETE BLOOD COUNT"), (3, 3, "BASIC METABOLIC PANEL")]
+
+
+def test_title_change_alone_does_not_split():
+    pages = [
+        "PROGRESS NOTE\nDate: 2024-03-02\nPatient seen for cough.",
+        "CT\nreviewed with the patient, no acute findings.",
+        "CBC\ndrawn today, results pending.",
+    ]
+    assert _spans(pages) == [(1, 3, "CLINICAL NOTE")]
+
+
+def test_same_day_reports_for_one_patient_stay_together():
+    pages = [
+        "COMPLETE BLOOD COUNT\nPatient: Jane Doe\nCollected: 01/05/2024\nWBC 5.2",
+        "BASIC METABOLIC PANEL\nPatient: Jane Doe\nCollected: 01/05/2024\nSodium 140",
+    ]
+    assert len(_spans(pages)) == 1
+
+
+def test_other_patient_splits():
+    pages = [
+        "COMPLETE BLOOD COUNT\nMRN: 1001\nCollected: 01/05/2024\nWBC 5.2",
+        "CHEST X-RAY\nMRN: 2002\nDate: 01/05/2024\nNo acute process.",
+    ]
+    assert _spans(pages) == [(1, 1, "COMPLETE BLOOD COUNT"), (2, 2, "X-RAY")]
+
+
+def test_birth_dates_are_not_report_dates():
+    assert page_identity("CBC\nName: Jane Doe\nDOB: 02/03/1950\nCollected: 01/05/2024") == (
+        "name:jane doe", "01/05/2024",
+    )
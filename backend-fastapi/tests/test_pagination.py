@@ -0,0 +1,47 @@
+"""Keyset pagination of GET /documents (crud.list_documents and its cursor)"""
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.db import crud
+from app.db.models import Document
+from app.routes.pipeline import _decode_cursor, _encode_cursor
+
+
+def _pages(run_with_session, created_at, limit):
+    async def scenario(db):
+        db.add_all([
+            Document(id=i, original_filename=f"{i}.pdf", created_at=created_at[i - 1])
+            for i in range(1, len(created_at) + 1)
+        ])
+        await db.commit()
+        pages, cursor = [], None
+        while True:
+            docs = await crud.list_documents(
+                db, limit=limit, before=_decode_cursor(cursor) if cursor else None
+            )
+            if not docs:
+                return pages
+            pages.append([doc.id for doc in docs])
+            cursor = _encode_cursor(docs[-1])
+
+    return run_with_session(scenario)
+
+
+def test_pages_are_stable_when_created_at_ties(run_with_session):
+    tie = datetime(2024, 5, 1, 12, 0, 0, 123456)
+    created_at = [datetime(2024, 4, 30), tie, tie, tie, tie, datetime(2024, 5, 2)]
+    assert _pages(run_with_session, created_at, limit=2) == [[6, 5], [4, 3], [2, 1]]
+
+
+def test_cursor_round_trips():
+    doc = Document(id=42, created_at=datetime(2024, 5, 1, 12, 0, 0, 123456))
+    assert _decode_cursor(_encode_cursor(doc)) == (doc.created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["%%%", "bm9wZQ", "MjAyNC0wNS0wMXx4", "bm90LWEtZGF0ZXwx", "w7w"])
+def test_bad_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as err:
+        _decode_cursor(cursor)
+    assert err.value.status_code == 400
@@ -0,0 +1,64 @@
+"""Process-pool PDF extraction (app.services.pdf_pool)"""
+import asyncio
+import io
+import time
+
+import pytest
+from fastapi import HTTPException
+from pypdf import PdfWriter
+
+from app.config import settings
+from app.services import pdf_pool
+
+
+def _blank_pdf(pages: int = 2) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(settings, "pdf_workers", 2)
+    pdf_pool.shutdown()
+    yield
+    pdf_pool.shutdown()
+
+
+def _wait_dead(processes, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while any(p.is_alive() for p in processes) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return [p for p in processes if p.is_alive()]
+
+
+def test_timed_out_extraction_frees_the_workers(pool):
+    async def scenario():
+        executor = pdf_pool.get_executor()
+        # Occupy every worker with work that outlives the timeout
+        loop = asyncio.get_running_loop()
+        busy = [loop.run_in_executor(executor, time.sleep, 30) for _ in range(2)]
+        processes = list(executor._processes.values())
+        with pytest.raises(HTTPException) as err:
+            await pdf_pool.extract_pdf_pages(_blank_pdf(), timeout=1.0)
+        assert err.value.status_code == 400
+        assert len(processes) == 2 and not _wait_dead(processes)
+        assert pdf_pool.get_executor() is not executor
+        for future in busy:
+            with pytest.raises(Exception):
+                await future
+        # The fresh pool serves the next request
+        return await pdf_pool.extract_pdf_pages(_blank_pdf(3), timeout=30.0)
+
+    assert asyncio.run(scenario()) == ["", "", ""]
+
+
+def test_recycle_only_replaces_the_current_pool(pool):
+    old = pdf_pool.get_executor()
+    pdf_pool.recycle(old)
+    new = pdf_pool.get_executor()
+    pdf_pool.recycle(old)  # a second timeout on the old pool
+    assert pdf_pool.get_executor() is new
@@ -0,0 +1,60 @@
+"""Response cache for GET /documents/{id} (app.services.result_cache)"""
+import pytest
+from sqlalchemy import text
+
+from app.services import result_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    for document_id in list(result_cache._keys_by_doc):
+        result_cache.invalidate(document_id)
+    yield
+
+
+def _cache(document_id, fields=None, body=b'{"id":1}'):
+    return result_cache.put(document_id, fields, body, result_cache.token())
+
+
+def test_commit_drops_every_projection_of_the_document(run_with_session):
+    _cache(1)
+    _cache(1, ("summary",))
+    _cache(2)
+
+    async def scenario(db):
+        result_cache.invalidate_on_commit(db, 1)
+        assert result_cache.get(1) is not None  # not before the commit
+        await db.commit()
+
+    run_with_session(scenario)
+    assert result_cache.get(1) is None and result_cache.get(1, ("summary",)) is None
+    assert result_cache.get(2) is not None
+
+
+def test_rollback_keeps_the_cached_responses(run_with_session):
+    _cache(1)
+
+    async def scenario(db):
+        await db.execute(text("SELECT 1"))  # as save_result does, inside a transaction
+        result_cache.invalidate_on_commit(db, 1)
+        await db.rollback()
+        await db.commit()  # a later commit does not replay the rolled-back invalidation
+
+    run_with_session(scenario)
+    assert result_cache.get(1) is not None
+
+
+def test_body_read_before_an_invalidation_is_not_cached():
+    read_token = result_cache.token()
+    result_cache.invalidate(1)  # the result was saved while the body was being rendered
+    entry = result_cache.put(1, None, b'{"stale":true}', read_token)
+    assert entry.etag and result_cache.get(1) is None
+
+
+def test_etag_matching():
+    etag = _cache(1).etag
+    assert result_cache.etag_matches(etag, etag)
+    assert result_cache.etag_matches(f'"other", W/{etag}', etag)
+    assert result_cache.etag_matches("*", etag)
+    assert not result_cache.etag_matches('"other"', etag)
+    assert not result_cache.etag_matches(None, etag)
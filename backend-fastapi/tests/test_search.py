@@ -0,0 +1,42 @@
+"""Full-text search (app.db.search)"""
+from app.db import search
+from app.db.models import Document
+
+
+def test_snippet_escapes_stored_text(run_with_session):
+    async def scenario(db):
+        assert search.search_supported(db)
+        db.add(Document(id=1, original_filename="note.pdf"))
+        await db.flush()
+        await search.index_document(db, 1, {"summary": {
+            "summary": "<script>alert(1)</script> glucose & <b>A1c</b> reviewed",
+        }})
+        await db.commit()
+        return await search.search(db, "glucose")
+
+    hits = run_with_session(scenario)
+    assert [hit["id"] for hit in hits] == [1]
+    assert hits[0]["snippet"] == (
+        "&lt;script&gt;alert(1)&lt;/script&gt; <mark>glucose</mark> &amp; &lt;b&gt;A1c&lt;/b&gt; reviewed"
+    )
+
+
+def test_render_snippet_only_marks_matches():
+    assert search.render_snippet("a <mark> b") == "a &lt;mark&gt; <mark>b</mark>"
+    assert search.render_snippet(None) == ""
+
+
+def test_packet_text_is_indexed_once_under_its_part(run_with_session):
+    async def scenario(db):
+        db.add_all([
+            Document(id=1, original_filename="packet.pdf"),
+            Document(id=2, original_filename="packet.pdf [part 1]", parent_id=1),
+        ])
+        await db.flush()
+        part = {"summary": {"summary": "Glucose 180 mg/dL"}}
+        await search.index_document(db, 2, part)
+        await search.index_document(db, 1, {**part, "parts": [{"document_id": 2}]})
+        await db.commit()
+        return await search.search(db, "glucose")
+
+    assert [hit["id"] for hit in run_with_session(scenario)] == [2]
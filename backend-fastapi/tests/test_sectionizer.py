@@ -0,0 +1,48 @@
+"""Section routing (app.services.sectionizer)"""
+from app.config import settings
+from app.services.sectionizer import MIN_ROUTED_CHARS, sectionize, select_text
+
+FILLER = "Patient reports intermittent burning pain in both feet, worse at night. " * 40
+
+DISCHARGE_SUMMARY = f"""Discharge Summary
+History of Present Illness:
+{FILLER}
+Results:
+BNP 1840 pg/mL. Sodium 131 mmol/L.
+Discharge Diagnoses:
+1. Acute on chronic systolic heart failure
+2. Hyponatremia
+Medications:
+furosemide 40 mg daily
+Impression:
+Volume overload, improved.
+Plan:
+Repeat sodium in 1 week.
+"""
+
+
+def test_impression_and_diagnoses_are_their_own_sections():
+    types = [s.type for s in sectionize(DISCHARGE_SUMMARY)]
+    assert "IMPRESSION" in types
+    assert "DIAGNOSES" in types
+    assert "ASSESSMENT" not in types
+
+
+def test_routing_is_off_by_default():
+    assert len(DISCHARGE_SUMMARY) >= MIN_ROUTED_CHARS
+    assert not settings.section_routing
+    assert select_text(DISCHARGE_SUMMARY, "codes") == DISCHARGE_SUMMARY
+
+
+def test_codes_keep_results_diagnoses_and_impression(monkeypatch):
+    monkeypatch.setattr(settings, "section_routing", True)
+    routed = select_text(DISCHARGE_SUMMARY, "codes")
+    for needed in ("BNP 1840", "Hyponatremia", "systolic heart failure", "Volume overload"):
+        assert needed in routed
+    assert "burning pain" not in routed
+
+
+def test_short_documents_are_sent_whole(monkeypatch):
+    monkeypatch.setattr(settings, "section_routing", True)
+    lab = "WBC 13.2 (high)\nHemoglobin 9.1 (low)\nImpression: anemia"
+    assert select_text(lab, "codes") == lab
@@ -0,0 +1,56 @@
+from app.services.packet_splitter import split_packet
+from app.services.text_extract import normalize_pages
+
+HEADER = "Springfield General Hospital Laboratory"
+FOOTER = "Confidential patient information"
+
+
+def test_serial_labs_keep_every_page():
+    pages = [
+        f"CBC day {n}\nWBC {w} K/uL\nHemoglobin {h} g/dL\nPlatelets {p} K/uL"
+        for n, w, h, p in [(1, 5.2, 13.1, 250), (2, 6.8, 12.4, 231), (3, 9.9, 11.0, 198)]
+    ]
+    text, _ = normalize_pages(pages)
+    for page in pages:
+        assert page in text
+
+
+def test_identical_value_lines_are_not_boilerplate():
+    pages = ["CBC\nWBC 5.2 K/uL\nHemoglobin 13.1 g/dL\nPlatelets 250 K/uL"] * 4
+    text, _ = normalize_pages(pages)
+    assert text.count("WBC 5.2 K/uL") == 4
+    assert text.count("Platelets 250 K/uL") == 4
+
+
+def _packet_pages():
+    cbc = "COMPLETE BLOOD COUNT\nCollected: 01/0{n}/2024\nWBC {w} K/uL\nHemoglobin 13.{n} g/dL"
+    bmp = "BASIC METABOLIC PANEL\nCollected: 01/0{n}/2024\nSodium 14{n} mmol/L\nPotassium 4.{n} mmol/L"
+    bodies = [cbc.format(n=n, w=5 + n) for n in (1, 2, 3)] + [bmp.format(n=n) for n in (4, 5, 6)]
+    return [f"{HEADER}\n{body}\n{FOOTER}" for body in bodies]
+
+
+def test_packet_keeps_titles_and_dates():
+    text, stats = normalize_pages(_packet_pages())
+    assert text.count(HEADER) == 1
+    assert text.count(FOOTER) == 1
+    assert stats["lines_removed"] == 10
+    for n in range(1, 7):
+        assert f"Collected: 01/0{n}/2024" in text
+    assert text.count("COMPLETE BLOOD COUNT") == 3
+    assert text.count("BASIC METABOLIC PANEL") == 3
+
+
+def test_packet_still_splits_after_normalization():
+    text, _ = normalize_pages(_packet_pages())
+    parts = split_packet(text)
+    assert [(p.start_page, p.end_page, p.document_type) for p in parts] == [
+        (1, 3, "COMPLETE BLOOD COUNT"),
+        (4, 6, "BASIC METABOLIC PANEL"),
+    ]
+
+
+def test_bare_page_numbers_are_dropped():
+    pages = [f"Progress note line {n}\nPatient doing well.\nPage {n} of 3" for n in (1, 2, 3)]
+    text, _ = normalize_pages(pages)
+    assert "Page" not in text
+    assert text.count("Patient doing well.") == 3
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark upload DB throughput under the SQLite defaults vs the production profile
+Usage:
+    python scripts/bench_db_writes.py
+    python scripts/bench_db_writes.py --uploads 2000 --concurrency 200
+
+Each simulated upload does the DB work of POST /documents: a dedup
+lookup, create_document, save_signature, save_result and a read back.
+"defaults" runs with SQLite's own settings (rollback journal,
+synchronous=FULL, no busy timeout, no single writer); "production" uses
+the profile from app.config (WAL, synchronous=NORMAL with FULL on the
+writer connection, mmap, cache,
+busy timeout, single-writer queue with write-behind batching); "pragmas
+only" drops the single writer and "single writer" drops the batching.
+Each profile runs in a fresh process
+against a fresh database file.
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend-fastapi"
+
+PROFILES = {
+    "defaults": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_CACHE_SIZE": "-2000",
+        "SQLITE_BUSY_TIMEOUT_MS": "0",
+        "DB_SINGLE_WRITER": "false",
+    },
+    "pragmas only": {"DB_SINGLE_WRITER": "false"},
+    "single writer": {"DB_BATCH_MAX_ROWS": "1"},
+    "production": {},
+}
+
+
+async def run_uploads(uploads: int, concurrency: int) -> None:
+    """Worker mode: runs inside the child process with the profile's env"""
+    sys.path.insert(0, str(BACKEND))
+    from app.db import crud
+    from app.db.database import SessionLocal, engine, init_db
+    from app.db.writer import writer
+    from app.services import near_duplicate
+
+    await init_db()
+    rng = random.Random(0)
+    signature = near_duplicate.minhash(" ".join(str(rng.random()) for _ in range(200)))
+    payload = {"classification": {"document_type": "CLINICAL NOTE"}, "codes": {"codes": []},
+               "summary": {"summary": "x" * 2000}}
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = []
+
+    async def upload(i: int) -> None:
+        content_hash = hashlib.sha256(str(i).encode()).hexdigest()
+        async with semaphore:
+            try:
+                async with SessionLocal() as db:
+                    await crud.get_document_by_hash(db, content_hash)
+                    doc = await writer.run(db, crud.create_document, f"doc{i}.pdf", None, content_hash)
+                    await writer.run(db, crud.save_signature, doc.id, signature)
+                    await writer.run(db, crud.save_result, doc.id, payload)
+                    await crud.get_document_result(db, doc.id)
+            except Exception as e:
+                errors.append(type(e).__name__ + ": " + str(e).splitlines()[0][:60])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(upload(i) for i in range(uploads)))
+    elapsed = time.perf_counter() - start
+    await writer.close()
+    await engine.dispose()
+
+    done = uploads - len(errors)
+    # Each upload writes a document, its signature and its result
+    print(f"{done / elapsed:8.1f} uploads/s | {3 * done / elapsed:8.1f} writes/s"
+          f" | {elapsed:6.2f} s | {len(errors)} failed"
+          + (f" (e.g. {errors[0]})" if errors else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite upload throughput")
+    parser.add_argument("--uploads", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(run_uploads(args.uploads, args.concurrency))
+        return
+
+    print("=" * 60)
+    print(f"SQLite write benchmark ({args.uploads} uploads, {args.concurrency} concurrent)")
+    print("=" * 60)
+    for name, overrides in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {**os.environ, **overrides, "DB_URL": f"sqlite:///{tmp}/bench.db", "USE_CLAUDE": "false"}
+            out = subprocess.run(
+                [sys.executable, __file__, "--worker",
+                 "--uploads", str(args.uploads), "--concurrency", str(args.concurrency)],
+                env=env, capture_output=True, text=True, cwd=BACKEND,
+            )
+            lines = [l for l in out.stdout.splitlines() if "uploads/s" in l]
+            print(f"   {name:>13} | " + (lines[-1] if lines else f"failed: {out.stderr.strip()[-300:]}"))
+
+
+if __name__ == "__main__":
+    main()
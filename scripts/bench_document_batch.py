@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark listing documents with result previews: N+1 requests vs batch
+Usage:
+    python scripts/bench_document_batch.py
+    python scripts/bench_document_batch.py --docs 20000 --repeats 50
+
+For pages of 10-200 documents, times what a history view needs to show
+summaries three ways, through the real routes in-process:
+  n+1:      GET /documents, then GET /documents/{id} for every row
+  include:  GET /documents?include=results (one request, two queries)
+  batch:    POST /documents/batch with the page's ids
+The response cache is disabled so every variant reads the database.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_document_get import engine, populate, settings  # sets up a temporary DB first
+
+import httpx
+from fastapi import FastAPI
+
+from app.routes import pipeline
+
+
+async def time_variant(client: httpx.AsyncClient, name: str, rows: int, ids: list) -> float:
+    start = time.perf_counter()
+    if name == "n+1":
+        page = (await client.get("/documents", params={"limit": rows})).json()
+        for doc in page:
+            (await client.get(f"/documents/{doc['id']}")).json()
+    elif name == "include":
+        (await client.get("/documents", params={"limit": rows, "include": "results"})).json()
+    else:
+        (await client.post("/documents/batch", json={"ids": ids})).json()
+    return (time.perf_counter() - start) * 1000
+
+
+async def run(docs: int, repeats: int) -> None:
+    await populate(docs)
+    settings.result_cache_max_bytes = 0
+    app = FastAPI()
+    app.include_router(pipeline.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        print(f"   {'rows':>5} | {'n+1':>10} | {'include':>10} | {'batch':>10}")
+        for rows in (10, 50, 100, 200):
+            ids = [d["id"] for d in (await client.get("/documents", params={"limit": rows})).json()]
+            medians = []
+            for name in ("n+1", "include", "batch"):
+                await time_variant(client, name, rows, ids)  # warm up
+                medians.append(statistics.median(
+                    [await time_variant(client, name, rows, ids) for _ in range(repeats)]
+                ))
+            print(f"   {rows:>5} | " + " | ".join(f"{m:7.1f} ms" for m in medians))
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch document retrieval")
+    parser.add_argument("--docs", type=int, default=5000, help="Stored documents")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per page size")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Document listing with previews ({args.docs:,} documents, median of {args.repeats})")
+    print("=" * 60)
+    asyncio.run(run(args.docs, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
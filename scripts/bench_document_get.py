@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /documents/{id}: raw JSON passthrough, response cache and ETags
+Usage:
+    python scripts/bench_document_get.py
+    python scripts/bench_document_get.py --docs 20000 --requests 5000
+
+Serves the real routes in-process (httpx ASGI transport, no network) from
+a temporary SQLite database of realistic results and compares:
+  before:   the previous handler (two queries, json.loads of payload_json,
+            FastAPI's jsonable_encoder + json.dumps of the whole dict)
+  after:    the current handler (one query, stored JSON spliced in)
+  fields:   the current handler with ?fields=summary,codes
+  cached:   the current handler served from the response cache
+  304:      conditional GETs with a matching If-None-Match
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend-fastapi"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DB_URL"] = f"sqlite:///{_tmp.name}/bench.db"
+os.environ["USE_CLAUDE"] = "false"
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db import crud, payload as payload_codec
+from app.db.database import SessionLocal, engine, get_db, init_db
+from app.db.models import DocumentResult
+from app.routes import pipeline
+from bench_result_storage import make_payload
+
+legacy = APIRouter()
+
+
+@legacy.get("/before/documents/{document_id}")
+async def get_document_before(document_id: int, db: AsyncSession = Depends(get_db)):
+    doc = await crud.get_document(db, document_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    payload = await db.scalar(
+        select(DocumentResult.payload_json).where(DocumentResult.document_id == document_id)
+    )
+    return {
+        "id": doc.id,
+        "original_filename": doc.original_filename,
+        "created_at": doc.created_at.isoformat(),
+        "local_path": doc.local_path,
+        "parent_id": doc.parent_id,
+        "results": json.loads(payload) if payload is not None else None,
+    }
+
+
+async def populate(docs: int) -> None:
+    """Results stored in both formats, so both handlers read the same data"""
+    await init_db()
+    rng = random.Random(3)
+    now = datetime(2024, 1, 1).isoformat(" ", "microseconds")
+    async with engine.begin() as conn:
+        for offset in range(0, docs, 5000):
+            ids = range(offset + 1, min(offset + 5000, docs) + 1)
+            await conn.exec_driver_sql(
+                "INSERT INTO documents (id, original_filename, created_at) VALUES (?, ?, ?)",
+                [(i, f"doc{i}.pdf", now) for i in ids],
+            )
+            rows = []
+            for i in ids:
+                p = make_payload(rng)
+                rows.append((i, payload_codec.encode(p), json.dumps(p), now))
+            await conn.exec_driver_sql(
+                "INSERT INTO document_results (document_id, payload, payload_json, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+
+async def run(docs: int, requests: int) -> None:
+    await populate(docs)
+    # Measure the DB path first; the response cache is enabled further down
+    cache_bytes, settings.result_cache_max_bytes = settings.result_cache_max_bytes, 0
+    app = FastAPI()
+    app.include_router(pipeline.router)
+    app.include_router(legacy)
+
+    variants = {
+        "before": ("/before/documents/{}", {}),
+        "after": ("/documents/{}", {}),
+        "fields": ("/documents/{}", {"fields": "summary,codes"}),
+    }
+    # Handler + serialization only (what the endpoint itself costs per request)
+    handlers = {
+        # FastAPI renders a returned dict as JSONResponse(jsonable_encoder(...))
+        "before": lambda i, db: get_document_before(i, db),
+        "after": lambda i, db: pipeline.get_document(i, fields=None, if_none_match=None, db=db),
+        "fields": lambda i, db: pipeline.get_document(i, fields="summary,codes", if_none_match=None, db=db),
+    }
+    print("   Handler + serialization:")
+    async with SessionLocal() as db:
+        for name, handler in handlers.items():
+            rng = random.Random(1)
+            start = time.perf_counter()
+            for _ in range(requests):
+                result = await handler(rng.randint(1, docs), db)
+                if name == "before":
+                    JSONResponse(jsonable_encoder(result)).body
+            elapsed = time.perf_counter() - start
+            print(f"   {name:>7}: {requests / elapsed:7,.0f} req/s | {elapsed / requests * 1000:.3f} ms/req")
+
+    print("   Full request through the ASGI app:")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name, (path, params) in variants.items():
+            await client.get(path.format(1), params=params)  # warm up
+            rng = random.Random(1)
+            size = 0
+            start = time.perf_counter()
+            for _ in range(requests):
+                r = await client.get(path.format(rng.randint(1, docs)), params=params)
+                size += len(r.content)
+            elapsed = time.perf_counter() - start
+            print(f"   {name:>7}: {requests / elapsed:7,.0f} req/s | {elapsed / requests * 1000:.3f} ms/req"
+                  f" | {size / requests:,.0f} B/response")
+
+        # Response cache: fill it (recording ETags), then plain hits and conditional GETs
+        settings.result_cache_max_bytes = cache_bytes
+        etags = {}
+        for i in range(1, docs + 1):
+            etags[i] = (await client.get(f"/documents/{i}")).headers["etag"]
+        for name, conditional in (("cached", False), ("304", True)):
+            rng = random.Random(1)
+            start = time.perf_counter()
+            for _ in range(requests):
+                i = rng.randint(1, docs)
+                r = await client.get(f"/documents/{i}", headers={"If-None-Match": etags[i]} if conditional else {})
+                assert r.status_code == (304 if conditional else 200)
+            elapsed = time.perf_counter() - start
+            print(f"   {name:>7}: {requests / elapsed:7,.0f} req/s | {elapsed / requests * 1000:.3f} ms/req")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GET /documents/{id}")
+    parser.add_argument("--docs", type=int, default=5000, help="Stored documents")
+    parser.add_argument("--requests", type=int, default=3000, help="Requests per variant")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"GET /documents/{{id}} benchmark ({args.docs:,} documents, {args.requests:,} requests each)")
+    print("=" * 60)
+    asyncio.run(run(args.docs, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk export (app.services.export) throughput and memory
+Usage:
+    python scripts/bench_export.py                  # 2M documents
+    python scripts/bench_export.py --docs 200000    # quicker run
+
+Fills a temporary SQLite database with realistic stored results, then
+exports every document as NDJSON and as Parquet to a file, reporting
+rows/s, MB/s and the process's resident heap over the run. Memory should stay flat
+(one batch of rows at a time) whatever the number of documents.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend-fastapi"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DB_URL"] = f"sqlite:///{_tmp.name}/bench.db"
+
+from sqlalchemy import create_engine
+
+from app.db import payload as payload_codec
+from app.db.database import Base, engine
+from app.db.models import Document, DocumentResult
+from app.services import export
+from bench_result_storage import make_payload
+
+START = datetime(2023, 1, 1)
+
+
+def heap_mb() -> float:
+    """Resident anonymous memory; SQLite's mmap of the DB file shows up as RSS too, so it is left out"""
+    with open("/proc/self/statm") as f:
+        _, resident, shared = (int(v) for v in f.read().split()[:3])
+    return (resident - shared) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def populate(docs: int, batch: int = 20000) -> None:
+    """Documents with encoded results, cycling through a pool of distinct payloads"""
+    rng = random.Random(3)
+    pool = [payload_codec.encode(make_payload(rng)) for _ in range(2000)]
+    sync_engine = create_engine(os.environ["DB_URL"])
+    Base.metadata.create_all(sync_engine, tables=[Document.__table__, DocumentResult.__table__])
+    with sync_engine.begin() as conn:
+        for offset in range(0, docs, batch):
+            ids = range(offset + 1, min(offset + batch, docs) + 1)
+            stamps = {i: (START + timedelta(seconds=i)).isoformat(" ", "microseconds") for i in ids}
+            conn.exec_driver_sql(
+                "INSERT INTO documents (id, original_filename, created_at) VALUES (?, ?, ?)",
+                [(i, f"doc{i}.pdf", stamps[i]) for i in ids],
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO document_results (id, document_id, payload, created_at) VALUES (?, ?, ?, ?)",
+                [(i, i, pool[i % len(pool)], stamps[i]) for i in ids],
+            )
+    sync_engine.dispose()
+
+
+async def run_export(fmt: str, path: Path) -> dict:
+    peak = before = heap_mb()
+    start = time.perf_counter()
+    with open(path, "wb") as out:
+        async for chunk in export.chunks(fmt):
+            out.write(chunk)
+            peak = max(peak, heap_mb())
+    return {
+        "elapsed": time.perf_counter() - start,
+        "size": path.stat().st_size / 1e6,
+        "before": before,
+        "peak": peak,
+    }
+
+
+async def run(docs: int, formats: list) -> None:
+    for fmt in formats:
+        r = await run_export(fmt, Path(_tmp.name) / f"export.{fmt}")
+        print(f"   {fmt:>7}: {docs / r['elapsed']:9,.0f} rows/s | {r['size'] / r['elapsed']:6.1f} MB/s"
+              f" | {r['elapsed']:6.1f}s | {r['size']:8,.1f} MB out"
+              f" | memory {r['before']:.0f} -> peak {r['peak']:.0f} MB")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NDJSON/Parquet bulk export")
+    parser.add_argument("--docs", type=int, default=2_000_000, help="Stored documents")
+    parser.add_argument("--formats", default="ndjson,parquet", help="Comma-separated formats to export")
+    args = parser.parse_args()
+    formats = [f for f in args.formats.split(",") if f]
+    if "parquet" in formats and not export.parquet_available():
+        print("[WARN] pyarrow not installed; skipping parquet")
+        formats.remove("parquet")
+
+    print("=" * 60)
+    print(f"Bulk export benchmark ({args.docs:,} documents, {export.EXPORT_BATCH_ROWS:,} rows per batch)")
+    print("=" * 60)
+    start = time.perf_counter()
+    populate(args.docs)
+    db_size = (Path(_tmp.name) / "bench.db").stat().st_size / 1e6
+    print(f"   Populate: {time.perf_counter() - start:.1f}s | DB {db_size:,.0f} MB")
+    asyncio.run(run(args.docs, formats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /documents paging: keyset cursors vs LIMIT/OFFSET
+Usage:
+    python scripts/bench_list_pagination.py                 # 1M documents
+    python scripts/bench_list_pagination.py --docs 100000   # quicker run
+
+Times a 50-row page at increasing depths three ways: the old query
+(ORDER BY created_at DESC with no index, i.e. a full sort), OFFSET paging
+on the (created_at, id) index, and crud.list_documents with a keyset
+cursor, which should cost the same at every depth.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend-fastapi"))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import crud
+from app.db.database import Base
+from app.db.models import Document
+
+PAGE = 50
+START = datetime(2023, 1, 1)
+
+
+def build(engine, docs: int, batch: int = 50000) -> float:
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for offset in range(0, docs, batch):
+            conn.exec_driver_sql(
+                "INSERT INTO documents (id, original_filename, created_at) VALUES (?, ?, ?)",
+                [
+                    (i, f"doc{i}.pdf", (START + timedelta(seconds=i)).isoformat(" ", "microseconds"))
+                    for i in range(offset + 1, min(offset + batch, docs) + 1)
+                ],
+            )
+    return time.perf_counter() - start
+
+
+async def time_depth(db_url: str, docs: int, depth: int, repeats: int) -> dict:
+    """p99 latency (ms) of the page starting depth rows from the newest"""
+    async_engine = create_async_engine(db_url)
+    timings = {"offset": [], "keyset": []}
+    # Newest-first row number depth is id docs - depth + 1, so the cursor is the row before it
+    cursor = None
+    if depth:
+        last = docs - depth + 1
+        cursor = (START + timedelta(seconds=last), last)
+    async with async_sessionmaker(async_engine)() as db:
+        await crud.list_documents(db, limit=PAGE, before=cursor)  # warm up (statement compilation)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            await db.execute(
+                text("SELECT * FROM documents ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset"),
+                {"limit": PAGE, "offset": depth},
+            )
+            timings["offset"].append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            await crud.list_documents(db, limit=PAGE, before=cursor)
+            timings["keyset"].append((time.perf_counter() - start) * 1000)
+    await async_engine.dispose()
+    return {k: sorted(v)[min(len(v) - 1, int(len(v) * 0.99))] for k, v in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keyset pagination of GET /documents")
+    parser.add_argument("--docs", type=int, default=1_000_000, help="Stored documents")
+    parser.add_argument("--repeats", type=int, default=30, help="Timed requests per depth")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Document list paging benchmark ({args.docs:,} documents, {PAGE} per page)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        db_url = f"sqlite+aiosqlite:///{db_path}"
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(engine, tables=[Document.__table__])
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX ix_documents_created_id")
+
+        elapsed = build(engine, args.docs)
+        print(f"   Insert: {elapsed:.1f}s")
+
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            conn.exec_driver_sql(
+                f"SELECT * FROM documents ORDER BY created_at DESC LIMIT {PAGE}"
+            ).fetchall()
+        print(f"   First page without the index (full sort): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE INDEX ix_documents_created_id ON documents (created_at, id)")
+
+        print(f"   {'depth':>9} | {'OFFSET p99':>11} | {'keyset p99':>11}")
+        depths = [0, 1_000, 10_000, 100_000, args.docs // 2, args.docs - PAGE]
+        p99s = []
+        for depth in sorted({d for d in depths if 0 <= d < args.docs}):
+            p99 = asyncio.run(time_depth(db_url, args.docs, depth, args.repeats))
+            p99s.append(p99["keyset"])
+            print(f"   {depth:>9,} | {p99['offset']:>8.2f} ms | {p99['keyset']:>8.2f} ms")
+        print(f"   Keyset p99 spread across depths: {min(p99s):.2f}-{max(p99s):.2f} ms "
+              f"(median {statistics.median(p99s):.2f} ms)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
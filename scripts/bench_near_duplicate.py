@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark MinHash LSH near-duplicate detection at scale
+Usage:
+    python scripts/bench_near_duplicate.py                 # 1M indexed documents
+    python scripts/bench_near_duplicate.py --docs 100000   # quicker run
+
+Reports signature throughput, index build time (signatures + LSH bucket
+rows in SQLite) and lookup latency for planted near-duplicates.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend-fastapi"))
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import crud
+from app.db.database import Base
+from app.db.models import DocumentSignature, DocumentLshBucket
+from app.services import near_duplicate
+
+WORDS = (
+    "patient chest xray opacity lobe pneumonia effusion heart normal wbc hemoglobin platelets "
+    "sodium potassium creatinine glucose impression findings history cough fever follow up "
+    "recommend radiograph ct contrast mass nodule lesion acute chronic mild moderate severe"
+).split()
+
+
+def make_report(rng: random.Random, words: int = 250) -> str:
+    return " ".join(rng.choice(WORDS) + str(rng.randint(0, 50)) for _ in range(words))
+
+
+def perturb(text: str, rng: random.Random, edits: int = 5) -> str:
+    """Simulate a re-scan: new header/date and a handful of OCR-like token changes"""
+    tokens = text.split()
+    for _ in range(edits):
+        tokens[rng.randrange(len(tokens))] = rng.choice(WORDS)
+    return f"Report date 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} " + " ".join(tokens)
+
+
+def bench_signatures(rng: random.Random, samples: int) -> None:
+    texts = [make_report(rng) for _ in range(samples)]
+    start = time.perf_counter()
+    for t in texts:
+        near_duplicate.minhash(t)
+    elapsed = time.perf_counter() - start
+    print(f"   MinHash: {samples / elapsed:,.0f} docs/sec ({elapsed / samples * 1000:.2f} ms/doc, 250 words)")
+    long_text = make_report(rng, 400_000)
+    start = time.perf_counter()
+    near_duplicate.minhash(long_text)
+    print(f"   MinHash of a 400k-word document: {(time.perf_counter() - start) * 1000:,.0f} ms "
+          f"(sampled to {near_duplicate.MAX_SHINGLES:,} shingles)")
+
+
+def build_index(engine, docs: int, planted: list, batch: int = 20000) -> float:
+    """Insert random signatures for docs documents; planted signatures go first"""
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for offset in range(0, docs, batch):
+            sig_rows, bucket_rows = [], []
+            for doc_id in range(offset + 1, min(offset + batch, docs) + 1):
+                if doc_id <= len(planted):
+                    sig = planted[doc_id - 1]
+                else:
+                    sig = array("I", os.urandom(4 * near_duplicate.NUM_PERM)).tolist()
+                sig_rows.append((doc_id, near_duplicate.pack_signature(sig)))
+                bucket_rows.extend((key, doc_id) for key in near_duplicate.band_keys(sig))
+            conn.exec_driver_sql(
+                "INSERT INTO document_signatures (document_id, signature) VALUES (?, ?)", sig_rows
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO document_lsh_buckets (bucket_key, document_id) VALUES (?, ?)", bucket_rows
+            )
+    return time.perf_counter() - start
+
+
+async def run_queries(db_url: str, queries: list, threshold: float) -> tuple:
+    """Look up each planted near-duplicate; returns (latencies in ms, hits)"""
+    async_engine = create_async_engine(db_url)
+    latencies, hits = [], 0
+    async with async_sessionmaker(async_engine)() as db:
+        for i, sig in enumerate(queries):
+            start = time.perf_counter()
+            matches = await crud.find_near_duplicates(db, sig, threshold)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += any(doc_id == i + 1 for doc_id, _ in matches)
+    await async_engine.dispose()
+    return latencies, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MinHash LSH near-duplicate lookup")
+    parser.add_argument("--docs", type=int, default=1_000_000, help="Indexed documents")
+    parser.add_argument("--queries", type=int, default=200, help="Near-duplicate lookups to time")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Jaccard threshold")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    print("=" * 60)
+    print(f"MinHash LSH benchmark ({args.docs:,} documents, {near_duplicate.BANDS}x{near_duplicate.ROWS} bands)")
+    print("=" * 60)
+
+    bench_signatures(rng, 200)
+
+    originals = [make_report(rng) for _ in range(args.queries)]
+    planted = [near_duplicate.minhash(t) for t in originals]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(engine, tables=[DocumentSignature.__table__, DocumentLshBucket.__table__])
+
+        build = build_index(engine, args.docs, planted)
+        print(f"   Index build: {build:.1f}s ({args.docs / build:,.0f} docs/sec), "
+              f"DB size {db_path.stat().st_size / 1e6:,.0f} MB")
+
+        queries = [near_duplicate.minhash(perturb(text, rng)) for text in originals]
+        latencies, hits = asyncio.run(run_queries(f"sqlite+aiosqlite:///{db_path}", queries, args.threshold))
+
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"   Query: p50 {statistics.median(latencies):.2f} ms, p99 {p99:.2f} ms")
+        print(f"   Recall of planted near-duplicates: {hits}/{len(originals)}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
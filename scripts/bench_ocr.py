@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark OCR throughput on scanned PDFs
+Usage:
+    python scripts/bench_ocr.py
+    python scripts/bench_ocr.py --pages 32 --workers 1 2 4
+    python scripts/bench_ocr.py --pdf scan.pdf
+
+Runs the OCR stage (one pool task per page) with each pool size and
+reports pages/sec overall and per worker core. Use --pdf with a real scan
+for meaningful numbers: the synthetic pages are small noise images, so
+they only measure the per-page overhead. Requires the configured OCR
+engine (OCR_ENGINE, TESSERACT_CMD) to be installed.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend-fastapi"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.config import settings
+from app.services import ocr, pdf_pool
+from synthetic_pdf import make_report_pdf
+
+
+async def bench(pdf: bytes, page_count: int, workers: int) -> None:
+    pdf_pool.shutdown()
+    settings.pdf_workers = workers
+    # Warm the pool so worker spawn time is not charged to the run
+    await ocr.ocr_pdf_pages(pdf, [0])
+
+    start = time.perf_counter()
+    texts = await ocr.ocr_pdf_pages(pdf, list(range(page_count)))
+    elapsed = time.perf_counter() - start
+    chars = sum(len(t) for t in texts)
+    rate = page_count / elapsed
+    print(f"   {workers:>2} workers | {elapsed:7.2f} s | {rate:6.2f} pages/s"
+          f" | {rate / workers:6.2f} pages/s/core | {chars} chars")
+
+
+async def main_async(args, pdf: bytes, page_count: int) -> None:
+    for workers in args.workers:
+        await bench(pdf, page_count, workers)
+    pdf_pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR throughput")
+    parser.add_argument("--pdf", type=Path, help="Scanned PDF to OCR (default: synthetic)")
+    parser.add_argument("--pages", type=int, default=16, help="Synthetic PDF size")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Pool sizes")
+    args = parser.parse_args()
+
+    if not ocr.available():
+        print(f"OCR engine '{settings.ocr_engine}' is not available "
+              f"(is '{settings.tesseract_cmd}' on PATH?)")
+        sys.exit(1)
+
+    pdf = args.pdf.read_bytes() if args.pdf else make_report_pdf(args.pages, scanned=True)
+    page_count = pdf_pool.count_pages(pdf)
+    settings.ocr_timeout = 3600.0
+
+    print("=" * 60)
+    print(f"OCR benchmark ({settings.ocr_engine}, {page_count} pages, "
+          f"{'Pillow' if ocr.Image is not None else 'no'} preprocessing)")
+    print("=" * 60)
+    asyncio.run(main_async(args, pdf, page_count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark serial vs process-pool PDF text extraction
+Usage:
+    python scripts/bench_pdf_extract.py
+    python scripts/bench_pdf_extract.py --pages 10 100 500 --workers 4
+
+For each synthetic PDF size, reports wall time of the old in-handler
+serial extraction and of the pooled page-range extraction, plus the
+longest event-loop stall observed while each one runs.
+"""
+import argparse
+import asyncio
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend-fastapi"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.config import settings
+from app.services import pdf_pool
+from app.services.text_extract import extract_text_from_pdf
+from synthetic_pdf import make_report_pdf
+
+
+async def _max_loop_stall(work) -> tuple:
+    """Run work() while a 1 ms ticker measures the longest event-loop stall"""
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last - 0.001)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+    done = True
+    await tick
+    return elapsed, stall
+
+
+async def bench(pages: int) -> None:
+    pdf = make_report_pdf(pages, seed=pages)
+
+    async def serial():
+        # What the upload handler used to do: parse inline on the event loop
+        extract_text_from_pdf(io.BytesIO(pdf))
+
+    async def pooled():
+        await pdf_pool.extract_pdf_text(pdf)
+
+    s_time, s_stall = await _max_loop_stall(serial)
+    p_time, p_stall = await _max_loop_stall(pooled)
+    print(f"   {pages:>4} pages | serial {s_time * 1000:8.0f} ms (loop stall {s_stall * 1000:6.0f} ms)"
+          f" | pool {p_time * 1000:8.0f} ms (loop stall {p_stall * 1000:4.0f} ms)"
+          f" | speedup {s_time / p_time:4.1f}x")
+
+
+async def main_async(args) -> None:
+    # Warm the pool so worker spawn time is not charged to the first size
+    await pdf_pool.extract_pdf_text(make_report_pdf(1))
+    for pages in args.pages:
+        await bench(pages)
+    pdf_pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction in a process pool")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500], help="PDF sizes")
+    parser.add_argument("--workers", type=int, default=0, help="Pool size (0 = CPU count)")
+    parser.add_argument("--pages-per-task", type=int, default=settings.pdf_pages_per_task)
+    args = parser.parse_args()
+
+    settings.pdf_workers = args.workers
+    settings.pdf_pages_per_task = args.pages_per_task
+    settings.pdf_extract_timeout = 600.0
+
+    print("=" * 60)
+    print(f"PDF extraction benchmark ({args.workers or 'all'} workers, "
+          f"{args.pages_per_task} pages/task)")
+    print("=" * 60)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
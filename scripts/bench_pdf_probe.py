@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark the scanned-PDF probe against full text extraction
+Usage:
+    python scripts/bench_pdf_probe.py
+    python scripts/bench_pdf_probe.py --pages 10 100 500 --samples 5
+
+For text and image-only synthetic PDFs of each size, reports how long the
+probe takes to classify the file versus a full serial extraction, i.e. the
+work saved by rejecting a scanned upload up front.
+"""
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend-fastapi"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.services.pdf_pool import probe_pdf
+from app.services.text_extract import extract_text_from_pdf
+from synthetic_pdf import make_report_pdf
+
+
+def _timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scanned-PDF probe")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500], help="PDF sizes")
+    parser.add_argument("--samples", type=int, default=5, help="Pages sampled by the probe")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Scanned-PDF probe benchmark ({args.samples} sampled pages)")
+    print("=" * 60)
+    for scanned in (False, True):
+        label = "scanned" if scanned else "text"
+        for pages in args.pages:
+            pdf = make_report_pdf(pages, seed=pages, scanned=scanned)
+            kind = probe_pdf(pdf, args.samples)["kind"]
+            probe_s = _timed(lambda: probe_pdf(pdf, args.samples), args.repeat)
+            full_s = _timed(lambda: extract_text_from_pdf(io.BytesIO(pdf)), args.repeat)
+            print(f"   {label:>7} {pages:>4} pages -> {kind:<7} | probe {probe_s * 1000:7.1f} ms"
+                  f" | full extraction {full_s * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
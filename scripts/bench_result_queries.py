@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark code/type queries on the normalized result tables vs payload scans
+Usage:
+    python scripts/bench_result_queries.py                 # 1M documents
+    python scripts/bench_result_queries.py --docs 100000   # quicker run
+
+Stores synthetic pipeline results, builds document_classifications /
+document_codes / document_summaries with the startup backfill, then times
+"documents with code X" and "documents of type Y in a date range" through
+the indexed crud queries against a full scan that json.loads every payload.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend-fastapi"))
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import crud, result_index
+from app.db.database import Base
+from app.db.models import (
+    Document,
+    DocumentClassification,
+    DocumentCode,
+    DocumentResult,
+    DocumentSummary,
+)
+
+DOC_TYPES = ["COMPLETE BLOOD COUNT", "BASIC METABOLIC PANEL", "X-RAY", "CT", "CLINICAL NOTE"]
+CODES = [f"{letter}{n:02d}.{d}" for letter in "EIJKNR" for n in range(10, 60) for d in range(10)]
+START = datetime(2023, 1, 1)
+
+
+def make_payload(rng: random.Random) -> dict:
+    codes = rng.sample(CODES, rng.randint(0, 4))
+    return {
+        "classification": {"document_type": rng.choice(DOC_TYPES), "confidence": round(rng.random(), 2)},
+        "codes": {"codes": [{"code": c, "description": "Synthetic diagnosis", "confidence": 0.8} for c in codes]},
+        "summary": {"summary": "Synthetic summary. " * 10, "bullets": ["a", "b"], "confidence": 0.7},
+    }
+
+
+def build(engine, docs: int, rng: random.Random, batch: int = 20000) -> float:
+    """Insert documents and their result payloads (no normalized rows)"""
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for offset in range(0, docs, batch):
+            doc_rows, result_rows = [], []
+            for doc_id in range(offset + 1, min(offset + batch, docs) + 1):
+                created = (START + timedelta(minutes=doc_id)).isoformat(" ", "microseconds")
+                doc_rows.append((doc_id, f"doc{doc_id}.pdf", created))
+                result_rows.append((doc_id, json.dumps(make_payload(rng)), created))
+            conn.exec_driver_sql(
+                "INSERT INTO documents (id, original_filename, created_at) VALUES (?, ?, ?)", doc_rows
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO document_results (document_id, payload_json, created_at) VALUES (?, ?, ?)",
+                result_rows,
+            )
+    return time.perf_counter() - start
+
+
+def scan(engine, code: str, document_type: str, since: datetime, until: datetime) -> tuple:
+    """The pre-index way: parse every payload; returns (code ms, type ms)"""
+    timings = []
+    for match in (
+        lambda p, _: any(c["code"] == code for c in p["codes"]["codes"]),
+        lambda p, created: p["classification"]["document_type"] == document_type and since <= created < until,
+    ):
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT r.document_id, r.payload_json, d.created_at FROM document_results r "
+                "JOIN documents d ON d.id = r.document_id"
+            )
+            for _, payload, created in rows:
+                match(json.loads(payload), datetime.fromisoformat(created))
+        timings.append((time.perf_counter() - start) * 1000)
+    return tuple(timings)
+
+
+async def run_queries(db_url: str, codes: list, since: datetime, until: datetime) -> tuple:
+    """Time the indexed queries; returns (code latencies ms, type latencies ms)"""
+    async_engine = create_async_engine(db_url)
+    by_code, by_type = [], []
+    async with async_sessionmaker(async_engine)() as db:
+        for i, code in enumerate(codes):
+            start = time.perf_counter()
+            await crud.list_documents_by_code(db, code, limit=50)
+            by_code.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            await crud.list_documents_by_type(db, DOC_TYPES[i % len(DOC_TYPES)], since=since, until=until)
+            by_type.append((time.perf_counter() - start) * 1000)
+    await async_engine.dispose()
+    return by_code, by_type
+
+
+def report(label: str, latencies: list) -> None:
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"   {label}: p50 {statistics.median(latencies):.2f} ms, p99 {p99:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indexed code/type result queries")
+    parser.add_argument("--docs", type=int, default=1_000_000, help="Stored results")
+    parser.add_argument("--queries", type=int, default=200, help="Indexed lookups to time")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    print("=" * 60)
+    print(f"Result query benchmark ({args.docs:,} documents)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(engine, tables=[
+            Document.__table__, DocumentResult.__table__, DocumentClassification.__table__,
+            DocumentCode.__table__, DocumentSummary.__table__,
+        ])
+
+        elapsed = build(engine, args.docs, rng)
+        print(f"   Insert: {elapsed:.1f}s ({args.docs / elapsed:,.0f} docs/sec)")
+
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            indexed = result_index.backfill(conn)
+        elapsed = time.perf_counter() - start
+        print(f"   Backfill: {indexed:,} results in {elapsed:.1f}s ({indexed / elapsed:,.0f} docs/sec), "
+              f"DB size {db_path.stat().st_size / 1e6:,.0f} MB")
+
+        # A one-week window somewhere in the middle of the data
+        since = START + timedelta(minutes=args.docs // 2)
+        until = since + timedelta(days=7)
+        codes = [rng.choice(CODES) for _ in range(args.queries)]
+
+        by_code, by_type = asyncio.run(
+            run_queries(f"sqlite+aiosqlite:///{db_path}", codes, since, until)
+        )
+        report("Indexed by code (50 newest)", by_code)
+        report("Indexed by type + week", by_type)
+
+        code_ms, type_ms = scan(engine, codes[0], DOC_TYPES[0], since, until)
+        print(f"   Payload scan: by code {code_ms:,.0f} ms, by type + week {type_ms:,.0f} ms")
+        print(f"   Speedup: by code {code_ms / statistics.median(by_code):,.0f}x, "
+              f"by type {type_ms / statistics.median(by_type):,.0f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
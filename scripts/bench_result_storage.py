@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark result payload storage: JSON text vs zstd-compressed orjson
+Usage:
+    python scripts/bench_result_storage.py
+    python scripts/bench_result_storage.py --docs 100000
+
+Stores the same realistic pipeline results (classification with evidence,
+ICD-10 codes with evidence quotes, a patient-friendly summary with bullets
+and citations) once as legacy payload_json text and once in the binary
+payload column (app.db.payload), then reports DB file size, insert cost
+(serialization + INSERT) and read latency through crud.get_document_result.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend-fastapi"))
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import crud, payload as payload_codec
+from app.db.database import Base
+from app.db.models import Document, DocumentResult
+
+SENTENCES = [
+    "Your white blood cell count is within the normal range, which suggests no active infection.",
+    "Hemoglobin is slightly below the reference range, which can be a sign of mild anemia.",
+    "Your kidney function, measured by creatinine, is normal.",
+    "Blood sugar (glucose) is higher than normal; your doctor may want to check for diabetes.",
+    "The chest X-ray shows no signs of pneumonia or fluid around the lungs.",
+    "Potassium and sodium levels are balanced and within expected limits.",
+    "A small nodule was seen in the right lung; a follow-up scan is usually recommended.",
+    "Platelet count is normal, so blood clotting should not be affected.",
+]
+CODES = [
+    ("D64.9", "Anemia, unspecified", "Hemoglobin 10.9 g/dL (L)"),
+    ("E11.9", "Type 2 diabetes mellitus without complications", "Glucose 182 mg/dL (H)"),
+    ("R91.1", "Solitary pulmonary nodule", "6 mm nodule in the right upper lobe"),
+    ("I10", "Essential (primary) hypertension", "History of hypertension"),
+    ("E87.6", "Hypokalemia", "Potassium 3.2 mmol/L (L)"),
+]
+
+
+def make_payload(rng: random.Random) -> dict:
+    codes = rng.sample(CODES, rng.randint(1, 4))
+    sentences = [rng.choice(SENTENCES) for _ in range(rng.randint(8, 16))]
+    return {
+        "classification": {
+            "document_type": rng.choice(["COMPLETE BLOOD COUNT", "BASIC METABOLIC PANEL", "X-RAY"]),
+            "confidence": round(rng.uniform(0.7, 1.0), 2),
+            "rationale": "The document lists laboratory values with reference ranges and flags.",
+            "evidence": [rng.choice(SENTENCES) for _ in range(3)],
+        },
+        "codes": {
+            "codes": [
+                {"code": c, "description": d, "confidence": round(rng.uniform(0.5, 1.0), 2),
+                 "evidence": [e], "type": "diagnosis"}
+                for c, d, e in codes
+            ],
+            "chunks": 1,
+        },
+        "summary": {
+            "summary": " ".join(sentences),
+            "bullets": sentences[:5],
+            "citations": [{"quote": e, "section": "RESULTS"} for _, _, e in codes],
+            "confidence": round(rng.uniform(0.6, 0.95), 2),
+        },
+    }
+
+
+def insert(engine, payloads: list, binary: bool, batch: int = 5000) -> float:
+    """Insert all payloads in one format; returns seconds (serialization included)"""
+    now = datetime(2024, 1, 1).isoformat(" ", "microseconds")
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for offset in range(0, len(payloads), batch):
+            rows = []
+            for i, p in enumerate(payloads[offset:offset + batch], offset + 1):
+                if binary:
+                    rows.append((i, i, payload_codec.encode(p), None, now))
+                else:
+                    rows.append((i, i, None, json.dumps(p), now))
+            conn.exec_driver_sql(
+                "INSERT INTO document_results (id, document_id, payload, payload_json, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+    return time.perf_counter() - start
+
+
+async def read_latencies(db_url: str, docs: int, reads: int, rng: random.Random) -> list:
+    async_engine = create_async_engine(db_url)
+    latencies = []
+    async with async_sessionmaker(async_engine)() as db:
+        await crud.get_document_result(db, 1)
+        for _ in range(reads):
+            doc_id = rng.randint(1, docs)
+            start = time.perf_counter()
+            await crud.get_document_result(db, doc_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+    await async_engine.dispose()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark result payload storage formats")
+    parser.add_argument("--docs", type=int, default=20000, help="Stored results")
+    parser.add_argument("--reads", type=int, default=2000, help="Random reads to time")
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    payloads = [make_payload(rng) for _ in range(args.docs)]
+    raw = statistics.mean(len(json.dumps(p)) for p in payloads[:1000])
+    packed = statistics.mean(len(payload_codec.encode(p)) for p in payloads[:1000])
+
+    print("=" * 60)
+    print(f"Result storage benchmark ({args.docs:,} results, ~{raw:,.0f} bytes of JSON each)")
+    print("=" * 60)
+    print(f"   Encoded size: {raw:,.0f} B JSON -> {packed:,.0f} B zstd+orjson ({raw / packed:.1f}x smaller)")
+
+    for label, binary in (("JSON text (legacy)", False), ("zstd + orjson", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "bench.db"
+            engine = create_engine(f"sqlite:///{db_path}")
+            Base.metadata.create_all(engine, tables=[Document.__table__, DocumentResult.__table__])
+            elapsed = insert(engine, payloads, binary)
+            engine.dispose()
+            size = db_path.stat().st_size / 1e6
+            latencies = asyncio.run(
+                read_latencies(f"sqlite+aiosqlite:///{db_path}", args.docs, args.reads, random.Random(1))
+            )
+            print(f"   {label:>18}: DB {size:7.1f} MB | insert {args.docs / elapsed:9,.0f} rows/s"
+                  f" | read p50 {statistics.median(latencies):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
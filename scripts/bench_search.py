@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark full-text search (SQLite FTS5) over stored documents
+Usage:
+    python scripts/bench_search.py                  # 300k documents
+    python scripts/bench_search.py --docs 50000     # quicker run
+
+Fills documents_fts with synthetic reports (extracted text, summary,
+bullets, codes) and times GET /documents/search queries through
+app.db.search: single terms, prefix queries, phrases and multi-term
+queries, each returning the top 20 with snippets.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend-fastapi"))
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import search
+from app.db.database import Base
+from app.db.models import Document
+
+MEDICAL_WORDS = (
+    "patient chest xray opacity lobe pneumonia effusion pleural heart normal wbc hemoglobin platelets "
+    "sodium potassium creatinine glucose impression findings history cough fever follow "
+    "recommend radiograph contrast mass nodule nodular lesion acute chronic mild moderate severe "
+    "diabetes diabetic hypertension anemia kidney liver thyroid fracture edema infiltrate consolidation"
+).split()
+
+QUERIES = ["pneumonia", "diab*", "hemo*", '"pleural effusion"', "glucose diabetes", "chronic kidney*", "nodul*"]
+
+
+def make_vocabulary(rng: random.Random, size: int = 30000) -> tuple:
+    """Synthetic words plus the medical terms, with Zipf-like frequencies"""
+    vocab = [f"w{i}" for i in range(size)]
+    for word in MEDICAL_WORDS:
+        vocab.insert(rng.randrange(20, 2000), word)
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    return vocab, list(itertools.accumulate(weights))
+
+
+def make_doc(rng: random.Random, vocab: tuple, doc_id: int) -> dict:
+    words, cum_weights = vocab
+
+    def sentence(n: int) -> str:
+        return " ".join(rng.choices(words, cum_weights=cum_weights, k=n))
+
+    payload = {
+        "summary": {"summary": sentence(60), "bullets": [sentence(8) for _ in range(3)]},
+        "codes": {"codes": [{"code": "E11.9", "description": "Type 2 diabetes mellitus"}] if doc_id % 7 == 0 else []},
+    }
+    return search.fts_row(doc_id, payload, sentence(300))
+
+
+def build(engine, docs: int, rng: random.Random, batch: int = 10000) -> float:
+    vocab = make_vocabulary(rng)
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for offset in range(0, docs, batch):
+            ids = range(offset + 1, min(offset + batch, docs) + 1)
+            conn.exec_driver_sql(
+                "INSERT INTO documents (id, original_filename, created_at) VALUES (?, ?, '2024-01-01 00:00:00')",
+                [(i, f"doc{i}.pdf") for i in ids],
+            )
+            conn.execute(search._INSERT, [make_doc(rng, vocab, i) for i in ids])
+    return time.perf_counter() - start
+
+
+async def run_queries(db_url: str, rounds: int) -> dict:
+    async_engine = create_async_engine(db_url)
+    latencies = {q: [] for q in QUERIES}
+    async with async_sessionmaker(async_engine)() as db:
+        for _ in range(rounds):
+            for q in QUERIES:
+                start = time.perf_counter()
+                await search.search(db, q, limit=20)
+                latencies[q].append((time.perf_counter() - start) * 1000)
+    await async_engine.dispose()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FTS5 document search")
+    parser.add_argument("--docs", type=int, default=300_000, help="Indexed documents")
+    parser.add_argument("--rounds", type=int, default=20, help="Times each query is run")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    print("=" * 60)
+    print(f"Full-text search benchmark ({args.docs:,} documents, ~300 words each)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(engine, tables=[Document.__table__])
+        with engine.begin() as conn:
+            search.create_index(conn)
+
+        elapsed = build(engine, args.docs, rng)
+        print(f"   Index build: {elapsed:.1f}s ({args.docs / elapsed:,.0f} docs/sec), "
+              f"DB size {db_path.stat().st_size / 1e6:,.0f} MB")
+
+        latencies = asyncio.run(run_queries(f"sqlite+aiosqlite:///{db_path}", args.rounds))
+        for q, values in latencies.items():
+            print(f"   {q:>20}: p50 {statistics.median(values):7.2f} ms, max {max(values):7.2f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Measure how much text each LLM task receives after sectionizing
+Usage:
+    python scripts/bench_sectionizer.py
+
+For the eval set (/eval/quick DATA), the test_docs samples and a long
+synthetic clinical note, reports the estimated input tokens per task with
+and without section routing, plus sectionizer throughput.
+
+Routing only applies to documents of MIN_ROUTED_CHARS or more, which no
+eval sample reaches, so it is also checked on long notes (progress note,
+discharge summary, radiology report): every statement a task needs is
+listed per note, and the report gives how many survive routing. A
+statement that routing drops cannot be coded, whatever the model.
+"""
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend-fastapi"))
+
+from app.config import settings
+from app.routes.eval import DATA
+from app.services.sectionizer import TASK_SECTIONS, sectionize, select_text
+from app.services.text_extract import estimate_tokens
+
+LONG_NOTE = """Internal Medicine Progress Note
+Chief Complaint: follow-up of diabetes and hypertension
+History of Present Illness:
+{hpi}
+Past Medical History:
+Type 2 diabetes mellitus, hypertension, hyperlipidemia, osteoarthritis of the left knee.
+Medications:
+metformin 1000 mg twice daily
+lisinopril 20 mg daily
+atorvastatin 40 mg nightly
+Allergies: NKDA
+Social History:
+{social}
+Review of Systems:
+{ros}
+Physical Exam:
+{exam}
+Labs:
+HbA1c 8.4%, creatinine 1.1 mg/dL, LDL 132 mg/dL, potassium 4.3 mmol/L.
+Assessment:
+1. Type 2 diabetes mellitus with diabetic polyneuropathy, poorly controlled.
+2. Essential hypertension, controlled.
+3. Hyperlipidemia, above goal.
+Plan:
+Increase atorvastatin to 80 mg. Start gabapentin 300 mg at bedtime. Repeat HbA1c in 3 months.
+Podiatry referral. Return to clinic in 12 weeks.
+"""
+
+
+DISCHARGE_SUMMARY = """Discharge Summary
+Reason for Admission: shortness of breath
+History of Present Illness:
+{hpi}
+Known atrial fibrillation on apixaban, admitted with worsening dyspnea.
+Hospital course was uncomplicated after diuresis.
+Results:
+BNP 1840 pg/mL. Troponin negative x2. Sodium 131 mmol/L.
+Discharge Diagnoses:
+1. Acute on chronic systolic heart failure
+2. Hyponatremia
+Discharge Medications:
+furosemide 40 mg daily
+apixaban 5 mg twice daily
+Follow up:
+Cardiology clinic in 2 weeks. Repeat sodium in 1 week.
+"""
+
+RADIOLOGY_REPORT = """CT Chest with contrast
+Clinical History: chronic cough
+Technique:
+{technique}
+Findings:
+{findings}
+8 mm solid nodule in the right upper lobe.
+Small left pleural effusion.
+Impression:
+1. Right upper lobe pulmonary nodule, 8 mm.
+2. Small left pleural effusion.
+Recommendation: follow-up CT chest in 3 months.
+"""
+
+# Statements each task must receive, per long note
+LONG_NOTE_EVIDENCE = {
+    "progress note": {
+        "codes": ["HbA1c 8.4%", "diabetic polyneuropathy", "Essential hypertension", "Hyperlipidemia"],
+        "medications": ["metformin 1000 mg", "lisinopril 20 mg", "gabapentin 300 mg"],
+        "action_items": ["Repeat HbA1c in 3 months", "Podiatry referral"],
+    },
+    "discharge summary": {
+        "codes": ["atrial fibrillation", "BNP 1840", "systolic heart failure", "Hyponatremia"],
+        "medications": ["furosemide 40 mg", "apixaban 5 mg"],
+        "action_items": ["Cardiology clinic in 2 weeks", "Repeat sodium in 1 week"],
+    },
+    "radiology report": {
+        "codes": ["8 mm solid nodule", "pleural effusion"],
+        "medications": [],
+        "action_items": ["follow-up CT chest in 3 months"],
+    },
+}
+
+FILLER = ("Patient reports intermittent burning pain in both feet, worse at night, "
+          "with no recent falls, chest pain or shortness of breath. ")
+
+
+def long_note() -> str:
+    return LONG_NOTE.format(hpi=FILLER * 25, social=FILLER * 5, ros=FILLER * 15, exam=FILLER * 15)
+
+
+def long_notes() -> dict:
+    imaging = "Axial images were obtained through the chest after intravenous contrast. "
+    normal = "The heart is normal in size. No mediastinal or hilar lymphadenopathy. "
+    return {
+        "progress note": long_note(),
+        "discharge summary": DISCHARGE_SUMMARY.format(hpi=FILLER * 25),
+        "radiology report": RADIOLOGY_REPORT.format(technique=imaging * 15, findings=normal * 25),
+    }
+
+
+def evidence_recall(notes: dict) -> None:
+    """How many of the statements each task needs are still in its routed text"""
+    totals = {task: [0, 0] for task in TASK_SECTIONS}
+    for name, note in notes.items():
+        cells = []
+        for task, needed in LONG_NOTE_EVIDENCE[name].items():
+            routed = select_text(note, task)
+            kept = [e for e in needed if e in routed]
+            totals[task][0] += len(kept)
+            totals[task][1] += len(needed)
+            missed = [e for e in needed if e not in kept]
+            cells.append(f"{task} {len(kept)}/{len(needed)}" + (f" (missing: {', '.join(missed)})" if missed else ""))
+        print(f"   {name:<18} " + " | ".join(cells))
+    print("   " + " | ".join(f"{task} {kept}/{total} kept" for task, (kept, total) in totals.items()))
+
+
+def report(label: str, texts: list) -> None:
+    full = sum(estimate_tokens(t) for t in texts)
+    cells = []
+    for task in TASK_SECTIONS:
+        routed = sum(estimate_tokens(select_text(t, task)) for t in texts)
+        cells.append(f"{task} {routed:>6} ({100.0 * (full - routed) / max(1, full):3.0f}% less)")
+    print(f"   {label:<18} full {full:>6} | " + " | ".join(cells))
+
+
+def main():
+    settings.section_routing = True  # measure routing whatever the environment sets
+    samples = [p.read_text(encoding="utf-8") for p in sorted((ROOT / "test_docs").glob("*.txt"))]
+    note = long_note()
+    notes = long_notes()
+
+    print("=" * 78)
+    print("Sectionizer benchmark (estimated input tokens per task)")
+    print("=" * 78)
+    report(f"eval set ({len(DATA)})", [item["text"] for item in DATA])
+    report("test_docs", samples)
+    for name, text in notes.items():
+        report(name, [text])
+
+    print("\n   Needed statements kept by routing (long notes):")
+    evidence_recall(notes)
+
+    runs = 2000
+    start = time.perf_counter()
+    for _ in range(runs):
+        sectionize(note)
+    per_run = (time.perf_counter() - start) / runs * 1000
+    print(f"\n   sectionize(): {per_run:.3f} ms for a {len(note):,}-char note "
+          f"({len(sectionize(note))} sections)")
+
+
+if __name__ == "__main__":
+    main()
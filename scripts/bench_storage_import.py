@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark storage backend start-up cost (imports + construction)
+Usage:
+    python scripts/bench_storage_import.py
+    python scripts/bench_storage_import.py --runs 30
+
+Each variant runs in a fresh interpreter (so nothing is cached in
+sys.modules) after app.config is already imported, and times only the
+storage set-up:
+  before:       what importing the old factory did - import both backend
+                modules, build an S3 client at import, then the local backend
+  after/local:  app.services.storage.get_storage() with STORAGE_BACKEND=local
+  after/s3:     the same with STORAGE_BACKEND=s3 (boto3 only loaded here)
+Also checks whether importing app.main pulls in boto3.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend-fastapi"
+
+PRELUDE = """
+import sys, time
+import app.config
+from app.config import settings
+start = time.perf_counter()
+"""
+EPILOGUE = """
+print((time.perf_counter() - start) * 1000, 'boto3' in sys.modules)
+"""
+
+VARIANTS = {
+    "before": ("local", """
+from app.services.storage_local import LocalStorage
+from app.services.storage_s3 import S3Storage
+S3Storage(region=settings.aws_region)
+LocalStorage(base_path=settings.storage_dir)
+"""),
+    "after/local": ("local", """
+from app.services.storage import get_storage
+get_storage()
+"""),
+    "after/s3": ("s3", """
+from app.services.storage import get_storage
+get_storage()
+"""),
+}
+
+
+def run_once(code: str, backend: str, tmp_dir: str) -> tuple:
+    env = {
+        **os.environ,
+        "STORAGE_BACKEND": backend,
+        "STORAGE_DIR": tmp_dir,
+        "PYTHONPATH": str(BACKEND),
+    }
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=BACKEND, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(out[-2]), out[-1] == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark storage backend start-up cost")
+    parser.add_argument("--runs", type=int, default=15, help="Fresh interpreters per variant")
+    args = parser.parse_args()
+
+    try:
+        import boto3  # noqa: F401
+    except ImportError:
+        print("[ERROR] boto3 is needed for the before and s3 variants (pip install boto3)")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"Storage start-up benchmark (median of {args.runs} fresh interpreters)")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (backend, body) in VARIANTS.items():
+            code = PRELUDE + body + EPILOGUE
+            run_once(code, backend, tmp)  # warm the OS file cache
+            timings, loaded = [], False
+            for _ in range(args.runs):
+                ms, loaded = run_once(code, backend, tmp)
+                timings.append(ms)
+            print(f"   {name:>11}: {statistics.median(timings):7.1f} ms"
+                  f" (min {min(timings):.1f}) | boto3 imported: {loaded}")
+
+        _, loaded = run_once(PRELUDE + "import app.main\n" + EPILOGUE, "local", tmp)
+        print(f"   import app.main with STORAGE_BACKEND=local imports boto3: {loaded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark local upload storage: per-upload UUID directories vs content-addressed
+Usage:
+    python scripts/bench_storage_layout.py                  # 200k files
+    python scripts/bench_storage_layout.py --files 1000000 --dir /mnt/data/tmp
+
+Writes the same uploads (small files, --duplicates of them repeats of
+earlier ones) through both layouts in a temporary directory:
+  legacy: the previous LocalStorage - one <uuid>/ directory per upload
+          under a single base directory, staged and renamed into place
+  cas:    app.services.storage_local - sha256/ab/cd/<hash>, staged and
+          hard-linked into place, identical uploads stored once
+and reports write throughput, random lookup latency (file_exists on
+stored paths), the time to list the top-level directory, the largest
+directory and the bytes on disk.
+"""
+import argparse
+import hashlib
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend-fastapi"))
+
+from app.services.storage_local import LocalStorage
+
+
+class LegacyStorage:
+    """The previous layout: <base>/<uuid>/<filename>"""
+
+    def __init__(self, base_path: str):
+        self.base_path = Path(base_path)
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        (self.base_path / ".incoming").mkdir(exist_ok=True)
+
+    def save(self, data: bytes, filename: str) -> str:
+        file_id = str(uuid.uuid4())
+        staging = self.base_path / ".incoming" / file_id
+        with open(staging, "wb") as fh:
+            fh.write(data)
+        final = self.base_path / file_id / filename
+        final.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staging, final)
+        return str(final)
+
+    def file_exists(self, path: str) -> bool:
+        return Path(path).exists()
+
+
+def save_cas(storage: LocalStorage, data: bytes, filename: str) -> str:
+    writer = storage.open_writer(filename)
+    try:
+        writer.write(data)
+        return writer.commit(hashlib.sha256(data).hexdigest())  # the upload path hashes at ingest
+    finally:
+        writer.abort()
+
+
+def make_uploads(files: int, duplicates: float, rng: random.Random) -> list:
+    uploads = []
+    for i in range(files):
+        if uploads and rng.random() < duplicates:
+            uploads.append(rng.choice(uploads))
+        else:
+            uploads.append(rng.randbytes(rng.randint(1024, 8192)))
+    return uploads
+
+
+def disk_usage(root: Path) -> tuple:
+    """(bytes on disk counting each inode once, entries in the largest directory)"""
+    seen, total, largest = set(), 0, 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        largest = max(largest, len(dirnames) + len(filenames))
+        for name in filenames:
+            st = os.stat(os.path.join(dirpath, name))
+            if st.st_ino not in seen:
+                seen.add(st.st_ino)
+                total += st.st_blocks * 512
+    return total, largest
+
+
+def bench(name: str, save, exists, base: Path, uploads: list, lookups: int, rng: random.Random) -> None:
+    start = time.perf_counter()
+    paths = [save(data, f"upload{i}.pdf") for i, data in enumerate(uploads)]
+    write_s = time.perf_counter() - start
+
+    sample = rng.choices(paths, k=lookups)
+    latencies = []
+    for path in sample:
+        t = time.perf_counter()
+        exists(path)
+        latencies.append((time.perf_counter() - t) * 1e6)
+    latencies.sort()
+
+    start = time.perf_counter()
+    with os.scandir(base) as it:
+        top_entries = sum(1 for _ in it)
+    list_ms = (time.perf_counter() - start) * 1000
+
+    used, largest = disk_usage(base)
+    print(f"   {name:>6}: write {len(uploads) / write_s:8,.0f} files/s"
+          f" | lookup p50 {statistics.median(latencies):5.1f} us p99 {latencies[int(len(latencies) * 0.99)]:6.1f} us"
+          f" | list top dir {list_ms:8.1f} ms ({top_entries:,} entries)"
+          f" | largest dir {largest:,} | {used / 1e6:,.0f} MB on disk")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark UUID vs content-addressed storage layouts")
+    parser.add_argument("--files", type=int, default=200_000, help="Uploads to store per layout")
+    parser.add_argument("--duplicates", type=float, default=0.2, help="Fraction of uploads repeating earlier ones")
+    parser.add_argument("--lookups", type=int, default=20_000, help="Random file_exists() calls")
+    parser.add_argument("--dir", default=None, help="Where to create the stores (default: system temp dir)")
+    args = parser.parse_args()
+
+    uploads = make_uploads(args.files, args.duplicates, random.Random(7))
+    print("=" * 60)
+    print(f"Storage layout benchmark ({args.files:,} uploads, {args.duplicates:.0%} duplicates,"
+          f" {sum(map(len, uploads)) / 1e6:,.0f} MB)")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        legacy = LegacyStorage(f"{tmp}/legacy")
+        bench("legacy", legacy.save, legacy.file_exists, legacy.base_path, uploads, args.lookups, random.Random(1))
+        cas = LocalStorage(f"{tmp}/cas")
+        bench("cas", lambda data, name: save_cas(cas, data, name), cas.file_exists, cas.base_path,
+              uploads, args.lookups, random.Random(1))
+
+
+if __name__ == "__main__":
+    main()
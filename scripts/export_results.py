@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Export processed documents and their results to NDJSON or Parquet
+Usage:
+    python scripts/export_results.py documents.ndjson
+    python scripts/export_results.py documents.parquet            # format from the extension
+    python scripts/export_results.py - --document-type "X-RAY"    # NDJSON to stdout
+    python scripts/export_results.py out.parquet --since 2024-01-01 --until 2024-07-01
+
+Reads the database configured for the backend (DB_URL / .env) directly,
+batch by batch with a server-side cursor, so memory stays constant.
+Same output as GET /documents/export. Parquet needs pyarrow.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend-fastapi"))
+
+from app.db.database import engine
+from app.services import export
+
+
+async def run(out, fmt: str, **filters) -> int:
+    written = 0
+    try:
+        async for chunk in export.chunks(fmt, **filters):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        await engine.dispose()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export processed documents to NDJSON or Parquet")
+    parser.add_argument("output", help="Output file, or - for stdout")
+    parser.add_argument("--format", choices=export.FORMATS,
+                        help="Output format (default: from the file extension, else ndjson)")
+    parser.add_argument("--document-type", help="Only documents classified as this type")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Created at or after (ISO date/time)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Created before (ISO date/time)")
+    args = parser.parse_args()
+
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "ndjson")
+    if fmt == "parquet" and not export.parquet_available():
+        print("[ERROR] Parquet export requires pyarrow (pip install pyarrow)", file=sys.stderr)
+        sys.exit(1)
+
+    filters = dict(document_type=args.document_type, since=args.since, until=args.until)
+    start = time.perf_counter()
+    if args.output == "-":
+        written = asyncio.run(run(sys.stdout.buffer, fmt, **filters))
+    else:
+        with open(args.output, "wb") as out:
+            written = asyncio.run(run(out, fmt, **filters))
+    print(f"[INFO] Exported {written / 1e6:,.1f} MB of {fmt} to {args.output} "
+          f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
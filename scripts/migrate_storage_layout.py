@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Move uploads from the old <uuid>/<filename> layout into content-addressed storage
+Usage:
+    python scripts/migrate_storage_layout.py --dry-run     # report only
+    python scripts/migrate_storage_layout.py
+    python scripts/migrate_storage_layout.py --keep-legacy # leave the old files in place
+
+Every stored file that is not yet at sha256/ab/cd/<hash> under STORAGE_DIR
+is hashed and hard-linked into place (no data is copied; identical files
+collapse onto one blob), the documents pointing at it are updated and its
+reference count moves to the new path. Old files are removed, with their
+empty UUID directories, only after each batch has committed, so the tool
+can be stopped and re-run at any time. Best run while the server is
+stopped.
+
+Runs from backend-fastapi/, like the server, so relative DB_URL,
+STORAGE_DIR and stored paths resolve the same way.
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend-fastapi"
+sys.path.insert(0, str(BACKEND))
+os.chdir(BACKEND)
+
+from sqlalchemy import delete, select, update
+
+from app.config import settings
+from app.db import file_refs
+from app.db.database import SessionLocal, engine, init_db
+from app.db.models import Document, StoredFile
+from app.services.storage_local import BLOB_DIR, LocalStorage
+
+
+def is_blob(path: str) -> bool:
+    p = Path(path)
+    return len(p.name) == 64 and p.parent.parent.parent.name == BLOB_DIR
+
+
+def sha256_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(1024 * 1024):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def remove_legacy(path: str) -> None:
+    p = Path(path)
+    p.unlink(missing_ok=True)
+    try:
+        p.parent.rmdir()  # the per-upload UUID directory, if now empty
+    except OSError:
+        pass
+
+
+async def migrate(storage: LocalStorage, batch: int, dry_run: bool, keep_legacy: bool) -> dict:
+    stats = {"files": 0, "deduplicated": 0, "missing": 0, "bytes_freed": 0}
+    last = ""
+    seen = set()  # dry runs link nothing, so duplicates within the run are tracked here
+    async with SessionLocal() as db:
+        while True:
+            rows = (await db.execute(
+                select(StoredFile.path, StoredFile.ref_count)
+                .where(StoredFile.path > last)
+                .order_by(StoredFile.path)
+                .limit(batch)
+            )).all()
+            if not rows:
+                return stats
+            last = rows[-1][0]
+            moved = []
+            for old, ref_count in rows:
+                if is_blob(old):
+                    continue
+                if not os.path.exists(old):
+                    stats["missing"] += 1
+                    print(f"[WARNING] Missing file, left as is: {old}")
+                    continue
+                content_hash = sha256_file(old)
+                duplicate = content_hash in seen or storage.blob_path(content_hash).exists()
+                stats["files"] += 1
+                stats["deduplicated"] += duplicate
+                if duplicate and not keep_legacy:
+                    stats["bytes_freed"] += os.path.getsize(old)
+                if dry_run:
+                    seen.add(content_hash)
+                    continue
+                new = storage.link_blob(Path(old), content_hash)
+                await db.execute(update(Document).where(Document.local_path == old).values(local_path=new))
+                await db.execute(delete(StoredFile).where(StoredFile.path == old))
+                await file_refs.add_ref(db, new, ref_count)
+                moved.append(old)
+            if not moved:
+                continue
+            await db.commit()
+            if not keep_legacy:
+                for old in moved:
+                    remove_legacy(old)
+            print(f"[INFO] {stats['files']:,} files migrated so far")
+
+
+async def run(batch: int, dry_run: bool, keep_legacy: bool) -> dict:
+    try:
+        await init_db()  # creates stored_files and counts existing references
+        return await migrate(LocalStorage(base_path=settings.storage_dir), batch, dry_run, keep_legacy)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate stored uploads to content-addressed storage")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be migrated; change nothing")
+    parser.add_argument("--keep-legacy", action="store_true", help="Leave the old files in place")
+    parser.add_argument("--batch", type=int, default=500, help="Files per transaction")
+    args = parser.parse_args()
+
+    if settings.storage_backend.lower() != "local":
+        print(f"[ERROR] Only local storage is content-addressed (STORAGE_BACKEND={settings.storage_backend})")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    stats = asyncio.run(run(args.batch, args.dry_run, args.keep_legacy))
+    verb = "Would migrate" if args.dry_run else "Migrated"
+    print(f"[OK] {verb} {stats['files']:,} files in {time.perf_counter() - start:.1f}s: "
+          f"{stats['deduplicated']:,} duplicates ({stats['bytes_freed'] / 1e6:,.1f} MB freed), "
+          f"{stats['missing']:,} missing")
+
+
+if __name__ == "__main__":
+    main()
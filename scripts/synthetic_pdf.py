@@ -0,0 +1,85 @@
+"""
+Minimal text-PDF writer for benchmarks (no third-party dependencies)
+"""
+import random
+from typing import List, Optional
+
+LOREM = (
+    "Patient seen in clinic for follow up. WBC 13.2 x10^3/uL elevated, hemoglobin 14.1 g/dL, "
+    "platelets 250 x10^3/uL. Sodium 138 mmol/L, potassium 3.0 mmol/L low, creatinine 1.5 mg/dL. "
+    "Chest radiograph shows right lower lobe opacity consistent with pneumonia. No effusion. "
+    "Plan: start antibiotics, repeat labs in one week, return precautions reviewed."
+).split()
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+# 64x64 8-bit grey "scan" (a noise pattern; only its presence matters)
+_SCAN_SIZE = 64
+_SCAN_PIXELS = bytes((x * 7 + y * 13) % 256 for y in range(_SCAN_SIZE) for x in range(_SCAN_SIZE))
+
+
+def make_pdf(page_texts: List[Optional[str]]) -> bytes:
+    """
+    Build a PDF with one Helvetica text page per entry (lines split on newlines)
+
+    A None entry becomes an image-only page, like a scanned sheet.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+        b"/BitsPerComponent 8 /Length %d >>\nstream\n" % (_SCAN_SIZE, _SCAN_SIZE, len(_SCAN_PIXELS))
+        + _SCAN_PIXELS + b"\nendstream",
+    ]
+    kids = []
+    for text in page_texts:
+        if text is None:
+            stream = b"q 612 0 0 792 0 0 cm /Im1 Do Q"
+            objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+            objects.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                b"/Resources << /XObject << /Im1 4 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+            )
+            kids.append(len(objects))
+            continue
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+        for line in text.split("\n"):
+            ops.append(f"({_escape(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_num = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_num
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def random_page(rng: random.Random, lines: int = 50, words: int = 14) -> str:
+    return "\n".join(" ".join(rng.choice(LOREM) for _ in range(words)) for _ in range(lines))
+
+
+def make_report_pdf(pages: int, seed: int = 0, scanned: bool = False) -> bytes:
+    """A synthetic multi-page lab/clinical report (image-only pages if scanned)"""
+    rng = random.Random(seed)
+    return make_pdf([None if scanned else random_page(rng) for _ in range(pages)])